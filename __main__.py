@@ -1,5 +1,3 @@
-from api_watchdog.cli_api import run_cli
-from api_watchdog.gui_api import run_gui
 from api_watchdog.core_gui_and_cli.cli import parse_args
 import sys
 from api_watchdog.utils.logger import get_logger
@@ -7,9 +5,15 @@ from api_watchdog.utils.logger import get_logger
 if __name__ == "__main__":
     args = parse_args()
     try:
-        if args.cli:
+        # Import only the interface that runs: the GUI pulls in tkinter.
+        # The GUI monitors one API, so the other subcommands always run here
+        if args.cli or args.command in ("run", "query", "check"):
+            from api_watchdog.cli_api import run_cli
+
             run_cli()
         else:
+            from api_watchdog.gui_api import run_gui
+
             run_gui()
     except Exception as e:
         logger = get_logger(name="api_watchdog", log_to_console=True, log_to_file=False)
@@ -1,15 +1,199 @@
 from api_watchdog.utils.logger import get_logger
+from api_watchdog.utils.log_queue import (
+    get_pipeline,
+    start_queue_logging,
+    stop_queue_logging,
+)
 from api_watchdog.core_gui_and_cli.cli import parse_args
-from api_watchdog.utils.api_fetcher import fetch_api
+from api_watchdog.utils.http_cache import ResponseCache
+from api_watchdog.utils.record_sink import close_sinks
+from api_watchdog.utils.log_rotation import RotationPolicy, set_rotation
+from api_watchdog.utils.rate_limit import DEFAULT_QUOTAS, RateLimited, RateLimiter
+from api_watchdog.utils.resilience import CircuitOpen
+from api_watchdog.utils.scheduler import Scheduler
+from api_watchdog.utils.targets import build_targets, load_alerts, load_targets
+from api_watchdog.utils.alerts import AlertEngine, Rule, parse_notifier
+from api_watchdog.utils.timeseries import TimeSeriesStore
+from api_watchdog.utils.downsample import Compactor
+from functools import partial
+import json
+import math
 import time
 
+
+def poll_target(target, console_log):
+    """
+    Fetch one target's API data and pass it to its API class.
+
+    Errors are logged rather than raised so that a failing target does not
+    stop the scheduler from polling the others.
+
+    Args:
+        target (Target): The target to poll.
+        console_log (logging.Logger): The logger for progress messages.
+
+    Returns:
+        float: The number of seconds to hold off the next poll because the
+        API quota is used up or the host's circuit breaker is open, or None.
+    """
+    from api_watchdog.utils.api_fetcher import get_fetcher
+
+    # Log that we are fetching the API data
+    console_log.info(f"[{target.name}] Fetching API data...")
+    fetched_at = time.time()
+
+    try:
+        # Fetch the API data, decoding only the parts the target reads
+        result = get_fetcher().fetch(
+            target.api_url, projection=getattr(target.api, "projection", None)
+        )
+
+        # Log the API data, or write it as structured records, skipping
+        # responses that are unchanged since the last poll
+        target.handle(result, fetched_at)
+
+        # Log that the API data was fetched successfully
+        console_log.info(f"[{target.name}] API data fetched successfully")
+    except (RateLimited, CircuitOpen) as e:
+        # Nothing was sent; wait for the quota to refill or the host to
+        # recover instead of failing
+        console_log.warning(f"[{target.name}] {e}")
+        return e.retry_after
+    except Exception as e:
+        # Log that there was an error fetching the API data
+        console_log.error(f"[{target.name}] Error fetching API data: {e}")
+        target.failed(fetched_at)
+
+
+def run_query(args):
+    """
+    Print the stored history of a target, or the stored targets.
+
+    Rows are printed as CSV with a header, or as one JSON object per line;
+    values a target does not report (NaN) are left empty or null.
+
+    Args:
+        args (argparse.Namespace): The parsed "query" arguments.
+    """
+    store = TimeSeriesStore(args.store)
+    if args.target is None:
+        for target in store.targets():
+            print(target)
+        return
+
+    try:
+        rows = store.query(
+            args.target, args.start, args.end, args.columns, args.resolution
+        )
+    except KeyError:
+        raise SystemExit(f"No stored history for {args.target!r}")
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.rolling:
+        from api_watchdog.utils.analytics import rolling_stats
+
+        rows = rolling_stats(rows, args.rolling)
+    columns = [name for name in rows if name != "ts"]
+
+    if args.format == "csv":
+        print(",".join(["ts"] + columns))
+    for i, ts in enumerate(rows["ts"]):
+        values = [rows[name][i] for name in columns]
+        values = [None if math.isnan(value) else float(value) for value in values]
+        if args.format == "csv":
+            print(",".join([str(ts)] + ["" if v is None else str(v) for v in values]))
+        else:
+            print(json.dumps({"ts": int(ts), **dict(zip(columns, values))}))
+
+
+def run_check(args):
+    """
+    Fetch every target once and exit with a status that reports failures.
+
+    Targets are fetched concurrently within --deadline, through the same
+    cache, rate limiter and outputs as monitoring, so a cron job or CI step
+    with --cache-dir only downloads what changed since its last run. One
+    line (or JSON object) per target is printed in the order given.
+
+    Args:
+        args (argparse.Namespace): The parsed "check" arguments.
+
+    Raises:
+        SystemExit: With EXIT_OK, EXIT_FAILED or EXIT_TIMEOUT (see check).
+    """
+    from api_watchdog.utils.api_fetcher import get_fetcher
+    from api_watchdog.utils.check import check_targets, exit_status
+    from api_watchdog.utils.registry import get_plugin
+
+    targets = []
+    for spec in args.specs:
+        name, _, argument = spec.partition("=")
+        try:
+            plugin = get_plugin(name)
+        except KeyError:
+            raise SystemExit(f"Unknown API {name!r} in {spec!r}")
+        if not argument:
+            raise SystemExit(f"Expected API=ARGUMENT, got {spec!r}")
+        targets += build_targets(
+            plugin.load(), argument, plugin.interval, plugin.log_file
+        )
+    if args.targets:
+        targets += load_targets(args.targets)
+    if not targets:
+        raise SystemExit("Nothing to check: give API=ARGUMENT targets or --targets")
+
+    fetcher = get_fetcher()
+    # A single request never outlives the whole check
+    fetcher.timeout = min(fetcher.timeout, args.deadline)
+    if not args.no_cache:
+        fetcher.cache = ResponseCache(cache_dir=args.cache_dir)
+    if not args.no_rate_limit:
+        quotas = dict(DEFAULT_QUOTAS)
+        quotas.update({host: (minute, day) for host, minute, day in args.quota})
+        fetcher.limiter = RateLimiter(quotas)
+
+    def fetch(target):
+        return fetcher.fetch(
+            target.api_url,
+            max_retries=args.retries,
+            delay=1,
+            projection=getattr(target.api, "projection", None),
+        )
+
+    try:
+        results = check_targets(
+            targets, fetch, deadline=args.deadline, max_concurrency=args.max_concurrency
+        )
+    finally:
+        close_sinks()
+
+    for result in results:
+        if args.format == "jsonl":
+            print(json.dumps(result.to_dict()))
+        elif result.ok:
+            source = "cached" if result.from_cache else f"HTTP {result.status}"
+            print(
+                f"OK    {result.name}: {len(result.records)} record(s), "
+                f"{source}, {result.latency * 1000:.0f} ms"
+            )
+        else:
+            print(f"FAIL  {result.name}: {result.error}")
+    # Abandoned fetches of timed-out targets must not hold the exit up
+    if not any(result.timed_out for result in results):
+        fetcher.close()
+    raise SystemExit(exit_status(results))
+
+
 def run_cli():
     """
     Run the API Watchdog command-line interface.
 
     This function will start the API Watchdog with the given command-line
     arguments. It will fetch the API data at the given interval and log the
-    results to the file specified by --log-file.
+    results to the file specified by --log-file. With the "run" subcommand
+    every target listed in the --targets file is monitored, each at its own
+    interval, by a single scheduler thread, or concurrently by an asyncio
+    event loop with --engine async.
 
     The function will exit if the user stops it with Ctrl+C.
 
@@ -19,66 +203,235 @@ def run_cli():
     # Parse the command-line arguments once at startup
     args = parse_args()
 
-    # Determine the API class that was chosen by the user (e.g. WeatherConfig
-    # or StockConfig)
-    api_class = args.api
+    # Read stored history instead of monitoring
+    if args.command == "query":
+        run_query(args)
+        return
 
-    # Create a logger that will write to a file specified by the user, or
-    # to the default log file if no file was specified
-    log = get_logger(
-        name="api_watchdog_file_cli", log_file=args.log_file, log_to_console=False
-    )
+    # Fetch every target once, for cron jobs and CI
+    if args.command == "check":
+        run_check(args)
+
+    # Only monitoring needs the HTTP stack; --help and "query" never load it
+    from api_watchdog.utils.api_fetcher import get_fetcher
+
+    # Rotate the log files by size and/or age, compressing old segments
+    if args.log_max_size or args.log_rotate_every:
+        set_rotation(
+            RotationPolicy(
+                max_bytes=args.log_max_size,
+                interval=args.log_rotate_every,
+                backup_count=args.log_backups,
+                max_total_bytes=args.log_max_total,
+                compress=not args.no_log_compress,
+            )
+        )
+
+    # Move log formatting and writes off the fetch threads
+    if args.log_queue:
+        start_queue_logging(
+            flush_interval=args.log_flush_interval,
+            max_queue=args.log_queue_size,
+            overflow=args.log_overflow,
+        )
 
     # Create a logger that will write to the console
     console_log = get_logger(
         name="api_watchdog_console_cli", log_to_console=True, log_to_file=False
     )
 
-    # Start the API Watchdog
-    console_log.info("Starting API Watchdog")
-
-    # Determine the name of the argument that the user passed to the API
-    # class (e.g. "location" for the Weather API, or "stock" for the Stock API)
-    api_var = api_class.var
-
-    # Create an instance of the API class with the user's arguments
-    api = api_class(
-        logger=log,
-        argument=getattr(args, api_var),  # Get the argument from the args
-        interval=args.interval,  # Get the interval from the args
-        log_file=args.log_file,  # Get the log file from the args
-    )
+    # Determine the API class that was chosen by the user (e.g. WeatherConfig
+    # or StockConfig), or None when the targets come from a targets file
+    api_class = args.api
 
-    # Get the API URL, interval, and log file from the API instance
-    api_url, interval, _ = api.get_config()
+    if api_class is None:
+        targets = load_targets(
+            args.targets,
+            default_interval=args.interval,
+            default_log_mode=args.log_mode,
+            default_sink=args.sink,
+            default_sink_file=args.sink_file,
+        )
+    else:
+        # Determine the name of the argument that the user passed to the API
+        # class (e.g. "location" for the Weather API, or "stock" for the Stock API)
+        api_var = api_class.var
+        targets = build_targets(
+            api_class,
+            argument=getattr(args, api_var),  # Get the argument from the args
+            interval=args.interval,  # Get the interval from the args
+            log_file=args.log_file,  # Get the log file from the args
+            log_mode=args.log_mode,  # Get the log mode from the args
+            sink=args.sink,  # Get the output format from the args
+            sink_file=args.sink_file,
+        )
 
-    # Main loop of the program
-    try:
-        while True:
-            # Log that we are fetching the API data
-            console_log.info("Fetching API data...")
+    # Keep the numeric fields of every observation as queryable history
+    store = TimeSeriesStore(args.store) if args.store else None
+    for target in targets:
+        target.store = store
+
+    # Keep rolling statistics per target, starting from the stored history
+    analytics = None
+    if args.analytics_window:
+        from api_watchdog.utils.analytics import Analytics
+
+        analytics = Analytics(args.analytics_window)
+        for target in targets:
+            target.analytics = analytics
+            if store is not None:
+                symbols = getattr(target.api, "symbols", None)
+                for series in (
+                    [f"{target.name}:{symbol}" for symbol in symbols]
+                    if symbols
+                    else [target.name]
+                ):
+                    analytics.warm(store, series)
+
+    # Evaluate alert rules from the command line and the targets file
+    rules = [
+        Rule(expression, expression, cooldown=args.alert_cooldown)
+        for expression in args.alert
+    ]
+    if api_class is None:
+        rules += load_alerts(args.targets)
+    alerts = None
+    if rules:
+        notifiers = [parse_notifier(spec) for spec in args.alert_notify or ["stdout"]]
+        alerts = AlertEngine(rules, notifiers)
+        for target in targets:
+            target.alerts = alerts
 
-            try:
-                # Fetch the API data
-                api_data = fetch_api(api_url)
+    # Roll old history up into coarser tiers in the background
+    compactor = None
+    tiers = args.tiers
+    if store is not None and (len(tiers) > 1 or any(t.retention for t in tiers)):
+        compactor = Compactor(store, tiers)
+        compactor.start()
 
-                # Pass the API data to the API class
-                api.configuration(api_data)
+    # Cache responses so unchanged data is revalidated or served locally
+    if not args.no_cache:
+        get_fetcher().cache = ResponseCache(cache_dir=args.cache_dir)
+
+    # Keep requests within each provider's call budget
+    if not args.no_rate_limit:
+        quotas = dict(DEFAULT_QUOTAS)
+        quotas.update({host: (minute, day) for host, minute, day in args.quota})
+        get_fetcher().limiter = RateLimiter(quotas)
+
+    # Start the API Watchdog
+    console_log.info(
+        f"Starting API Watchdog with {len(targets)} target(s), {args.engine} engine"
+    )
 
-                # Log that the API data was fetched successfully
-                console_log.info("API data fetched successfully")
-            except Exception as e:
-                # Log that there was an error fetching the API data
-                console_log.error(f"Error fetching API data: {e}")
+    if args.engine == "async":
+        from api_watchdog.utils.async_engine import AsyncEngine
 
-            # Log that we are sleeping
-            console_log.info(f"Sleeping for {interval} seconds...")
+        # Poll targets concurrently so a slow endpoint only delays itself
+        engine = AsyncEngine(
+            max_concurrency=args.max_concurrency,
+            per_host=args.per_host,
+            jitter=args.jitter,
+        )
+        run = partial(
+            engine.run_forever, targets, partial(poll_target, console_log=console_log)
+        )
+    else:
+        # One scheduler drives every target; each one is a heap entry, not a thread
+        engine = Scheduler()
+        for target in targets:
+            engine.add(
+                target.name,
+                partial(poll_target, target, console_log),
+                target.interval,
+                jitter=args.jitter,
+            )
+        run = engine.run_forever
 
-            # Sleep for the specified interval
-            time.sleep(interval)
+    # Main loop of the program
+    try:
+        run()
     except KeyboardInterrupt:
         # User stopped the program with Ctrl+C
         console_log.info("API Watchdog stopped by user")
     except Exception as e:
         # There was an error with the program
         console_log.error(f"API Watchdog stopped due to error: {e}")
+    finally:
+        # Report the engine's counters, so per-target overhead can be tracked
+        stats = engine.stats()
+        console_log.info(
+            "Engine: "
+            + ", ".join(
+                f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                for key, value in stats.items()
+            )
+        )
+
+        if alerts is not None:
+            stats = alerts.stats()
+            console_log.info(
+                f"Alerts: {stats['fired']} fired, {stats['suppressed']} suppressed by cooldown"
+            )
+
+        # Report what batching saved, whether responses were logged or
+        # written as records
+        for target in targets:
+            if hasattr(target.api, "requests_per_symbol"):
+                console_log.info(
+                    f"Batch {target.name}: {target.api.requests_per_symbol():.3f} "
+                    f"requests per symbol ({target.api.requests} requests, "
+                    f"{target.api.quotes} quotes)"
+                )
+
+        # Report the rolling statistics of every series
+        if analytics is not None:
+            for series, stats in analytics.stats().items():
+                summary = ", ".join(
+                    f"{name} mean={value['mean']:.4g} std={value['std']:.3g} "
+                    f"trend={value['trend']:+.3g}/h"
+                    for name, value in stats.items()
+                    if name != "vwap"
+                )
+                if "vwap" in stats:
+                    summary += f", vwap={stats['vwap']:.4g}"
+                console_log.info(f"Analytics {series}: {summary}")
+
+        # Report how well the pooled connections were reused, then close them
+        fetcher = get_fetcher()
+        if fetcher.limiter is not None:
+            for bucket, status in fetcher.limiter.status().items():
+                exhausts_in = status["exhausts_in"]
+                console_log.info(
+                    f"Quota {bucket}: {status['remaining']}/{status['budget']} left"
+                    + (f", exhausted in {exhausts_in:.0f}s" if exhausts_in else "")
+                )
+        if fetcher.cache is not None:
+            stats = fetcher.cache.stats()
+            console_log.info(
+                f"Response cache: {stats['hits']} hits, "
+                f"{stats['revalidated']} revalidated, {stats['misses']} misses"
+            )
+        stats = fetcher.flights.stats()
+        console_log.info(
+            f"Coalesced fetches: {stats['shared']} shared, {stats['leaders']} sent"
+        )
+        for host, stats in fetcher.pool_stats().items():
+            console_log.info(
+                f"Connection pool {host}: {stats['hits']} hits, {stats['misses']} misses"
+            )
+        fetcher.close()
+        close_sinks()
+        if compactor is not None:
+            compactor.stop()
+        if store is not None:
+            store.close()
+
+        # Write out any queued log records before exiting
+        if args.log_queue:
+            stats = get_pipeline().stats()
+            console_log.info(
+                f"Log queue: {stats['written']} written in {stats['batches']} batches, "
+                f"{stats['dropped']} dropped"
+            )
+            stop_queue_logging()
@@ -1,71 +1,570 @@
 import argparse
-from api_watchdog.utils.api_configuration import WeatherConfig, StockConfig
+import math
+import sys
+from datetime import datetime
+from api_watchdog.utils.alerts import compile_condition, split_notifier
+from api_watchdog.utils.downsample import DEFAULT_TIERS, parse_tiers
+from api_watchdog.utils.log_rotation import parse_duration, parse_size
+from api_watchdog.utils.registry import get_plugin, is_builtin, plugins
 
 
-def parse_args() -> argparse.Namespace:
+def checked(parse):
     """
-    Parse command-line arguments for the API Watchdog CLI.
+    Wrap a parser so that its ValueError is reported as a usage error.
 
-    The CLI supports two subcommands: "weather" and "stock". The "weather"
-    subcommand requires the --location argument and supports the --interval
-    and --log-file arguments. The "stock" subcommand requires the --stock
-    argument and supports the --interval and --log-file arguments.
+    Args:
+        parse (callable): Converts an option value, raising ValueError.
 
     Returns:
-        argparse.Namespace: The parsed arguments.
+        callable: The argparse ``type`` for the option.
     """
 
-    parser = argparse.ArgumentParser(description="CLI for API Watchdog")
-    subparsers = parser.add_subparsers(dest="api", required=True)
+    def convert(value):
+        try:
+            return parse(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    return convert
+
+
+def positive_int(value: str) -> int:
+    """
+    Parse an option that must be a whole number above zero.
+
+    Args:
+        value (str): The option value.
+
+    Returns:
+        int: The number.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {number}")
+    return number
+
+
+def alert_condition(value: str) -> str:
+    """
+    Parse an --alert option, rejecting conditions that do not compile.
+
+    Args:
+        value (str): The option value.
+
+    Returns:
+        str: The condition.
+    """
+    compile_condition(value)
+    return value
+
+
+def notifier_spec(value: str) -> str:
+    """
+    Parse an --alert-notify option, rejecting unknown notifiers.
+
+    Args:
+        value (str): The option value.
+
+    Returns:
+        str: The notifier spec, created once the run starts.
+    """
+    split_notifier(value)
+    return value
+
+
+def add_engine_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the options that select and tune the fetch engine to a subcommand.
+
+    Args:
+        parser (argparse.ArgumentParser): The subcommand parser.
+    """
+    parser.add_argument(
+        "--engine",
+        "-e",
+        choices=["sync", "async"],
+        default="sync",
+        help="Fetch targets one at a time (sync) or concurrently (async)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=positive_int,
+        default=10,
+        help="Maximum number of fetches in flight with --engine async",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=positive_int,
+        default=2,
+        help="Maximum number of fetches in flight per host with --engine async",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Spread targets over a random phase offset of up to this many seconds",
+    )
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the options that control the HTTP response cache to a subcommand.
 
-    weather_parser = subparsers.add_parser("weather", help="Monitor the weather API")
-    weather_parser.set_defaults(api=WeatherConfig)
-    weather_parser.add_argument(
-        "--location",
-        "-L",
+    Args:
+        parser (argparse.ArgumentParser): The subcommand parser.
+    """
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory to persist cached API responses in across restarts",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always download and parse full API responses",
+    )
+
+
+def parse_quota(value: str) -> tuple:
+    """
+    Parse a quota given as HOST=PER_MINUTE/PER_DAY.
+
+    Either budget may be left empty (e.g. "api.example.com=60/") to leave
+    that window unlimited.
+
+    Args:
+        value (str): The option value.
+
+    Returns:
+        tuple: (host, per_minute, per_day)
+    """
+    host, _, budgets = value.partition("=")
+    per_minute, _, per_day = budgets.partition("/")
+    try:
+        return (
+            host.strip(),
+            int(per_minute) if per_minute.strip() else None,
+            int(per_day) if per_day.strip() else None,
+        )
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid quota {value!r}")
+
+
+def add_rate_limit_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the options that control API quota enforcement to a subcommand.
+
+    Args:
+        parser (argparse.ArgumentParser): The subcommand parser.
+    """
+    parser.add_argument(
+        "--quota",
+        type=parse_quota,
+        action="append",
+        default=[],
+        metavar="HOST=PER_MINUTE/PER_DAY",
+        help="Override the call budget for an API host (repeatable)",
+    )
+    parser.add_argument(
+        "--no-rate-limit",
+        action="store_true",
+        help="Send requests without checking the API quotas",
+    )
+
+
+def add_output_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the options that control what is written for each response.
+
+    Args:
+        parser (argparse.ArgumentParser): The subcommand parser.
+    """
+    parser.add_argument(
+        "--log-mode",
+        choices=["all", "changes"],
+        default="all",
+        help="Log every field on every response, or only fields that changed",
+    )
+    parser.add_argument(
+        "--sink",
+        choices=["log", "jsonl"],
+        default="log",
+        help="Write text log lines, or one JSON record per observation",
+    )
+    parser.add_argument(
+        "--sink-file",
+        type=str,
+        default=None,
+        help="JSONL file for --sink jsonl (default: the log file with a .jsonl suffix)",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Keep the numeric fields of every observation in a time-series store",
+    )
+    parser.add_argument(
+        "--tiers",
+        type=checked(parse_tiers),
+        default=DEFAULT_TIERS,
+        metavar="SPEC",
+        help="Downsampling tiers and retention for --store, finest first "
+        f"(default: {DEFAULT_TIERS}; 'raw' keeps raw rows forever)",
+    )
+    parser.add_argument(
+        "--analytics-window",
+        type=positive_int,
+        default=None,
+        metavar="N",
+        help="Keep rolling statistics over the last N observations of each "
+        "target (requires numpy)",
+    )
+    parser.add_argument(
+        "--alert",
+        action="append",
+        type=checked(alert_condition),
+        default=[],
+        metavar="CONDITION",
+        help='Alert when a condition holds, e.g. "temp < 0", "failures >= 3" or '
+        '"close change > 2%% within 15m" (repeatable)',
+    )
+    parser.add_argument(
+        "--alert-notify",
+        action="append",
+        type=checked(notifier_spec),
+        default=[],
+        metavar="NOTIFIER",
+        help="Where to send alerts: stdout, file:PATH or webhook:URL "
+        "(repeatable, default stdout)",
+    )
+    parser.add_argument(
+        "--alert-cooldown",
+        type=checked(parse_duration),
+        default=300.0,
+        metavar="DURATION",
+        help="Do not repeat an alert for the same target within this time",
+    )
+    parser.add_argument(
+        "--log-queue",
+        action="store_true",
+        help="Format and write logs on a background thread instead of the fetch thread",
+    )
+    parser.add_argument(
+        "--log-flush-interval",
+        type=float,
+        default=1.0,
+        help="Longest time a queued log line stays unwritten, in seconds",
+    )
+    parser.add_argument(
+        "--log-queue-size",
+        type=int,
+        default=10000,
+        help="Most log records waiting to be written with --log-queue",
+    )
+    parser.add_argument(
+        "--log-overflow",
+        choices=["block", "drop"],
+        default="block",
+        help="Wait for room or drop the record when the log queue is full",
+    )
+
+
+def add_rotation_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the options that rotate and prune the log files to a subcommand.
+
+    Args:
+        parser (argparse.ArgumentParser): The subcommand parser.
+    """
+
+    parser.add_argument(
+        "--log-max-size",
+        type=checked(parse_size),
+        default=None,
+        metavar="SIZE",
+        help="Rotate a log file before it grows past this size (e.g. 10M)",
+    )
+    parser.add_argument(
+        "--log-rotate-every",
+        type=checked(parse_duration),
+        default=None,
+        metavar="DURATION",
+        help="Rotate log files after this long (e.g. 30m, 6h, 1d)",
+    )
+    parser.add_argument(
+        "--log-backups",
+        type=int,
+        default=5,
+        help="Rotated segments to keep per log file",
+    )
+    parser.add_argument(
+        "--log-max-total",
+        type=checked(parse_size),
+        default=None,
+        metavar="SIZE",
+        help="Most bytes of rotated segments to keep per log file (e.g. 1G)",
+    )
+    parser.add_argument(
+        "--no-log-compress",
+        action="store_true",
+        help="Keep rotated segments uncompressed",
+    )
+
+
+def parse_time(value: str) -> int:
+    """
+    Parse a time given as Unix seconds or an ISO 8601 date and time (local
+    time unless it carries an offset) into Unix milliseconds.
+
+    Args:
+        value (str): The option value.
+
+    Returns:
+        int: The time in Unix milliseconds.
+    """
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        # "inf", "nan" and "1e400" parse as floats but are no time
+        if not math.isfinite(seconds):
+            raise argparse.ArgumentTypeError(f"invalid time {value!r}")
+        try:
+            return int(seconds * 1000)
+        except OverflowError:
+            raise argparse.ArgumentTypeError(f"invalid time {value!r}")
+    try:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+    except (ValueError, OverflowError, OSError):
+        raise argparse.ArgumentTypeError(f"invalid time {value!r}")
+
+
+def add_api_parser(subparsers, plugin):
+    """
+    Add the subcommand that monitors one API.
+
+    Args:
+        subparsers: The result of ``ArgumentParser.add_subparsers``.
+        plugin (APIPlugin): The API; its configuration is not imported.
+    """
+    api_parser = subparsers.add_parser(plugin.name, help=plugin.help)
+    api_parser.set_defaults(api=plugin.name)
+    option = "--" + plugin.var.replace("_", "-")
+    api_parser.add_argument(
+        *([option, plugin.short] if plugin.short else [option]),
+        dest=plugin.var,
         type=str,
         required=True,
-        help="Location to monitor",
+        help=plugin.arg_help,
     )
-    weather_parser.add_argument(
+    api_parser.add_argument(
         "--interval",
         "-i",
-        type=int,
-        default=5,
+        type=positive_int,
+        default=plugin.interval,
         help="Interval between API calls in seconds",
     )
-    weather_parser.add_argument(
+    api_parser.add_argument(
         "--log-file",
         "-l",
         type=str,
-        default="weather_api_watchdog.log",
+        default=plugin.log_file,
         help="File to log API responses to",
     )
+    add_engine_arguments(api_parser)
+    add_cache_arguments(api_parser)
+    add_rate_limit_arguments(api_parser)
+    add_output_arguments(api_parser)
+    add_rotation_arguments(api_parser)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command-line arguments for the API Watchdog CLI.
+
+    The CLI supports six subcommands: "weather", "stock", "stocks", "run",
+    "query" and "check", plus one per API plugin installed (see registry).
+    The "weather" subcommand requires the --location argument and
+    supports the --interval and --log-file arguments. The "stock" subcommand
+    requires the --stock argument and supports the --interval and --log-file
+    arguments. The "stocks" subcommand takes a comma-separated --stocks list
+    and fetches the quotes in batched requests.
+    The "run" subcommand requires the --targets argument, a TOML file listing
+    many weather and stock targets to monitor from a single process. Every
+    subcommand supports --engine to choose between serial and concurrent
+    fetching, --cache-dir/--no-cache to control the response cache,
+    --quota/--no-rate-limit to control the API call budgets, --log-mode
+    to log only the fields that changed, --sink to write structured JSONL
+    records, --log-queue to write logs from
+    a background thread and --log-max-size/--log-rotate-every to rotate the
+    log files. The "query" subcommand prints the history kept with --store.
+    The "check" subcommand fetches targets once, within a deadline, and
+    exits with a status that reports failures.
+
+    Args:
+        argv (list): The arguments to parse, defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments; ``api`` is the selected
+        API's configuration class, or None for "run" and "query".
+    """
+
+    parser = argparse.ArgumentParser(description="CLI for API Watchdog")
+    subparsers = parser.add_subparsers(dest="api", required=True)
+
+    # One subcommand per API. Installed plugins are only looked up when the
+    # subcommand is not built in (or for --help), so they cost nothing
+    # when a built-in API is monitored
+    if argv is None:
+        argv = sys.argv[1:]
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    installed = command is None or not (
+        is_builtin(command) or command in ("run", "query", "check")
+    )
+    for plugin in plugins(installed=installed):
+        add_api_parser(subparsers, plugin)
 
-    stock_parser = subparsers.add_parser("stock", help="Monitor the stock API")
-    stock_parser.set_defaults(api=StockConfig)
-    stock_parser.add_argument(
-        "--stock",
-        "-s",
+    run_parser = subparsers.add_parser(
+        "run", help="Monitor every target listed in a targets file"
+    )
+    run_parser.set_defaults(api=None, command="run")
+    run_parser.add_argument(
+        "--targets",
+        "-t",
         type=str,
         required=True,
-        help="Stock to monitor",
+        help="TOML file listing the targets to monitor",
     )
-    stock_parser.add_argument(
+    run_parser.add_argument(
         "--interval",
         "-i",
-        type=int,
+        type=positive_int,
         default=5,
-        help="Interval between API calls in seconds",
+        help="Interval for targets that do not set one, in seconds",
     )
-    stock_parser.add_argument(
-        "--log-file",
-        "-l",
+    add_engine_arguments(run_parser)
+    add_cache_arguments(run_parser)
+    add_rate_limit_arguments(run_parser)
+    add_output_arguments(run_parser)
+    add_rotation_arguments(run_parser)
+
+    query_parser = subparsers.add_parser(
+        "query", help="Print the stored history of a target"
+    )
+    query_parser.set_defaults(api=None, command="query")
+    query_parser.add_argument(
+        "--store",
         type=str,
-        default="stock_api_watchdog.log",
-        help="File to log API responses to",
+        required=True,
+        metavar="DIR",
+        help="The time-series store written with --store",
     )
+    query_parser.add_argument(
+        "--target",
+        "-t",
+        type=str,
+        default=None,
+        help="The target to read; lists the stored targets when omitted",
+    )
+    query_parser.add_argument(
+        "--start",
+        type=parse_time,
+        default=None,
+        help="First time to include (Unix seconds or ISO 8601)",
+    )
+    query_parser.add_argument(
+        "--end",
+        type=parse_time,
+        default=None,
+        help="Last time to include (Unix seconds or ISO 8601)",
+    )
+    query_parser.add_argument(
+        "--columns",
+        type=lambda value: [c.strip() for c in value.split(",") if c.strip()],
+        default=None,
+        help="Comma-separated columns to print (default: all)",
+    )
+    query_parser.add_argument(
+        "--resolution",
+        type=checked(parse_duration),
+        default=None,
+        metavar="DURATION",
+        help="Coarsest acceptable spacing between rows (e.g. 1m, 1h); "
+        "reads from the matching downsampled tier",
+    )
+    query_parser.add_argument(
+        "--rolling",
+        type=positive_int,
+        default=None,
+        metavar="N",
+        help="Print rolling statistics over the last N rows instead of the "
+        "rows themselves (requires numpy)",
+    )
+    query_parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="Output format",
+    )
+
+    check_parser = subparsers.add_parser(
+        "check",
+        help="Fetch targets once and exit with a status that reports failures",
+    )
+    check_parser.set_defaults(api=None, command="check")
+    check_parser.add_argument(
+        "specs",
+        nargs="*",
+        metavar="API=ARGUMENT",
+        help="Targets to check, e.g. weather=Chennai stock=IBM",
+    )
+    check_parser.add_argument(
+        "--targets",
+        "-t",
+        type=str,
+        default=None,
+        help="TOML file listing more targets to check",
+    )
+    check_parser.add_argument(
+        "--deadline",
+        type=checked(parse_duration),
+        default=30.0,
+        metavar="DURATION",
+        help="Give up on targets still unfinished after this long (e.g. 10, 1m)",
+    )
+    check_parser.add_argument(
+        "--max-concurrency",
+        type=positive_int,
+        default=10,
+        help="Maximum number of targets fetched at once",
+    )
+    check_parser.add_argument(
+        "--retries",
+        type=positive_int,
+        default=2,
+        help="Attempts per target for temporary failures",
+    )
+    check_parser.add_argument(
+        "--format",
+        choices=["text", "jsonl"],
+        default="text",
+        help="Print one line per target, or one JSON object with its records",
+    )
+    add_cache_arguments(check_parser)
+    add_rate_limit_arguments(check_parser)
 
     parser.add_argument("--cli", "-c", action="store_true", help="Run in CLI mode")
+    parser.set_defaults(command="monitor")
+
+    args = parser.parse_args(argv)
 
-    return parser.parse_args()
+    # Import only the configuration class of the selected API
+    if isinstance(args.api, str):
+        args.api = get_plugin(args.api).load()
+    return args
@@ -1,12 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
-import time
-from api_watchdog.utils.api_configuration import WeatherConfig, StockConfig
+from api_watchdog.utils.chart import LiveChart
+from api_watchdog.utils.registry import plugins
 from api_watchdog.utils.gui_utils import (
     api_selector,
+    chart_canvas,
+    chart_panel,
     interval_selector,
     log_file_selector,
+    monitor_list,
     select_api_args,
 )
 
@@ -34,7 +36,15 @@ class APIWatchdogGUI:
         self.log_file = None
         self.start_button = None
         self.set_button = None
-        self.values_dict = {"Weather": WeatherConfig, "Stock": StockConfig}
+        self.monitor_list = None
+        self.chart_panel = None
+        # The live chart of every monitor, by monitor ID
+        self.charts = {}
+        # The IDs of the monitors shown in monitor_list, line by line
+        self.monitor_ids = []
+        # The APIs to choose from, by GUI label; a configuration class is
+        # only imported once its API is started
+        self.values_dict = {plugin.label: plugin for plugin in plugins()}
         self.started = False
 
         # Set up the user interface
@@ -108,38 +118,59 @@ class APIWatchdogGUI:
         )
         self.set_button.grid(column=0, row=6, columnspan=2, pady=5)
 
-    def start(self):
-        """Start the API Watchdog monitoring."""
-        if not self.validate_entries():
-            return
-            
-        self.started = True
-        self.start_button.config(text="Stop")
-        
-        # Start the monitoring thread
-        self.monitor_thread = threading.Thread(target=self.monitor_api, daemon=True)
-        self.monitor_thread.start()
-    
-    def stop(self):
-        """Stop the API Watchdog monitoring."""
-        self.started = False
-        self.start_button.config(text="Start")
-    
-    def monitor_api(self):
-        """Monitor the API at regular intervals."""
-        while self.started:
-            try:
-                # Get the API configuration
-                api_class, interval, log_file, args = self.get_args()
-                
-                # Here you would typically call your API and update the UI
-                # For now, we'll just sleep for the interval
-                time.sleep(interval)
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error monitoring API: {str(e)}")
-                self.stop()
-    
+        # Add the list of running monitors
+        self.monitor_list = monitor_list(self.frame)
+        # Add the panel of live charts, one tab per monitor
+        self.chart_panel = chart_panel(self.frame)
+
+    def add_chart(self, monitor) -> LiveChart:
+        """
+        Show a live chart of a monitor in a new tab.
+
+        Args:
+            monitor (Monitor): The monitor whose observations are charted.
+
+        Returns:
+            LiveChart: The chart, fed by the monitor.
+        """
+        canvas = chart_canvas(self.chart_panel, f"#{monitor.id}")
+        chart = LiveChart(canvas)
+        # Redraw at the new size when the window is resized
+        canvas.bind("<Configure>", lambda event: chart.schedule())
+        self.charts[monitor.id] = chart
+        return chart
+
+    def remove_chart(self, monitor_id):
+        """
+        Remove the chart of a stopped monitor.
+
+        Args:
+            monitor_id (int): The ID of the monitor.
+        """
+        chart = self.charts.pop(monitor_id, None)
+        if chart is not None:
+            chart.close()
+            chart.canvas.destroy()
+
+    def show_monitors(self, monitors):
+        """
+        Show the running monitors in the monitor list.
+
+        Args:
+            monitors (list): The running Monitor instances.
+        """
+        self.monitor_list.delete(0, "end")
+        self.monitor_ids = [monitor.id for monitor in monitors]
+        for monitor in monitors:
+            self.monitor_list.insert("end", f"#{monitor.id} {monitor.label}")
+
+    def selected_monitor(self):
+        """
+        Returns the ID of the monitor selected in the list, or None.
+        """
+        selection = self.monitor_list.curselection()
+        return self.monitor_ids[selection[0]] if selection else None
+
     def start_api(self):
         """Start the API Watchdog application."""
         self.started = True  # Mark the application as started
@@ -171,7 +202,8 @@ class APIWatchdogGUI:
             A tuple containing the API class, interval, log file, and arguments.
         """
         api_type = self.api_type.get()
-        api_class = self.values_dict.get(api_type)
+        plugin = self.values_dict.get(api_type)
+        api_class = plugin.load() if plugin is not None else None
         interval = self.interval.get()
         log_file = self.log_file.get()
 
@@ -1,9 +1,13 @@
 from api_watchdog.core_gui_and_cli.gui import APIWatchdogGUI
-from api_watchdog.utils.gui_utils import stop_button
-from api_watchdog.monitor_api_gui import monitor_api
-from threading import Thread
+from api_watchdog.utils.gui_utils import quit_button, stop_button
+from api_watchdog.monitor_api_gui import MonitorManager
 import tkinter as tk
 from api_watchdog.utils.logger import get_logger
+from api_watchdog.utils.log_queue import start_queue_logging, stop_queue_logging
+from api_watchdog.utils.api_fetcher import get_fetcher
+from api_watchdog.utils.http_cache import ResponseCache
+from api_watchdog.utils.rate_limit import RateLimiter
+from api_watchdog.utils.fetch_pool import FetchPool
 
 
 def run_gui():
@@ -11,26 +15,53 @@ def run_gui():
     # Initialize the GUI
     root = tk.Tk()
     app = APIWatchdogGUI(root)
+
+    # Keep log writes out of the Tk callbacks that poll the APIs
+    start_queue_logging()
     logger = get_logger("api_watchdog", log_to_console=True, log_to_file=False)
 
+    # Let monitors revalidate unchanged responses instead of re-downloading
+    # them, and keep them within each provider's call budget
+    get_fetcher().cache = ResponseCache()
+    get_fetcher().limiter = RateLimiter()
+
+    # Fetch on worker threads; Tk only runs the callbacks of finished fetches
+    pool = FetchPool(root)
+    # Track the running monitors so they can be stopped one by one
+    manager = MonitorManager(root, pool)
+
     def stop_button_clicked():
-        """Stop the GUI."""
+        """Stop the monitor selected in the list."""
+        monitor_id = app.selected_monitor()
+        if monitor_id is None:
+            logger.info("Select a monitor to stop")
+            return
+        manager.stop(monitor_id)
+        app.remove_chart(monitor_id)
+        app.show_monitors(manager.monitors())
+        app.started = len(manager) > 0
+
+    def quit_button_clicked():
+        """Stop every monitor and the GUI."""
         logger.info("Stopping GUI...")
         root.quit()
 
     def on_start():
-        """Start monitoring the API in a separate thread."""
+        """Start monitoring the API, fetching on the pool's workers."""
+        # Reject an empty form or an interval that is not positive
+        if not app.validate_entries():
+            return
         # Get GUI arguments
         try:
             api_class, interval, log_file, args = app.get_args()
 
-            # Start monitoring in a separate thread
-            monitor_thread = Thread(
-                target=monitor_api,
-                args=(api_class, interval, log_file, args, root),
-                daemon=True,
-            )
-            monitor_thread.start()
+            # Schedule the monitor on the Tk thread; its fetches run on the
+            # pool. Starting an API that is already monitored does nothing
+            monitor = manager.start(api_class, interval, log_file, args)
+            if monitor.chart is None:
+                # Chart the numeric fields of the monitor's observations
+                monitor.chart = app.add_chart(monitor)
+            app.show_monitors(manager.monitors())
             app.started = True
         except Exception as e:
             logger.error(f"Error starting monitoring: {e}")
@@ -38,5 +69,18 @@ def run_gui():
     # Update the start button command
     app.start_button.config(command=on_start)
     stop_button(app.frame, command=stop_button_clicked)
+    quit_button(app.frame, command=quit_button_clicked)
+    root.protocol("WM_DELETE_WINDOW", quit_button_clicked)
     # Start the GUI
     root.mainloop()
+
+    # Cancel the fetches, close the monitors' log files and connections,
+    # and report how long the window was kept busy
+    manager.stop_all()
+    pool.close()
+    stats = pool.stats()
+    logger.info(
+        f"Fetch pool: {stats['completed']} fetches, {stats['pending']} pending, "
+        f"longest drain {stats['drain_max_ms']:.1f} ms"
+    )
+    stop_queue_logging()
@@ -1,108 +1,364 @@
-from api_watchdog.utils.api_fetcher import fetch_api
-from api_watchdog.utils.logger import get_logger
+from api_watchdog.utils.api_fetcher import get_fetcher
+from api_watchdog.utils.logger import close_logger, get_logger
+from api_watchdog.utils.rate_limit import RateLimited
+from api_watchdog.utils.resilience import Cancelled, CircuitOpen
+from api_watchdog.utils.scheduler import Cadence, lag_stats
+from api_watchdog.utils.timeseries import column_values
 from pathlib import Path
+import itertools
+from functools import partial
+import threading
+import time
+from urllib.parse import urlsplit
 import hashlib
 
 
-def monitor_api(api_class, interval, log_file, args, root):
+class Monitor:
     """
-    Run the API monitoring in a separate thread.
-
-    Parameters
-    ----------
-    api_class : type
-        The class of the API to monitor.
-    interval : int
-        The interval in seconds at which to update the API data.
-    log_file : str or None
-        The path to the log file to write to, or None to use the default.
-    args : list of str
-        The command line arguments to pass to the API class.
-    root : tk.Tk
-        The root Tk widget of the GUI.
-
-    Notes
-    -----
-    This function creates an API instance and starts a loop that fetches the API
-    data at the specified interval and updates the GUI accordingly. If there is
-    an error fetching the API data, it logs the error and continues to the next
-    iteration. If there is an error in the loop itself, it logs the error and
-    exits.
+    One API monitored from the GUI.
+
+    The monitor's ticks are scheduled on the Tk thread and its fetches run
+    on the pool's workers. It has at most one fetch in flight, so a slow or
+    dead API delays only its own ticks and never blocks the window.
+
+    Attributes:
+        id (int): The monitor's number, unique within its MonitorManager.
+        label (str): A description shown in the GUI, e.g. "location=Oslo".
+        api: The API configuration instance.
+        api_url (str): The URL fetched on every tick.
+        log_names (tuple): The names of the monitor's file and console loggers.
+        cadence (Cadence): The grid of due times of the monitor's ticks.
+        cancel (threading.Event): Set when the monitor is stopped; it stops
+            a fetch in flight at its next attempt or backoff.
+        running (bool): False once the monitor is stopped.
+        fetching (bool): True while a fetch is on the pool, until its
+            result has been handled on the Tk thread.
+        on_finished (callable): Called on the Tk thread once a stopped
+            monitor's last fetch is back, or None.
+        chart (LiveChart): Shows the numeric fields of every observation,
+            or None.
     """
 
-    try:
-        # Ensure that the 'logs' directory exists, creating it if necessary
-        logs_dir = Path("logs")
-        logs_dir.mkdir(exist_ok=True)
+    def __init__(self, id: int, label: str, api, log_names: tuple, root, pool, fetcher):
+        """
+        Initialize the Monitor instance.
+
+        Args:
+            id (int): The monitor's number.
+            label (str): A description shown in the GUI.
+            api: The API configuration instance, logging to ``log_names[0]``.
+            log_names (tuple): The names of the file and console loggers.
+            root (tk.Tk): The root Tk widget, whose ``after`` schedules ticks.
+            pool (FetchPool): Runs the fetches off the Tk thread.
+            fetcher (APIFetcher): The fetcher shared by every monitor.
+        """
+        self.id = id
+        self.label = label
+        self.api = api
+        self.api_url, interval, _ = api.get_config()
+        self.log_names = log_names
+        self.root = root
+        self.pool = pool
+        self.fetcher = fetcher
+        self.console_log = get_logger(
+            name=log_names[1], log_to_console=True, log_to_file=False
+        )
+        # Fire on a fixed monotonic grid so fetch time does not make the
+        # schedule drift
+        self.cadence = Cadence(int(interval), time.monotonic())
+        self.cancel = threading.Event()
+        self.running = False
+        self.fetching = False
+        self.on_finished = None
+        self.chart = None
+        self._last_version = None
+        self._after_id = None
+
+    @property
+    def host(self) -> str:
+        """The host of the monitored URL."""
+        return urlsplit(self.api_url).netloc
+
+    def start(self):
+        """Start monitoring with a first fetch; call on the Tk thread."""
+        self.running = True
+        self.tick()
+
+    def stop(self):
+        """
+        Stop monitoring; call on the Tk thread.
+
+        The next tick is unscheduled and a fetch in flight is cancelled,
+        even mid-backoff; its result, if any, is discarded.
+        """
+        self.running = False
+        self.cancel.set()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self.chart is not None:
+            self.chart.close()
+
+    def tick(self):
+        """Hand the next fetch to the pool; runs on the Tk thread."""
+        self._after_id = None
+        # Record how late this tick fired relative to its grid point
+        self.cadence.fire(time.monotonic())
+
+        # Log the start of the API data fetching process
+        self.console_log.info("Fetching API data...")
+        self.fetching = self.pool.submit(self.fetch_and_update, self.done)
+
+    def fetch_and_update(self):
+        """
+        Fetch API data and update the application, on a worker thread.
+
+        Returns:
+            tuple: The seconds to wait before the next fetch when the API
+            quota or the host's circuit breaker do not allow one (else None),
+            the Unix time of the fetch and the numeric values of each new
+            observation.
 
-        # Set the default log file path within the 'logs' directory
-        log_file_path = str(logs_dir / "api_watchdog.log")
+        Raises:
+            Cancelled: If the monitor was stopped during the fetch.
+        """
+        fetched_at = time.time()
+        try:
+            # Attempt to fetch the API data using the provided URL
+            result = self.fetcher.fetch(
+                self.api_url,
+                projection=getattr(self.api, "projection", None),
+                cancel=self.cancel,
+            )
+        except (RateLimited, CircuitOpen) as e:
+            # Nothing was sent; wait for the quota to refill or the
+            # host to recover
+            self.console_log.warning(str(e))
+            return e.retry_after, fetched_at, []
+        # Do not write to the log files of a stopped monitor
+        if self.cancel.is_set():
+            raise Cancelled(self.api_url)
+
+        # Pass the fetched data to the API class for processing,
+        # telling it when the response has not changed
+        not_modified = (
+            result.version is not None and result.version == self._last_version
+        )
+        self._last_version = result.version
+        self.api.configuration(result.data, not_modified=not_modified)
+
+        # Read the values to chart here rather than on the Tk thread; batched
+        # APIs chart each symbol's values separately
+        observations = []
+        if not not_modified and result.data is not None and hasattr(self.api, "extract"):
+            for fields in self.api.extract(result.data):
+                values = column_values(fields)
+                if hasattr(self.api, "symbols"):
+                    values = {f"{fields['symbol']} {k}": v for k, v in values.items()}
+                observations.append(values)
+
+        # Log successful fetching and configuration of API data
+        self.console_log.info("API data fetched successfully")
+
+        # Log how often the connection to this host was reused
+        stats = self.fetcher.pool_stats().get(self.host)
+        if stats:
+            self.console_log.info(
+                f"Connection pool {self.host}: {stats['hits']} hits, {stats['misses']} misses"
+            )
+        return None, fetched_at, observations
+
+    def done(self, outcome, error):
+        """Chart the observations and schedule the next tick, on the Tk thread."""
+        self.fetching = False
+        if not self.running:
+            # The worker is done with the monitor's loggers and connections
+            if self.on_finished is not None:
+                self.on_finished()
+                self.on_finished = None
+            return
+        defer = None
+        if error is not None:
+            # Log any errors encountered during the fetching process
+            self.console_log.error(f"Error fetching API data: {error}")
+        else:
+            defer, fetched_at, observations = outcome
+            if self.chart is not None:
+                for values in observations:
+                    self.chart.add(fetched_at, values)
+
+        # Schedule the next API data fetch at the next grid point,
+        # skipping any that were missed while this one ran or that
+        # the API quota or the host's circuit breaker do not allow
+        now = time.monotonic()
+        self.cadence.advance(now)
+        if defer:
+            self.cadence.defer(now + defer)
+        # Convert seconds to milliseconds for tkinter's after method
+        self._after_id = self.root.after(
+            int(self.cadence.delay(now) * 1000), self.tick
+        )
+
+
+class MonitorManager:
+    """
+    Tracks the monitors started from the GUI.
 
-        # Use the provided log file path if it is valid, otherwise use the default
+    Each monitor gets an ID it can be stopped by. Starting an API whose URL
+    is already monitored returns the running monitor instead of fetching
+    the same URL twice. Stopping a monitor cancels its fetch and closes the
+    log files and pooled connections no other monitor uses.
+
+    Attributes:
+        root (tk.Tk): The root Tk widget.
+        pool (FetchPool): Runs the fetches off the Tk thread.
+        fetcher (APIFetcher): The fetcher shared by every monitor.
+    """
+
+    def __init__(self, root, pool, fetcher=None):
+        """
+        Initialize the MonitorManager instance.
+
+        Args:
+            root (tk.Tk): The root Tk widget.
+            pool (FetchPool): Runs the fetches off the Tk thread.
+            fetcher (APIFetcher): The fetcher to use, defaults to the one
+                shared by the process.
+        """
+        self.root = root
+        self.pool = pool
+        self.fetcher = fetcher or get_fetcher()
+        self._monitors = {}
+        # Stopped monitors whose last fetch is still on the pool
+        self._stopping = {}
+        self._ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._monitors)
+
+    def __contains__(self, monitor_id) -> bool:
+        return monitor_id in self._monitors
+
+    def monitors(self) -> list:
+        """Returns the running monitors, in the order they were started."""
+        return list(self._monitors.values())
+
+    def start(self, api_class, interval, log_file, args) -> Monitor:
+        """
+        Start monitoring an API, unless its URL is already monitored.
+
+        Args:
+            api_class (type): The class of the API to monitor.
+            interval: The seconds between fetches, as an int or a string;
+                60 if empty.
+            log_file (str): The path to the log file to write to, or an empty
+                string for logs/api_watchdog.log.
+            args (list): The API arguments; the first one is used.
+
+        Returns:
+            Monitor: The new monitor, or the running one that already
+            fetches the same URL.
+
+        Raises:
+            TypeError: If no API class is given.
+            ValueError: If the interval is not a positive whole number.
+        """
+        if api_class is None:
+            raise TypeError("No API class provided")
+        text = str(interval).strip() if interval is not None else ""
+        try:
+            interval = int(text) if text else 60
+        except ValueError:
+            raise ValueError(f"Interval must be a whole number of seconds, got {text!r}")
+        if interval <= 0:
+            raise ValueError(f"Interval must be positive, got {interval}")
+
+        # Set the default log file path within the 'logs' directory, used
+        # unless a valid log file path is provided
+        log_file_path = str(Path("logs") / "api_watchdog.log")
         if log_file and isinstance(log_file, str) and log_file.strip():
             log_file_path = log_file.strip()
+        else:
+            Path("logs").mkdir(exist_ok=True)
 
         # Create a unique logger name based on the log file path
         log_name = f"api_watchdog_{hashlib.md5(log_file_path.encode()).hexdigest()[:8]}"
-
-        # Initialize a logger for writing logs to file
+        log_names = (log_name, f"{log_name}_console")
         log = get_logger(name=log_name, log_file=log_file_path, log_to_console=False)
-        # Initialize a separate logger for console output
-        console_log = get_logger(
-            name=f"{log_name}_console", log_to_console=True, log_to_file=False
-        )
 
         # Create an instance of the API class with the provided arguments
+        argument = args[0] if args else ""
         api = api_class(
             logger=log,
-            argument=(
-                args[0] if args else ""
-            ),  # Use the first argument or an empty string
-            interval=(
-                int(interval) if interval and interval.isdigit() else 60
-            ),  # Use the provided interval or default to 60 seconds
+            argument=argument,
+            interval=interval,
             log_file=log_file_path,
         )
 
-        # Retrieve the API URL, interval, and log file path from the API instance
-        api_url, interval, _ = api.get_config()
-
-        def fetch_and_update():
-            """Fetch API data and update the application."""
-            try:
-                # Log the start of the API data fetching process
-                console_log.info("Fetching API data...")
-                try:
-                    # Attempt to fetch the API data using the provided URL
-                    api_data = fetch_api(api_url)
-
-                    # Pass the fetched data to the API class for processing
-                    api.configuration(api_data)
-
-                    # Log successful fetching and configuration of API data
-                    console_log.info("API data fetched successfully")
-                except Exception as e:
-                    # Log any errors encountered during the fetching process
-                    console_log.error(f"Error fetching API data: {e}")
-
-                # Schedule the next API data fetch after a specified interval
-                # Convert interval from seconds to milliseconds for tkinter's after method
-                root.after(int(interval) * 1000, fetch_and_update)
-
-            except Exception as e:
-                # Log any errors encountered during the monitoring process
-                console_log.error(f"Error in API monitoring: {e}")
-
-        # Start the monitoring loop by calling the fetch_and_update function
-        fetch_and_update()
-
-    except TypeError:
-        console_log.error("API monitoring failed to start: No API class provided")
-
-    except Exception as e:
-        # Initialize a console logger if an error occurs during setup
-        console_log = get_logger(
-            name="api_watchdog_console_gui", log_to_console=True, log_to_file=False
+        # Merge a duplicate start into the monitor already fetching the URL
+        api_url, api_interval, _ = api.get_config()
+        for monitor in self._monitors.values():
+            if monitor.api_url == api_url:
+                monitor.console_log.info(f"Already monitored as #{monitor.id}")
+                self._release(log_names=log_names)
+                return monitor
+
+        monitor_id = next(self._ids)
+        label = f"{api_class.var}={argument}, every {api_interval}s"
+        monitor = Monitor(
+            monitor_id, label, api, log_names, self.root, self.pool, self.fetcher
         )
-        # Log the error indicating the failure to start API monitoring
-        console_log.error(f"API monitoring failed to start: {e}")
+        self._monitors[monitor_id] = monitor
+        monitor.start()
+        return monitor
+
+    def stop(self, monitor_id: int) -> bool:
+        """
+        Stop a monitor and release what only it used.
+
+        Args:
+            monitor_id (int): The ID of the monitor.
+
+        Returns:
+            bool: False if no monitor with that ID is running.
+        """
+        monitor = self._monitors.pop(monitor_id, None)
+        if monitor is None:
+            return False
+        monitor.stop()
+        # Report how far the monitor's fetches fell behind their schedule
+        stats = lag_stats([monitor.cadence])
+        monitor.console_log.info(
+            f"Stopped monitor #{monitor.id}: lag mean {stats['lag_ms_mean']:.1f} ms, "
+            f"max {stats['lag_ms_max']:.1f} ms, {stats['skipped_ticks']} skipped"
+        )
+        if monitor.fetching:
+            # The worker may still write to the log files; close them once
+            # its fetch is back on the Tk thread
+            self._stopping[monitor_id] = monitor
+            monitor.on_finished = partial(self._finished, monitor)
+        else:
+            self._release(monitor.log_names, monitor.api_url)
+        return True
+
+    def _finished(self, monitor):
+        self._stopping.pop(monitor.id, None)
+        self._release(monitor.log_names, monitor.api_url)
+
+    def stop_all(self):
+        """Stop every monitor."""
+        for monitor_id in list(self._monitors):
+            self.stop(monitor_id)
+
+    def _release(self, log_names=(), api_url=None):
+        # Close the loggers and the host's connections unless a running
+        # monitor, or a stopped one whose fetch is not back yet, uses them
+        users = list(self._monitors.values()) + list(self._stopping.values())
+        in_use = {name for m in users for name in m.log_names}
+        for name in log_names:
+            if name not in in_use:
+                close_logger(name)
+        if api_url is not None:
+            host = urlsplit(api_url).netloc
+            if all(m.host != host for m in users):
+                self.fetcher.release(api_url)
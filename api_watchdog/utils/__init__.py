@@ -1,3 +1,20 @@
-from .api_fetcher import fetch_api
-from .logger import get_logger
-from .api_configuration import StockConfig, WeatherConfig
+# The public helpers, imported on first access so that importing any
+# api_watchdog.utils module does not import requests
+_EXPORTS = {
+    "fetch_api": "api_fetcher",
+    "APIFetcher": "api_fetcher",
+    "get_fetcher": "api_fetcher",
+    "get_logger": "logger",
+    "StockConfig": "api_configuration",
+    "WeatherConfig": "api_configuration",
+    "MultiStockConfig": "api_configuration",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+    return getattr(module, name)
@@ -0,0 +1,456 @@
+import operator
+import queue
+import re
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+from fnmatch import fnmatchcase
+from api_watchdog.utils.log_rotation import parse_duration
+from api_watchdog.utils.record_sink import dumps
+
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# "<field> <op> <number>[%]" or "<field> change <op> <number>[%] within <duration>"
+_RULE = re.compile(
+    r"\s*(?P<field>\w+)\s+(?:(?P<change>change)\s+)?(?P<op><=|>=|==|!=|<|>)\s*"
+    r"(?P<value>-?\d+(?:\.\d+)?)\s*(?P<percent>%)?"
+    r"(?:\s+within\s+(?P<window>\S+))?\s*"
+)
+
+
+class Alert:
+    """
+    A rule that fired for a series.
+
+    Attributes:
+        rule (str): The name of the rule.
+        series (str): The series it fired for.
+        ts (int): The observation time in Unix milliseconds.
+        value (float): The observed value (for change rules, the change).
+        message (str): A human-readable description.
+    """
+
+    __slots__ = ("rule", "series", "ts", "value", "message")
+
+    def __init__(self, rule: str, series: str, ts: int, value: float, message: str):
+        self.rule = rule
+        self.series = series
+        self.ts = ts
+        self.value = value
+        self.message = message
+
+    def to_dict(self) -> dict:
+        """Returns the alert as a JSON-serializable dict."""
+        return {
+            "rule": self.rule,
+            "series": self.series,
+            "ts": self.ts,
+            "value": self.value,
+            "message": self.message,
+        }
+
+
+def compile_condition(expression: str):
+    """
+    Compile a rule condition into a function of (state, ts, value).
+
+    Supported conditions::
+
+        temp < 0                      the value crosses a threshold
+        failures >= 3                 consecutive failed fetches
+        close change > 2% within 15m  the value moved by more than 2% (or
+                                      by an absolute amount without "%")
+                                      from any value in the last 15 minutes
+
+    Args:
+        expression (str): The condition.
+
+    Returns:
+        tuple: (field, check, stateful, threshold). ``check(state, ts,
+        value)`` returns the value compared against the threshold if the
+        condition holds, else None. Stateful checks expect a fresh dict as
+        ``state`` per series. ``threshold`` is set for conditions that can
+        only change truth when the value crosses it (<, <=, >, >=), else None.
+
+    Raises:
+        ValueError: If the condition cannot be parsed.
+    """
+    match = _RULE.fullmatch(expression)
+    if not match or bool(match["change"]) != bool(match["window"]):
+        raise ValueError(f"invalid alert condition {expression!r}")
+    field = match["field"]
+    compare = _OPERATORS[match["op"]]
+    threshold = float(match["value"])
+    percent = bool(match["percent"])
+
+    if not match["change"]:
+        if percent:
+            raise ValueError(f"invalid alert condition {expression!r}: % needs 'change'")
+
+        def check(state, ts, value):
+            return value if compare(value, threshold) else None
+
+        ordered = match["op"] in ("<", "<=", ">", ">=")
+        return field, check, False, threshold if ordered else None
+
+    window = int(parse_duration(match["window"]) * 1000)
+
+    def check(state, ts, value):
+        # Monotonic deques of (ts, value) hold the window's min and max, so
+        # each observation costs amortized O(1) whatever the window length
+        low = state.setdefault("low", deque())
+        high = state.setdefault("high", deque())
+        for extremes, worse in ((low, value.__le__), (high, value.__ge__)):
+            while extremes and extremes[0][0] < ts - window:
+                extremes.popleft()
+            while extremes and worse(extremes[-1][1]):
+                extremes.pop()
+            extremes.append((ts, value))
+        lowest, highest = low[0][1], high[0][1]
+        if percent:
+            rise = (value - lowest) / abs(lowest) * 100 if lowest else 0.0
+            fall = (highest - value) / abs(highest) * 100 if highest else 0.0
+        else:
+            rise, fall = value - lowest, highest - value
+        change = rise if rise >= fall else -fall
+        return change if compare(abs(change), threshold) else None
+
+    return field, check, True, None
+
+
+class Rule:
+    """
+    A named alert condition with its targets, cooldown and notifiers.
+
+    Attributes:
+        name (str): The rule's name, used in notifications.
+        expression (str): The condition as written.
+        target (str): A glob matched against series names (e.g. "ibm*").
+        cooldown (float): Seconds during which the rule does not fire again
+            for the same series.
+        notifiers (list): Notifier instances, or None for the engine's.
+        field (str): The observed field the condition reads.
+        threshold (float): The value the condition flips at, for plain
+            threshold conditions, else None.
+    """
+
+    def __init__(
+        self, name: str, expression: str, target: str = "*", cooldown=300.0, notifiers=None
+    ):
+        """
+        Initialize the Rule instance and compile its condition.
+
+        Raises:
+            ValueError: If the condition cannot be parsed.
+        """
+        self.name = name
+        self.expression = expression
+        self.target = target
+        self.cooldown = cooldown
+        self.notifiers = notifiers
+        self.field, self.check, self.stateful, self.threshold = compile_condition(
+            expression
+        )
+
+
+class _Binding:
+    """The per-series state of one rule."""
+
+    __slots__ = ("rule", "check", "state", "active", "last_fired")
+
+    def __init__(self, rule: Rule):
+        self.rule = rule
+        self.check = rule.check
+        self.state = {} if rule.stateful else None
+        self.active = False
+        self.last_fired = None
+
+
+class _FieldRules:
+    """
+    The rules of one series that read one field.
+
+    Threshold rules are kept sorted by threshold. Between two observations
+    only the rules whose threshold lies between the old and the new value
+    can change truth, so only those are evaluated; the other rules are
+    evaluated on every observation.
+    """
+
+    __slots__ = ("ordered", "thresholds", "others", "last")
+
+    def __init__(self, bindings):
+        ordered = sorted(
+            (b for b in bindings if b.rule.threshold is not None),
+            key=lambda b: b.rule.threshold,
+        )
+        self.ordered = ordered
+        self.thresholds = [b.rule.threshold for b in ordered]
+        self.others = [b for b in bindings if b.rule.threshold is None]
+        self.last = None
+
+    def candidates(self, value: float) -> list:
+        """Returns the bindings to evaluate for a new value."""
+        last, self.last = self.last, value
+        if last is None:
+            return self.ordered + self.others
+        lo = bisect_left(self.thresholds, min(last, value))
+        hi = bisect_right(self.thresholds, max(last, value))
+        if lo == hi:
+            return self.others
+        return self.ordered[lo:hi] + self.others
+
+
+class AlertEngine:
+    """
+    Evaluates alert rules on every observation as it arrives.
+
+    Rules are compiled once. The first observation of a series resolves
+    which rules apply to it and groups them by field, so an observation
+    only runs the checks for the fields it carries; no history is scanned.
+    Threshold rules are indexed by threshold (see _FieldRules), so thousands
+    of them cost a bisection plus the rules the value actually crossed.
+
+    A rule fires when its condition becomes true, not on every observation
+    while it stays true, and not again for the same series within its
+    cooldown.
+
+    Attributes:
+        rules (list): The Rule instances.
+        notifiers (list): The default notifiers.
+        fired (int): Alerts sent.
+        suppressed (int): Alerts held back by the cooldown.
+        evaluated (int): Rule checks run, which the threshold index keeps
+            far below rules times observations.
+    """
+
+    def __init__(self, rules, notifiers=None):
+        """
+        Initialize the AlertEngine instance.
+
+        Args:
+            rules (list): The Rule instances.
+            notifiers (list): The notifiers for rules that name none,
+                defaults to printing to stdout.
+        """
+        self.rules = list(rules)
+        self.notifiers = notifiers if notifiers is not None else [StdoutNotifier()]
+        self.fired = 0
+        self.suppressed = 0
+        self.evaluated = 0
+        self._bindings = {}
+        self._lock = threading.Lock()
+
+    def _bind(self, series: str) -> dict:
+        fields = self._bindings.get(series)
+        if fields is None:
+            bindings = {}
+            for rule in self.rules:
+                if fnmatchcase(series, rule.target):
+                    bindings.setdefault(rule.field, []).append(_Binding(rule))
+            fields = {field: _FieldRules(b) for field, b in bindings.items()}
+            self._bindings[series] = fields
+        return fields
+
+    def update(self, series: str, ts: int, values: dict) -> list:
+        """
+        Evaluate the rules of a series against one observation.
+
+        Args:
+            series (str): The series name.
+            ts (int): The observation time in Unix milliseconds.
+            values (dict): The observed values by field.
+
+        Returns:
+            list: The alerts that fired.
+        """
+        fired = []
+        with self._lock:
+            fields = self._bind(series)
+            for field, value in values.items():
+                rules = fields.get(field)
+                if rules is None or value != value:  # NaN: not reported
+                    continue
+                candidates = rules.candidates(value)
+                self.evaluated += len(candidates)
+                for binding in candidates:
+                    result = binding.check(binding.state, ts, value)
+                    if result is None:
+                        binding.active = False
+                        continue
+                    if binding.active:
+                        continue
+                    binding.active = True
+                    rule = binding.rule
+                    if (
+                        binding.last_fired is not None
+                        and ts - binding.last_fired < rule.cooldown * 1000
+                    ):
+                        self.suppressed += 1
+                        continue
+                    binding.last_fired = ts
+                    fired.append(
+                        (
+                            rule,
+                            Alert(
+                                rule.name,
+                                series,
+                                ts,
+                                result,
+                                f"[{series}] {rule.name}: {rule.expression} ({field}={value:g}"
+                                + (f", change={result:+.4g}" if rule.stateful else "")
+                                + ")",
+                            ),
+                        )
+                    )
+            self.fired += len(fired)
+
+        # Notify outside the lock, so a slow notifier does not block others
+        for rule, alert in fired:
+            for notifier in rule.notifiers or self.notifiers:
+                notifier.notify(alert)
+        return [alert for _, alert in fired]
+
+    def stats(self) -> dict:
+        """Returns the number of alerts fired and suppressed."""
+        return {"fired": self.fired, "suppressed": self.suppressed}
+
+
+class StdoutNotifier:
+    """Prints alerts to a stream, stdout by default."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def notify(self, alert: Alert):
+        print(f"ALERT {alert.message}", file=self.stream or sys.stdout, flush=True)
+
+
+class FileNotifier:
+    """Appends alerts to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def notify(self, alert: Alert):
+        with self._lock, open(self.path, "ab") as f:
+            f.write(dumps(alert.to_dict()))
+
+
+class WebhookNotifier:
+    """
+    POSTs alerts as JSON to a URL from a background thread, so a slow
+    receiver never delays polling.
+
+    Attributes:
+        url (str): The webhook URL.
+        sent (int): Alerts delivered.
+        failed (int): Alerts that could not be delivered.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="api_watchdog-webhook", daemon=True
+        )
+        self._thread.start()
+
+    def notify(self, alert: Alert):
+        self._queue.put(alert)
+
+    def wait(self):
+        """Block until every queued alert has been sent or has failed."""
+        self._queue.join()
+
+    def _run(self):
+        # Imported here, off the startup path, as most runs send no webhooks
+        import requests
+
+        while True:
+            alert = self._queue.get()
+            try:
+                response = requests.post(self.url, json=alert.to_dict(), timeout=self.timeout)
+                response.raise_for_status()
+                self.sent += 1
+            except requests.exceptions.RequestException:
+                self.failed += 1
+            finally:
+                self._queue.task_done()
+
+
+def split_notifier(spec: str) -> tuple:
+    """
+    Split "stdout", "file:<path>" or "webhook:<url>" into (kind, argument).
+
+    Raises:
+        ValueError: If the kind of notifier is unknown or lacks its argument.
+    """
+    kind, _, argument = spec.partition(":")
+    if kind == "stdout" and not argument:
+        return kind, argument
+    if kind in ("file", "webhook") and argument:
+        return kind, argument
+    raise ValueError(f"invalid notifier {spec!r}")
+
+
+def parse_notifier(spec: str):
+    """
+    Create a notifier from "stdout", "file:<path>" or "webhook:<url>".
+
+    Raises:
+        ValueError: If the kind of notifier is unknown.
+    """
+    kind, argument = split_notifier(spec)
+    if kind == "file":
+        return FileNotifier(argument)
+    if kind == "webhook":
+        return WebhookNotifier(argument)
+    return StdoutNotifier()
+
+
+def build_rule(entry: dict, index: int = 1) -> Rule:
+    """
+    Create a Rule from an ``[[alerts]]`` table of a targets file::
+
+        [[alerts]]
+        name = "freezing"
+        when = "temp < 0"
+        target = "Chennai"        # glob, default "*"
+        cooldown = "30m"          # default "5m"
+        notify = ["stdout", "webhook:http://127.0.0.1:8080/alerts"]
+
+    Args:
+        entry (dict): The table.
+        index (int): The table's position, used in error messages.
+
+    Raises:
+        ValueError: If the table lacks a condition or holds an invalid one.
+    """
+    if "when" not in entry:
+        raise ValueError(f"Alert {index}: missing 'when'")
+    notify = entry.get("notify")
+    if isinstance(notify, str):
+        notify = [notify]
+    # A bare number is seconds, so "cooldown = 0" turns the cooldown off
+    cooldown = entry.get("cooldown", "5m")
+    if not isinstance(cooldown, (int, float)):
+        cooldown = parse_duration(cooldown)
+    return Rule(
+        name=entry.get("name", entry["when"]),
+        expression=entry["when"],
+        target=entry.get("target", "*"),
+        cooldown=float(cooldown),
+        notifiers=[parse_notifier(spec) for spec in notify] if notify else None,
+    )
@@ -0,0 +1,338 @@
+import threading
+from collections import deque
+from api_watchdog.utils.timeseries import COLUMNS
+
+try:
+    import numpy as np
+except ImportError:  # Optional: pip install api-watchdog[analytics]
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Analytics require numpy: pip install 'api-watchdog[analytics]'")
+
+
+class RollingWindow:
+    """
+    Window statistics over the last ``size`` observations of one target.
+
+    Values live in NumPy ring buffers, one row per column. Each update adds
+    the new observation to running sums and subtracts the one it evicts, so
+    the mean, standard deviation, rate of change, VWAP and least-squares
+    trend cost O(1) per update whatever the window size. Minimum and maximum
+    come from monotonic deques (amortized O(1)). NaN values, i.e. fields the
+    target does not report, are left out of every statistic.
+
+    The running sums are rebuilt exactly from the buffers once per window,
+    so floating-point drift from the add/subtract updates cannot build up.
+
+    Attributes:
+        size (int): The number of observations in the window.
+        columns (tuple): The names of the columns.
+        updates (int): The number of observations seen.
+    """
+
+    def __init__(self, size: int, columns=COLUMNS):
+        """
+        Initialize the RollingWindow instance.
+
+        Args:
+            size (int): The number of observations in the window.
+            columns (tuple): The names of the columns.
+
+        Raises:
+            RuntimeError: If numpy is not installed.
+            ValueError: If the size is not positive.
+        """
+        _require_numpy()
+        if size < 1:
+            raise ValueError("The window size must be positive")
+        self.size = size
+        self.columns = tuple(columns)
+        self.updates = 0
+        self._ts = np.zeros(size, dtype=np.int64)
+        self._values = np.full((len(self.columns), size), np.nan)
+        self._origin = None
+        self._low = [deque() for _ in self.columns]
+        self._high = [deque() for _ in self.columns]
+        self._close = self._column("close")
+        self._volume = self._column("volume")
+        self._resync()
+
+    def _column(self, name):
+        return self.columns.index(name) if name in self.columns else None
+
+    def _seconds(self, ts):
+        # Times relative to the first observation keep the trend sums small
+        return (ts - self._origin) / 1000.0
+
+    def _resync(self):
+        """Rebuild the running sums from the ring buffers."""
+        filled = min(self.updates, self.size)
+        values = self._values[:, :filled]
+        present = ~np.isnan(values)
+        y = np.where(present, values, 0.0)
+        t = np.broadcast_to(
+            self._seconds(self._ts[:filled]) if filled else np.zeros(0), values.shape
+        )
+        t = np.where(present, t, 0.0)
+        self._count = present.sum(axis=1).astype(float)
+        self._sum = y.sum(axis=1)
+        self._sum_sq = (y * y).sum(axis=1)
+        self._sum_t = t.sum(axis=1)
+        self._sum_tt = (t * t).sum(axis=1)
+        self._sum_ty = (t * y).sum(axis=1)
+        self._pv = self._v = 0.0
+        if self._close is not None and self._volume is not None and filled:
+            pv = values[self._close] * values[self._volume]
+            both = ~np.isnan(pv)
+            self._pv = float(pv[both].sum())
+            self._v = float(values[self._volume][both].sum())
+
+    def _accumulate(self, ts, row, sign):
+        present = ~np.isnan(row)
+        y = np.where(present, row, 0.0)
+        t = np.where(present, self._seconds(ts), 0.0)
+        self._count += sign * present
+        self._sum += sign * y
+        self._sum_sq += sign * y * y
+        self._sum_t += sign * t
+        self._sum_tt += sign * t * t
+        self._sum_ty += sign * t * y
+        if self._close is not None and self._volume is not None:
+            price, volume = row[self._close], row[self._volume]
+            if not (np.isnan(price) or np.isnan(volume)):
+                self._pv += sign * price * volume
+                self._v += sign * volume
+
+    def update(self, ts: int, values: dict):
+        """
+        Add one observation, evicting the oldest once the window is full.
+
+        Args:
+            ts (int): The observation time in Unix milliseconds.
+            values (dict): Column values; missing columns count as NaN.
+        """
+        if self._origin is None:
+            self._origin = ts
+        row = np.array([values.get(c, np.nan) for c in self.columns], dtype=float)
+        slot = self.updates % self.size
+        if self.updates >= self.size:
+            self._accumulate(self._ts[slot], self._values[:, slot], -1)
+        self._ts[slot] = ts
+        self._values[:, slot] = row
+        self._accumulate(ts, row, 1)
+
+        # Monotonic deques: drop entries that can no longer be the extreme
+        oldest = self.updates - self.size + 1
+        for i, value in enumerate(row):
+            for window, worse in ((self._low[i], value.__le__), (self._high[i], value.__ge__)):
+                while window and window[0][0] < oldest:
+                    window.popleft()
+                if value == value:  # not NaN
+                    while window and worse(window[-1][1]):
+                        window.pop()
+                    window.append((self.updates, value))
+
+        self.updates += 1
+        if self.updates % self.size == 0:
+            self._resync()
+
+    def stats(self) -> dict:
+        """
+        Returns the window statistics.
+
+        Returns:
+            dict: For every column with values, a dict of "mean", "std",
+            "min", "max", "roc" (change per second between the oldest and
+            newest value) and "trend" (least-squares slope per hour); plus
+            "vwap" when the target reports close prices and volumes.
+        """
+        if not self.updates:
+            return {}
+        filled = min(self.updates, self.size)
+        newest = (self.updates - 1) % self.size
+        oldest = (self.updates - filled) % self.size
+        result = {}
+        for i, name in enumerate(self.columns):
+            n = self._count[i]
+            if not n:
+                continue
+            mean = self._sum[i] / n
+            variance = max(self._sum_sq[i] / n - mean * mean, 0.0)
+            column = self._values[i]
+            present = np.flatnonzero(~np.isnan(column[:filled]))
+            first = present[np.argmin((present - oldest) % self.size)]
+            last = present[np.argmin((newest - present) % self.size)]
+            span = (self._ts[last] - self._ts[first]) / 1000.0
+            denominator = n * self._sum_tt[i] - self._sum_t[i] ** 2
+            result[name] = {
+                "mean": float(mean),
+                "std": float(np.sqrt(variance)),
+                "min": float(self._low[i][0][1]),
+                "max": float(self._high[i][0][1]),
+                "roc": float((column[last] - column[first]) / span) if span else 0.0,
+                "trend": float(
+                    (n * self._sum_ty[i] - self._sum_t[i] * self._sum[i])
+                    / denominator
+                    * 3600
+                )
+                if denominator > 1e-9
+                else 0.0,
+            }
+        if self._v:
+            result["vwap"] = self._pv / self._v
+        return result
+
+
+def rolling_stats(rows: dict, window: int) -> dict:
+    """
+    Recompute window statistics over a whole stored history at once.
+
+    Every output row holds the statistics of the ``window`` observations
+    ending at it (fewer at the start of the history), computed with
+    vectorized NumPy operations instead of a Python loop per observation.
+
+    Args:
+        rows (dict): The result of a store query: "ts" and column arrays.
+        window (int): The number of observations per window.
+
+    Returns:
+        dict: "ts", and "<column>.mean", ".std", ".min", ".max", ".roc" and
+        ".trend" (least-squares slope per hour) for every column, plus
+        "vwap" when "close" and "volume" are present.
+
+    Raises:
+        RuntimeError: If numpy is not installed.
+        ValueError: If the window is not positive.
+    """
+    _require_numpy()
+    if window < 1:
+        raise ValueError("The window size must be positive")
+    ts = np.asarray(rows["ts"], dtype=np.int64)
+    n = len(ts)
+    result = {"ts": ts}
+    if not n:
+        return result
+    starts = np.maximum(np.arange(n) - window + 1, 0)
+
+    def window_sum(x):
+        cumulative = np.concatenate(([0.0], np.cumsum(x)))
+        return cumulative[1:] - cumulative[starts]
+
+    # Pad the front so every row has a full window to slide over
+    def padded_windows(x, fill):
+        padded = np.concatenate((np.full(window - 1, fill), x))
+        return np.lib.stride_tricks.sliding_window_view(padded, window)
+
+    seconds = (ts - ts[0]) / 1000.0
+    for name, values in rows.items():
+        if name == "ts":
+            continue
+        x = np.asarray(values, dtype=float)
+        present = ~np.isnan(x)
+        y = np.where(present, x, 0.0)
+        count = window_sum(present.astype(float))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = window_sum(y) / count
+            variance = np.maximum(window_sum(y * y) / count - mean * mean, 0.0)
+            result[f"{name}.mean"] = mean
+            result[f"{name}.std"] = np.sqrt(variance)
+            result[f"{name}.min"] = np.where(
+                count > 0, padded_windows(np.where(present, x, np.inf), np.inf).min(axis=1), np.nan
+            )
+            result[f"{name}.max"] = np.where(
+                count > 0, padded_windows(np.where(present, x, -np.inf), -np.inf).max(axis=1), np.nan
+            )
+            span = (ts - ts[starts]) / 1000.0
+            result[f"{name}.roc"] = np.where(span > 0, (x - x[starts]) / span, 0.0)
+
+            # The slope is fitted on each window's deviations from its means;
+            # running sums of t * y would cancel badly over a long history
+            t = padded_windows(np.where(present, seconds, np.nan), np.nan)
+            dt = t - (window_sum(np.where(present, seconds, 0.0)) / count)[:, None]
+            dy = padded_windows(np.where(present, x, np.nan), np.nan) - mean[:, None]
+            spread = np.nansum(dt * dt, axis=1)
+            result[f"{name}.trend"] = np.where(
+                spread > 1e-9, np.nansum(dt * dy, axis=1) / spread * 3600, 0.0
+            )
+
+    if "close" in rows and "volume" in rows:
+        close = np.asarray(rows["close"], dtype=float)
+        volume = np.asarray(rows["volume"], dtype=float)
+        both = ~(np.isnan(close) | np.isnan(volume))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result["vwap"] = window_sum(np.where(both, close * volume, 0.0)) / window_sum(
+                np.where(both, volume, 0.0)
+            )
+    return result
+
+
+class Analytics:
+    """
+    The rolling windows of every target, fed alongside the history store.
+
+    Attributes:
+        window (int): The number of observations per window.
+    """
+
+    def __init__(self, window: int = 60):
+        """
+        Initialize the Analytics instance.
+
+        Args:
+            window (int): The number of observations per window.
+
+        Raises:
+            RuntimeError: If numpy is not installed.
+            ValueError: If the window is not positive.
+        """
+        _require_numpy()
+        if window < 1:
+            raise ValueError("The window size must be positive")
+        self.window = window
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def _get(self, series: str) -> RollingWindow:
+        with self._lock:
+            window = self._windows.get(series)
+            if window is None:
+                window = self._windows[series] = RollingWindow(self.window)
+            return window
+
+    def update(self, series: str, ts: int, values: dict):
+        """
+        Add one observation of a series (a target, or "<target>:<symbol>").
+
+        Args:
+            series (str): The series name.
+            ts (int): The observation time in Unix milliseconds.
+            values (dict): Column values, as stored by TimeSeriesStore.
+        """
+        self._get(series).update(ts, values)
+
+    def warm(self, store, series: str):
+        """
+        Fill a series' window from its stored history, so statistics are
+        complete right after a restart.
+
+        Args:
+            store (TimeSeriesStore): The history store.
+            series (str): The series name.
+        """
+        try:
+            rows = store.query(series)
+        except KeyError:
+            return
+        window = self._get(series)
+        ts = rows["ts"]
+        for i in range(max(len(ts) - self.window, 0), len(ts)):
+            window.update(ts[i], {c: rows[c][i] for c in window.columns})
+
+    def stats(self) -> dict:
+        """Returns the window statistics of every series, by series name."""
+        with self._lock:
+            windows = dict(self._windows)
+        return {series: window.stats() for series, window in windows.items()}
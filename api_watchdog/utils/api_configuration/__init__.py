@@ -1,2 +1,19 @@
-from .stock_api import StockConfig
-from .weather_api import WeatherConfig
+import importlib
+
+# The configuration classes, imported on first access so that selecting one
+# API does not import the others (see registry.APIPlugin)
+_MODULES = {
+    "StockConfig": ".stock_api",
+    "WeatherConfig": ".weather_api",
+    "MultiStockConfig": ".multi_stock_api",
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
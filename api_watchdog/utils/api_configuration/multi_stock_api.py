@@ -0,0 +1,218 @@
+import os
+from api_watchdog.utils.diff import ChangeDetector
+from api_watchdog.utils.fields import Extractor, Field, number
+from api_watchdog.utils.registry import load_env
+
+
+class MultiStockConfig:
+    """
+    A class that encapsulates the configuration for a batched stock quote request
+
+    Alpha Vantage's REALTIME_BULK_QUOTES endpoint returns the latest quote of
+    up to 100 symbols in one response, so watching many tickers costs one
+    request per batch instead of one per symbol. The response is fanned back
+    out and each symbol is logged on its own, like StockConfig does.
+    """
+
+    var = "stocks"
+
+    # The most symbols the bulk quote endpoint accepts per request
+    batch_size = 100
+
+    # The fields read from each quote in a response
+    fields = Extractor(
+        [
+            Field("symbol", ("symbol",), "Stock"),
+            Field("time", ("timestamp",), "Time"),
+            Field("open", ("open",), "Open", type=float, format=number),
+            Field("high", ("high",), "High", type=float, format=number),
+            Field("low", ("low",), "Low", type=float, format=number),
+            Field("close", ("close",), "Close", type=float, format=number),
+            Field("volume", ("volume",), "Volume", type=int),
+        ]
+    )
+
+    def __init__(
+        self, argument: str, logger, interval: int, log_file: str, log_mode: str = "all"
+    ):
+        """
+        Constructor for the MultiStockConfig class
+
+        Args:
+            argument (str): Comma-separated stock symbols, at most batch_size
+            logger: The logger to use for logging
+            interval (int): The interval at which to query the API
+            log_file (str): The file to write the logs to
+            log_mode (str): "all" to log every field on every response, or
+                "changes" to log only the symbols whose quote changed
+
+        Raises:
+            ValueError: If no symbols, or more than batch_size, are given
+        """
+        self.symbols = self.parse_symbols(argument)
+        if not self.symbols:
+            raise ValueError("No stock symbols given")
+        if len(self.symbols) > self.batch_size:
+            raise ValueError(
+                f"At most {self.batch_size} symbols fit in one request, got {len(self.symbols)}"
+            )
+
+        # API keys may come from a .env file
+        load_env()
+        self.api_url = f"https://www.alphavantage.co/query?function=REALTIME_BULK_QUOTES&symbol={','.join(self.symbols)}&apikey={os.getenv('ALPHAVANTAGE_API_KEY')}"
+        self.interval = interval
+        self.log_file = log_file
+        self.log = logger
+        self.log_mode = log_mode
+        self.changes = {}
+        self.requests = 0
+        self.quotes = 0
+        self._counted = None
+
+        # Only the quotes are read from a large response, which is decoded
+        # up to them; error responses are small and always decoded whole
+        self.projection = {"data": None}
+
+    @staticmethod
+    def parse_symbols(argument: str) -> list:
+        """
+        Returns the unique, upper-cased symbols in a comma-separated list
+        """
+        symbols = []
+        for symbol in argument.split(","):
+            symbol = symbol.strip().upper()
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+        return symbols
+
+    @classmethod
+    def batches(cls, argument: str) -> list:
+        """
+        Splits a comma-separated list of any length into arguments of at
+        most batch_size symbols each, one per request
+
+        Args:
+            argument (str): Comma-separated stock symbols
+
+        Returns:
+            list: Comma-separated symbol lists
+        """
+        symbols = cls.parse_symbols(argument)
+        return [
+            ",".join(symbols[i : i + cls.batch_size])
+            for i in range(0, len(symbols), cls.batch_size)
+        ]
+
+    def get_config(self) -> tuple:
+        """
+        Returns a tuple containing the API URL, interval, and log file
+        """
+        return self.api_url, self.interval, self.log_file
+
+    def requests_per_symbol(self) -> float:
+        """
+        Returns the number of requests made per symbol quote received
+        """
+        return self.requests / self.quotes if self.quotes else 0.0
+
+    def count(self, api_data):
+        """
+        Counts a response towards requests_per_symbol, once
+
+        extract and configuration both call this, and a target may call
+        both for one response, so the metric is the same whether responses
+        are logged as text or written as records
+
+        Args:
+            api_data (dict): The parsed API response
+        """
+        if api_data is self._counted:
+            return
+        self._counted = api_data
+        self.requests += 1
+        quotes = api_data.get("data") if isinstance(api_data, dict) else None
+        if isinstance(quotes, list):
+            self.quotes += len(
+                {quote.get("symbol") for quote in quotes} & set(self.symbols)
+            )
+
+    def extract(self, api_data) -> list:
+        """
+        Returns one structured record per symbol in the batched response
+
+        Args:
+            api_data (dict): The parsed API response
+
+        Returns:
+            list: One dict of fields per watched symbol that was returned
+        """
+        self.count(api_data)
+        quotes = api_data.get("data")
+        if not isinstance(quotes, list):
+            return []
+        records = []
+        for quote in quotes:
+            symbol = quote.get("symbol")
+            if symbol not in self.symbols:
+                continue
+            records.append(self.fields.extract(quote))
+        return records
+
+    def configuration(self, api_data, not_modified: bool = False):
+        """
+        Logs the quote of every symbol in the batched API response
+
+        Args:
+            api_data (dict): The parsed API response
+            not_modified (bool): True if the response is unchanged since the
+                last call, in which case nothing is parsed or logged
+        """
+        # The response is the one already logged; there is nothing new to do
+        if not_modified:
+            return
+
+        api = api_data
+        self.count(api)
+
+        # Check if API returned an error
+        for key, label in (
+            ("Error Message", "API Error"),
+            ("Note", "API Limit"),
+            ("Information", "API Information"),
+        ):
+            if key in api:
+                self.log.error(f"{label}: {api[key]}")
+                self.log.debug(f"Full API response: {api}")
+                return
+        if not isinstance(api.get("data"), list):
+            self.log.error(f"Invalid API response: {api.get('message', list(api.keys()))}")
+            self.log.debug(f"Full API response: {api}")
+            return
+
+        # Fan the batch back out to one record per symbol
+        received = set()
+        for quote in api["data"]:
+            symbol = quote.get("symbol")
+            if symbol not in self.symbols:
+                continue
+            received.add(symbol)
+
+            # In "changes" mode, skip symbols whose quote is unchanged
+            if self.log_mode == "changes":
+                detector = self.changes.setdefault(symbol, ChangeDetector())
+                if not detector.compare(quote).changed:
+                    continue
+
+            # A missing field is logged as "Not available"
+            self.fields.log(self.log, quote)
+
+        # Report symbols the provider left out of the batch
+        missing = [symbol for symbol in self.symbols if symbol not in received]
+        if missing:
+            self.log.error(f"No quote returned for: {', '.join(missing)}")
+
+        # Log how many requests each quote cost, to verify the batching savings
+        self.log.info(
+            f"Requests per symbol: {self.requests_per_symbol():.3f} "
+            f"({len(received)} quotes in this request)"
+        )
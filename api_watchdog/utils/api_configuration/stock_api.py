@@ -1,8 +1,9 @@
 import os
-from dotenv import load_dotenv
 from datetime import datetime
-
-load_dotenv()
+from api_watchdog.utils.diff import ChangeDetector, format_path
+from api_watchdog.utils.fields import Extractor, Field, number
+from api_watchdog.utils.json_decode import FIRST
+from api_watchdog.utils.registry import load_env
 
 
 class StockConfig:
@@ -12,7 +13,20 @@ class StockConfig:
 
     var = "stock"
 
-    def __init__(self, argument: str, logger, interval: int, log_file: str):
+    # The fields read from the newest bar of every response
+    fields = Extractor(
+        [
+            Field("open", ("1. open",), "Open", type=float, format=number),
+            Field("high", ("2. high",), "High", type=float, format=number),
+            Field("low", ("3. low",), "Low", type=float, format=number),
+            Field("close", ("4. close",), "Close", type=float, format=number),
+            Field("volume", ("5. volume",), "Volume", type=int),
+        ]
+    )
+
+    def __init__(
+        self, argument: str, logger, interval: int, log_file: str, log_mode: str = "all"
+    ):
         """
         Constructor for the StockConfig class
 
@@ -21,11 +35,25 @@ class StockConfig:
             logger: The logger to use for logging
             interval (int): The interval at which to query the API
             log_file (str): The file to write the logs to
+            log_mode (str): "all" to log every field on every response, or
+                "changes" to log only the fields that changed since the last one
         """
+        # API keys may come from a .env file
+        load_env()
         self.api_url = f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={argument}&interval={interval}min&apikey={os.getenv('ALPHAVANTAGE_API_KEY')}"
         self.interval = interval
         self.log_file = log_file
         self.log = logger
+        self.log_mode = log_mode
+        self.changes = ChangeDetector()
+
+        # An intraday response holds a whole day of bars, but only the newest
+        # (the first) is read, so large responses are decoded up to it. Error
+        # responses are small and always decoded whole
+        self.projection = {
+            "Meta Data": None,
+            f"Time Series ({interval}min)": FIRST,
+        }
 
     def get_config(self) -> tuple:
         """
@@ -33,13 +61,41 @@ class StockConfig:
         """
         return self.api_url, self.interval, self.log_file
 
-    def configuration(self, api_data):
+    def extract(self, api_data) -> list:
+        """
+        Returns the latest quote in a response as structured records
+
+        Args:
+            api_data (dict): The parsed API response
+
+        Returns:
+            list: One dict of fields, or an empty list if the response holds
+            no quote (e.g. an API error)
+        """
+        api = api_data
+        time_series = api.get(f"Time Series ({self.interval}min)")
+        if "Meta Data" not in api or not time_series:
+            return []
+        # The newest entry comes first
+        latest_time = next(iter(time_series))
+        latest_data = time_series[latest_time]
+        record = {"symbol": api["Meta Data"].get("2. Symbol"), "time": latest_time}
+        record.update(self.fields.extract(latest_data))
+        return [record]
+
+    def configuration(self, api_data, not_modified: bool = False):
         """
         Logs the configuration for the stock price API request
 
         Args:
             api_data (dict): The parsed API response
+            not_modified (bool): True if the response is unchanged since the
+                last call, in which case nothing is parsed or logged
         """
+        # The response is the one already logged; there is nothing new to do
+        if not_modified:
+            return
+
         # api_data is already a parsed dictionary from fetch_api
         api = api_data
 
@@ -57,16 +113,33 @@ class StockConfig:
             self.log.debug(f"Full API response: {api}")
             return
 
+        # In "changes" mode, compare with the previous response and log only
+        # the fields whose source values changed
+        diff = self.changes.compare(api) if self.log_mode == "changes" else None
+        if diff is not None:
+            if not diff.changed:
+                self.log.debug("No changes since the last response")
+                return
+            if diff.changes:
+                self.log.debug(
+                    "Changed: " + ", ".join(format_path(c.path) for c in diff.changes)
+                )
+
+        def changed(path):
+            return diff is None or diff.touches(path)
+
         # Log the stock symbol
-        self.log.info(f"Stock: {api['Meta Data']['2. Symbol']}")
+        if changed(("Meta Data", "2. Symbol")):
+            self.log.info(f"Stock: {api['Meta Data']['2. Symbol']}")
 
         # Log the time of the latest data
         # Convert UTC time to 12-hour format
-        time_obj = datetime.strptime(
-            api["Meta Data"]["3. Last Refreshed"], "%Y-%m-%d %H:%M:%S"
-        )
-        time_string = time_obj.strftime("%Y-%m-%d %I:%M:%S %p")
-        self.log.info(f"Time: {time_string}")
+        if changed(("Meta Data", "3. Last Refreshed")):
+            time_obj = datetime.strptime(
+                api["Meta Data"]["3. Last Refreshed"], "%Y-%m-%d %H:%M:%S"
+            )
+            time_string = time_obj.strftime("%Y-%m-%d %I:%M:%S %p")
+            self.log.info(f"Time: {time_string}")
 
         # Get the time series key based on the interval
         time_series_key = f"Time Series ({self.interval}min)"
@@ -82,16 +155,21 @@ class StockConfig:
         # Get the time series data
         time_series = api[time_series_key]
 
-        # Get the latest time and data
-        latest_time = list(time_series.keys())[0]
+        # Get the latest time and data; the newest entry comes first
+        latest_time = next(iter(time_series))
         latest_data = time_series[latest_time]
 
-        # Log the latest data
-        self.log.info(f"Open: {latest_data['1. open']}")
-        self.log.info(f"High: {latest_data['2. high']}")
-        self.log.info(f"Low: {latest_data['3. low']}")
-        self.log.info(f"Close: {latest_data['4. close']}")
-        self.log.info(f"Volume: {latest_data['5. volume']}")
+        # Log the latest data; a missing field is logged as "Not available"
+        self.fields.log(
+            self.log,
+            latest_data,
+            changed=changed,
+            prefix=(time_series_key, latest_time),
+        )
+
+        # The settings below never change, so "changes" mode logs them once
+        if diff is not None and not diff.first:
+            return
 
         # Log the API URL being used
         self.log.info(f"API URL: {self.api_url}")
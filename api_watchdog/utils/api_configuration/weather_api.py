@@ -1,8 +1,7 @@
 import os
-from dotenv import load_dotenv
-import time
-
-load_dotenv()
+from api_watchdog.utils.diff import ChangeDetector, format_path
+from api_watchdog.utils.fields import Extractor, Field, kelvin_to_celsius, local_time
+from api_watchdog.utils.registry import load_env
 
 
 class WeatherConfig:
@@ -15,15 +14,49 @@ class WeatherConfig:
         interval (int): The interval to fetch the API data.
         log_file (str): The log file to write the results to.
         log (logging.Logger): The logger to use for logging.
+        log_mode (str): "all" to log every field on every response, or
+            "changes" to log only the fields that changed since the last one.
+        changes (ChangeDetector): Compares each response with the previous one.
+        fields (Extractor): The fields read from each response.
 
     Methods:
         get_config: Returns the API URL, interval, and log file.
+        extract: Returns the observed fields as a structured record.
         configuration: Logs the weather configuration.
     """
 
     var = "location"
 
-    def __init__(self, argument: str, logger, interval: int, log_file: str):
+    # The fields read from every response, in record and log order
+    fields = Extractor(
+        [
+            Field("location", ("name",), "Location"),
+            Field("time", ("dt",), "Time", format=local_time),
+            Field("country", ("sys", "country"), "Country"),
+            Field("weather", ("weather", 0, "description"), "Weather"),
+            Field("wind_speed", ("wind", "speed"), "Wind speeds", format="{} m/s"),
+            Field("wind_deg", ("wind", "deg"), "Wind direction", format="{}°"),
+            Field(
+                "temp_c",
+                ("main", "temp"),
+                "Temperature",
+                type=float,
+                convert=kelvin_to_celsius,
+                format="{}°C",
+                required=True,
+            ),
+            Field("humidity", ("main", "humidity"), "Humidity", format="{}%"),
+            Field("pressure", ("main", "pressure"), "Pressure", format="{} hPa"),
+            Field("visibility", ("visibility",), "Visibility", format="{} m"),
+            Field("sunrise", ("sys", "sunrise"), "Sunrise", format=local_time),
+            Field("sunset", ("sys", "sunset"), "Sunset", format=local_time),
+            Field("clouds", ("clouds", "all"), "Clouds", format="{}%"),
+        ]
+    )
+
+    def __init__(
+        self, argument: str, logger, interval: int, log_file: str, log_mode: str = "all"
+    ):
         """
         Initialize the WeatherConfig instance.
 
@@ -32,11 +65,16 @@ class WeatherConfig:
             logger (logging.Logger): The logger to use for logging.
             interval (int): The interval to fetch the API data.
             log_file (str): The log file to write the results to.
+            log_mode (str): "all" or "changes".
         """
+        # API keys may come from a .env file
+        load_env()
         self.api_url = f"https://api.openweathermap.org/data/2.5/weather?q={argument}&appid={os.getenv('OPENWEATHERMAP_API_KEY')}"
         self.interval = interval
         self.log_file = log_file
         self.log = logger
+        self.log_mode = log_mode
+        self.changes = ChangeDetector()
 
     def get_config(self) -> tuple:
         """
@@ -47,61 +85,62 @@ class WeatherConfig:
         """
         return self.api_url, self.interval, self.log_file
 
-    def configuration(self, api_data):
+    def extract(self, api_data) -> list:
+        """
+        Returns the weather in a response as structured records.
+
+        Values keep their JSON types and units are normalized (temperature in
+        °C, times as Unix timestamps), so the records need no parsing.
+
+        Args:
+            api_data (dict): The parsed API response.
+
+        Returns:
+            list: One dict of fields, or an empty list if the response holds
+            no weather data.
+        """
+        record = self.fields.extract(api_data)
+        return [record] if record is not None else []
+
+    def configuration(self, api_data, not_modified: bool = False):
         """
         Logs the weather configuration.
 
         Args:
             api_data (dict): The parsed API response.
+            not_modified (bool): True if the response is unchanged since the
+                last call, in which case nothing is parsed or logged.
         """
+        # The response is the one already logged; there is nothing new to do
+        if not_modified:
+            return
+
         # Assign the parsed API data to a local variable for easier access
         api = api_data
 
-        # Log the general location information
-        self.log.info(f"Location: {api['name']}")
-        # Log the current time in a human-readable format
-        self.log.info(
-            f"Time: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(api['dt']))}"
-        )
-        # Log the country code
-        self.log.info(f"Country: {api['sys']['country']}")
-        # Log the weather description
-        self.log.info(f"Weather: {api['weather'][0]['description']}")
-
-        # Create lists of attribute names and their corresponding values for logging
-        attribute_names = (
-            "Wind speeds",
-            "Wind direction",
-            "Temperature",
-            "Humidity",
-            "Pressure",
-            "Visibility",
-            "Sunrise",
-            "Sunset",
-            "Clouds",
-        )
-        attribute_values = (
-            f"{api['wind']['speed']} m/s",  # Wind speed in meters per second
-            f"{api['wind']['deg']}°",  # Wind direction in degrees
-            f"{round(api['main']['temp'] - 273.15, 2)}°C",  # Temperature in Celsius
-            f"{api['main']['humidity']}%",  # Humidity as a percentage
-            f"{api['main']['pressure']} hPa",  # Pressure in hectopascals
-            f"{api['visibility']} m",  # Visibility in meters
-            # Sunrise time in a human-readable format
-            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(api["sys"]["sunrise"])),
-            # Sunset time in a human-readable format
-            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(api["sys"]["sunset"])),
-            f"{api['clouds']['all']}%",  # Cloudiness as a percentage
+        # In "changes" mode, compare with the previous response and log only
+        # the fields whose source values changed
+        diff = self.changes.compare(api) if self.log_mode == "changes" else None
+        if diff is not None:
+            if not diff.changed:
+                self.log.debug("No changes since the last response")
+                return
+            if diff.changes:
+                self.log.debug(
+                    "Changed: " + ", ".join(format_path(c.path) for c in diff.changes)
+                )
+
+        # Log every field; a missing one is logged as "Not available", and
+        # the text is only rendered if the message is actually emitted
+        self.fields.log(
+            self.log,
+            api,
+            changed=diff.touches if diff is not None else None,
         )
 
-        # Iterate over the attribute names and values to log each one
-        for a, b in zip(attribute_names, attribute_values):
-            try:
-                # Log each attribute name and its corresponding value
-                self.log.info(f"{a}: {b}")
-            except KeyError:
-                # If a KeyError occurs, log that the attribute is not available
-                self.log.info(f"{a}: Not available")
+        # The settings below never change, so "changes" mode logs them once
+        if diff is not None and not diff.first:
+            return
 
         # Log the API URL being used
         self.log.info(f"API URL: {self.api_url}")
@@ -1,9 +1,429 @@
 import requests
+import threading
 import time
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from api_watchdog.utils.json_decode import decode
 from api_watchdog.utils.logger import get_logger
+from api_watchdog.utils.rate_limit import RateLimited
+from api_watchdog.utils.resilience import (
+    Cancelled,
+    CircuitBreaker,
+    CircuitOpen,
+    RetryPolicy,
+)
+from api_watchdog.utils.singleflight import SingleFlight
 
 
-def fetch_api(api_url, max_retries=5, delay=5):
+class FetchResult:
+    """
+    The outcome of a fetch.
+
+    Attributes:
+        data: The parsed JSON content, or None if the fetch failed.
+        status (int): The HTTP status of the last response, or None.
+        latency (float): The seconds spent fetching, including retries.
+        from_cache (bool): True if the data came from the response cache,
+            either because it was fresh or because the server answered 304.
+        version (str): A digest that changes whenever the response body
+            changes, or None when the response was not cached.
+    """
+
+    __slots__ = ("data", "status", "latency", "from_cache", "version")
+
+    def __init__(self, data, status=None, latency=0.0, from_cache=False, version=None):
+        self.data = data
+        self.status = status
+        self.latency = latency
+        self.from_cache = from_cache
+        self.version = version
+
+
+class APIFetcher:
+    """
+    Fetches API data over pooled, keep-alive HTTP sessions.
+
+    One ``requests.Session`` is kept per host so that repeated polls of the
+    same API reuse an already open TCP/TLS connection instead of paying for a
+    new handshake (and DNS lookup) on every tick.
+
+    With a ResponseCache attached, fresh responses are served without a
+    request, and stale ones are revalidated with If-None-Match and
+    If-Modified-Since so an unchanged payload costs a 304 and no parsing.
+
+    With a RateLimiter attached, every request first takes a token from the
+    provider's quota buckets; a request that does not fit raises RateLimited
+    before anything is sent, so the caller can postpone it.
+
+    Failed requests are retried only when the failure is temporary (see
+    RetryPolicy), with jittered exponential backoff between attempts. Each
+    host has a CircuitBreaker; while it is open, fetches for that host raise
+    CircuitOpen immediately instead of waiting on a dead upstream.
+
+    Concurrent fetches of the same URL, e.g. two monitors watching the same
+    city, share one request and one parsed result (see SingleFlight).
+
+    Bodies are decoded with orjson when it is installed. A caller that only
+    reads part of a large response passes a projection, and only that part
+    is parsed (see json_decode.decode).
+
+    Attributes:
+        pool_connections (int): The number of connection pools to cache per session.
+        pool_maxsize (int): The maximum number of connections kept per pool.
+        timeout (int): The timeout in seconds for every request.
+        cache (ResponseCache): The HTTP response cache, or None.
+        limiter (RateLimiter): The quota limiter, or None.
+        retry_policy (RetryPolicy): Decides what is retried and the backoff.
+        failure_threshold (int): Consecutive failures that open a host's breaker.
+        reset_timeout (float): Seconds a host's breaker stays open before a probe.
+        flights (SingleFlight): Deduplicates fetches of the same URL.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 10,
+        timeout=10,
+        cache=None,
+        limiter=None,
+        retry_policy=None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        coalesce_window: float = 0.5,
+    ):
+        """
+        Initialize the APIFetcher instance.
+
+        Args:
+            pool_connections (int): The number of connection pools to cache per session.
+            pool_maxsize (int): The maximum number of connections kept per pool.
+            timeout (int): The timeout in seconds for every request.
+            cache (ResponseCache): The HTTP response cache, or None to disable caching.
+            limiter (RateLimiter): The quota limiter, or None to disable rate limiting.
+            retry_policy (RetryPolicy): The retry policy, defaults to RetryPolicy().
+            failure_threshold (int): Consecutive failures that open a host's breaker.
+            reset_timeout (float): Seconds a host's breaker stays open before a probe.
+            coalesce_window (float): Seconds a finished fetch is shared with
+                other fetches of the same URL.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.cache = cache
+        self.limiter = limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.flights = SingleFlight(linger=coalesce_window)
+        self._breakers = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, api_url: str) -> requests.Session:
+        """
+        Returns the session used for the host of the given URL, creating it
+        on first use.
+
+        Args:
+            api_url (str): The URL that is about to be fetched.
+
+        Returns:
+            requests.Session: The keep-alive session for the URL's host.
+        """
+        host = urlsplit(api_url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                # Ask the server to keep the connection open between polls
+                session.headers["Connection"] = "keep-alive"
+                self._sessions[host] = session
+            return session
+
+    def breaker_for(self, api_url: str) -> CircuitBreaker:
+        """
+        Returns the circuit breaker for the host of the given URL.
+
+        Args:
+            api_url (str): The URL that is about to be fetched.
+
+        Returns:
+            CircuitBreaker: The breaker shared by every URL on that host.
+        """
+        host = urlsplit(api_url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def get(self, api_url: str, timeout=None, headers=None) -> requests.Response:
+        """
+        Send a single GET request through the pooled session for the URL's host.
+
+        Args:
+            api_url (str): The URL to fetch.
+            timeout (int): The request timeout, defaults to the fetcher's timeout.
+            headers (dict): Extra request headers, such as conditional headers.
+
+        Returns:
+            requests.Response: The raw HTTP response.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        return self.session_for(api_url).get(api_url, timeout=timeout, headers=headers)
+
+    def fetch(
+        self, api_url, max_retries=5, delay=5, projection=None, cancel=None
+    ) -> FetchResult:
+        """
+        Fetch data from the given API URL and return its JSON content.
+
+        This method handles the following scenarios:
+
+        1. The API request fails with a 4XX or 5XX status code; only
+           temporary statuses (429, 5XX, ...) are retried.
+        2. The API request fails with a connection error or timeout.
+        3. The API request fails after some number of retries.
+        4. The host has failed repeatedly and its circuit breaker is open.
+
+        Args:
+            api_url (str): The URL of the API to fetch data from.
+            max_retries (int): The maximum number of attempts.
+            delay (int): The base delay in seconds for the backoff between attempts.
+            projection (dict): The parts of the response the caller reads,
+                or None to decode all of it. Every caller of a URL must pass
+                the same projection, as fetches of it share their result.
+            cancel (threading.Event): Stops waiting for the fetch once set.
+                A fetch shared with other callers keeps running for them;
+                it stops before its next attempt or during a backoff once
+                every caller has cancelled.
+
+        Returns:
+            FetchResult: The JSON content returned by the API (None if the
+            fetch fails) along with its status, latency and cache details.
+
+        Raises:
+            RateLimited: If sending the request would exceed a quota.
+            CircuitOpen: If the host's circuit breaker is open.
+            Cancelled: If ``cancel`` was set before the fetch finished.
+        """
+        # Join a fetch of the same URL that is already in flight, if any
+        return self.flights.do(
+            api_url,
+            lambda shared: self._fetch(api_url, max_retries, delay, projection, shared),
+            cancel=cancel,
+        )
+
+    def _fetch(self, api_url, max_retries, delay, projection, cancel) -> FetchResult:
+        # Get a logger to log errors
+        logger = get_logger(name="api_fetcher", log_to_console=True, log_to_file=False)
+        started = time.monotonic()
+
+        # Serve a fresh cached response without touching the network
+        entry = self.cache.get(api_url) if self.cache is not None else None
+        if entry is not None and entry.is_fresh():
+            self.cache.hits += 1
+            return self._cached_result(entry, 200, started, projection)
+        headers = entry.conditional_headers() if entry is not None else None
+        breaker = self.breaker_for(api_url)
+        wait = 0.0
+        last_error = None
+
+        # Set up a loop to retry the API fetch if it fails
+        for attempt in range(1, max_retries + 1):
+            if cancel is not None and cancel.is_set():
+                raise Cancelled(api_url)
+
+            # Shed the request at once while the host is known to be down;
+            # if the breaker opened during our own retries, report why
+            if not breaker.allow():
+                if last_error is not None:
+                    raise last_error
+                raise CircuitOpen(urlsplit(api_url).netloc, breaker.retry_after())
+
+            # Take a token from the provider's quota, or give up until it refills
+            if self.limiter is not None:
+                quota_wait = self.limiter.reserve(api_url)
+                if quota_wait > 0:
+                    # Nothing is sent, so a probe let through above is given
+                    # back rather than left pending forever
+                    breaker.release()
+                    raise RateLimited(api_url, quota_wait)
+
+            response = None
+            try:
+                # Send a GET request to the API over the pooled session
+                response = self.get(api_url, timeout=self.timeout, headers=headers)
+
+                # The cached body is still current; skip the download and parse
+                if entry is not None and response.status_code == 304:
+                    breaker.record_success()
+                    self.cache.revalidated += 1
+                    self.cache.refresh(entry, response)
+                    return self._cached_result(entry, 304, started, projection)
+
+                # Raise an error if the request was unsuccessful
+                response.raise_for_status()  # raise HTTPError for 4XX/5XX responses
+
+                # Parse the JSON content of the response, or the projected part
+                try:
+                    data = decode(response.content, projection)
+                except ValueError as e:
+                    # Report it the way response.json() does
+                    raise requests.exceptions.JSONDecodeError(
+                        str(e), getattr(e, "doc", ""), getattr(e, "pos", 0)
+                    ) from e
+                breaker.record_success()
+
+                version = None
+                if self.cache is not None:
+                    self.cache.misses += 1
+                    stored = self.cache.store(api_url, response, data)
+                    version = stored.version if stored is not None else None
+
+                # Return the JSON content of the response
+                return FetchResult(
+                    data,
+                    status=response.status_code,
+                    latency=time.monotonic() - started,
+                    version=version,
+                )
+            except requests.exceptions.HTTPError as http_err:
+                # Log the error if the request was unsuccessful
+                logger.error(f"[Attempt {attempt}/{max_retries}] HTTP Error: {http_err}")
+                status = getattr(response, "status_code", None)
+                if not self.retry_policy.is_retryable(http_err, status):
+                    # The host answered; the request itself is wrong (e.g. 4XX)
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                last_error = http_err
+                # If this is the last retry, raise the error
+                if attempt == max_retries:
+                    raise
+            except requests.exceptions.RequestException as e:
+                # Log the error if the request failed for any other reason
+                logger.error(
+                    f"[Attempt {attempt}/{max_retries}] Error fetching API data: {e}"
+                )
+                breaker.record_failure()
+                last_error = e
+                # If this is the last retry, or the error is permanent, raise it
+                if attempt == max_retries or not self.retry_policy.is_retryable(e):
+                    raise
+            except BaseException:
+                # Neither an answer nor a network failure: give the probe back
+                breaker.release()
+                raise
+
+            # Back off with jitter before retrying, honouring Retry-After
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            wait = self.retry_policy.next_wait(wait, retry_after, base=delay)
+            logger.info(f"Retrying in {wait:.1f}s")
+            # Wait before retrying, waking up early if the fetch is cancelled
+            if cancel is None:
+                time.sleep(wait)
+            elif cancel.wait(wait):
+                raise Cancelled(api_url)
+
+        # If all retries failed, return None
+        return FetchResult(None, latency=time.monotonic() - started)
+
+    def _cached_result(self, entry, status, started, projection) -> FetchResult:
+        # Entries loaded from disk are parsed once, on first use
+        if entry.data is None:
+            entry.data = decode(entry.body, projection)
+        return FetchResult(
+            entry.data,
+            status=status,
+            latency=time.monotonic() - started,
+            from_cache=True,
+            version=entry.version,
+        )
+
+    def pool_stats(self) -> dict:
+        """
+        Returns connection reuse counters for every host the fetcher has used.
+
+        A "miss" is a request that had to open a new connection, a "hit" is a
+        request that was served over an already open keep-alive connection.
+
+        Returns:
+            dict: ``{host: {"requests": int, "hits": int, "misses": int}}``
+        """
+        stats = {}
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for host, session in sessions:
+            requests_made = misses = 0
+            for adapter in set(session.adapters.values()):
+                # Each urllib3 pool counts the requests it served and the
+                # connections it had to open for them
+                for key in list(adapter.poolmanager.pools.keys()):
+                    pool = adapter.poolmanager.pools.get(key)
+                    if pool is None:
+                        continue
+                    requests_made += pool.num_requests
+                    misses += pool.num_connections
+            stats[host] = {
+                "requests": requests_made,
+                "hits": max(requests_made - misses, 0),
+                "misses": misses,
+            }
+        return stats
+
+    def release(self, api_url: str):
+        """
+        Close the session of a URL's host and drop its connections.
+
+        A later fetch from the host opens a new session.
+
+        Args:
+            api_url (str): A URL of the host no longer fetched from.
+        """
+        with self._lock:
+            session = self._sessions.pop(urlsplit(api_url).netloc, None)
+        if session is not None:
+            session.close()
+
+    def close(self):
+        """Close every pooled session and drop its connections."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+# The fetcher shared by the CLI and the GUI monitors
+_default_fetcher = None
+_default_lock = threading.Lock()
+
+
+def get_fetcher() -> APIFetcher:
+    """
+    Returns the process-wide APIFetcher, creating it on first use.
+
+    Returns:
+        APIFetcher: The fetcher shared by every monitor in this process.
+    """
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = APIFetcher()
+        return _default_fetcher
+
+
+def fetch_api(api_url, max_retries=5, delay=5, fetcher=None):
     """
     Fetch data from the given API URL and return its JSON content.
 
@@ -17,41 +437,11 @@ def fetch_api(api_url, max_retries=5, delay=5):
         api_url (str): The URL of the API to fetch data from.
         max_retries (int): The maximum number of times to retry fetching the API data.
         delay (int): The delay in seconds between retry attempts.
+        fetcher (APIFetcher): The fetcher to use, defaults to the shared fetcher.
 
     Returns:
         dict: The JSON content returned by the API, or None if the fetch fails.
     """
-    # Get a logger to log errors
-    logger = get_logger(name="api_fetcher", log_to_console=True, log_to_file=False)
-
-    # Set up a loop to retry the API fetch if it fails
-    for attempt in range(1, max_retries + 1):
-        try:
-            # Send a GET request to the API
-            response = requests.get(api_url, timeout=10)  # timeout to avoid hanging
-
-            # Raise an error if the request was unsuccessful
-            response.raise_for_status()  # raise HTTPError for 4XX/5XX responses
-
-            # Return the JSON content of the response
-            return response.json()
-        except requests.exceptions.HTTPError as http_err:
-            # Log the error if the request was unsuccessful
-            logger.error(f"[Attempt {attempt}/{max_retries}] HTTP Error: {http_err}")
-            # If this is the last retry, raise the error
-            if attempt == max_retries:
-                raise
-        except requests.exceptions.RequestException as e:
-            # Log the error if the request failed for any other reason
-            logger.error(
-                f"[Attempt {attempt}/{max_retries}] Error fetching API data: {e}"
-            )
-            # If this is the last retry, raise the error
-            if attempt == max_retries:
-                raise
-
-        # Sleep for the specified delay before retrying
-        time.sleep(delay)  # wait before retrying
-
-    # If all retries failed, return None
-    return None
+    if fetcher is None:
+        fetcher = get_fetcher()
+    return fetcher.fetch(api_url, max_retries=max_retries, delay=delay).data
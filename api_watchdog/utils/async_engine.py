@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from api_watchdog.utils.scheduler import Cadence, lag_stats
+
+
+class AsyncEngine:
+    """
+    Polls many targets concurrently from one asyncio event loop.
+
+    Every target gets its own lightweight task that keeps its schedule, and
+    each poll is started as a separate task, so a slow or retrying endpoint
+    only delays itself. Polls run under a global semaphore and a per-host
+    semaphore, which bound the total number of requests in flight and the
+    number of requests sent to any one host.
+
+    The HTTP requests themselves are made by the blocking, pooled fetcher on
+    a bounded thread pool, so the engine shares connections, retries and
+    logging with the synchronous path.
+
+    Attributes:
+        max_concurrency (int): The maximum number of polls in flight.
+        per_host (int): The maximum number of polls in flight per host.
+        skipped (int): Ticks skipped because the previous poll of the same
+            target was still running.
+    """
+
+    def __init__(self, max_concurrency: int = 10, per_host: int = 2, jitter: float = 0.0):
+        """
+        Initialize the AsyncEngine instance.
+
+        Args:
+            max_concurrency (int): The maximum number of polls in flight.
+            per_host (int): The maximum number of polls in flight per host.
+            jitter (float): The upper bound of each target's random phase
+                offset, used to spread load across targets.
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.jitter = jitter
+        self.skipped = 0
+        self.completed = 0
+        self._cadences = []
+        self._global = None
+        self._hosts = {}
+        self._executor = None
+
+    def _host_semaphore(self, api_url: str) -> asyncio.Semaphore:
+        host = urlsplit(api_url).netloc
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return semaphore
+
+    async def poll(self, target, poll, cadence=None):
+        """
+        Run one poll of a target within the concurrency limits.
+
+        Args:
+            target (Target): The target to poll.
+            poll (callable): A blocking function called as ``poll(target)``
+                that fetches and processes the target's data. If it returns
+                a number of seconds, the target's next poll is deferred by
+                at least that long.
+            cadence (Cadence): The target's schedule, deferred as requested.
+        """
+        loop = asyncio.get_running_loop()
+        # Wait for the host's slot before taking a global one, so polls
+        # queued behind a saturated host do not hold slots other hosts need
+        async with self._host_semaphore(target.api_url), self._global:
+            defer = await loop.run_in_executor(self._executor, poll, target)
+        self.completed += 1
+        if defer and cadence is not None:
+            cadence.defer(loop.time() + defer)
+
+    async def _monitor(self, target, poll):
+        loop = asyncio.get_running_loop()
+        # Fire on a fixed grid of the loop's monotonic clock so fetch time
+        # never makes the schedule drift
+        cadence = Cadence(target.interval, loop.time(), self.jitter)
+        self._cadences.append(cadence)
+        in_flight = None
+        while True:
+            # Sleep again if a finished poll deferred the cadence meanwhile
+            delay = cadence.delay(loop.time())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            cadence.fire(loop.time())
+
+            # Start the poll as its own task so this loop keeps its schedule
+            if in_flight is None or in_flight.done():
+                in_flight = asyncio.ensure_future(self.poll(target, poll, cadence))
+            else:
+                # The previous poll is still running; skip rather than queue
+                self.skipped += 1
+
+            cadence.advance(loop.time())
+
+    async def run(self, targets, poll):
+        """
+        Poll every target at its interval until cancelled.
+
+        Args:
+            targets (list): The Target instances to monitor.
+            poll (callable): A blocking function called as ``poll(target)``.
+        """
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._hosts = {}
+        self._cadences = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="api_watchdog"
+        )
+        try:
+            await asyncio.gather(*(self._monitor(target, poll) for target in targets))
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def run_forever(self, targets, poll):
+        """
+        Run the engine on a new event loop until interrupted.
+
+        Args:
+            targets (list): The Target instances to monitor.
+            poll (callable): A blocking function called as ``poll(target)``.
+        """
+        asyncio.run(self.run(targets, poll))
+
+    def stats(self) -> dict:
+        """
+        Returns counters describing the engine's work.
+
+        Returns:
+            dict: Completed polls, ticks skipped due to slow polls and the
+            observed schedule lag.
+        """
+        stats = {"completed": self.completed, "skipped": self.skipped}
+        stats.update(lag_stats(self._cadences))
+        return stats
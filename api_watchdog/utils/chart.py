@@ -0,0 +1,330 @@
+import math
+import time
+from array import array
+
+# The colors series are drawn in, in the order they first appear
+COLORS = ("#1f77b4", "#d62728", "#2ca02c", "#ff7f0e", "#9467bd", "#8c564b")
+
+
+class Series:
+    """
+    The latest samples of one value, kept in a fixed-size ring buffer.
+
+    The buffer is divided into blocks of ``block`` samples whose time range
+    and minimum and maximum (with their times) are kept up to date on every
+    append. Downsampling reads a block's summary instead of its samples
+    whenever the whole block falls into one pixel column, so drawing a long
+    history costs about one step per block and per column, not per sample.
+
+    Attributes:
+        capacity (int): The most samples kept; older ones are overwritten.
+        block (int): The number of samples summarized together.
+        version (int): The number of samples ever appended; a chart redraws
+            the series only when it changed.
+    """
+
+    def __init__(self, capacity: int = 8192, block: int = 8):
+        """
+        Initialize the Series instance.
+
+        Args:
+            capacity (int): The most samples kept, rounded up to whole blocks.
+            block (int): The number of samples summarized together.
+        """
+        self.block = block
+        self.capacity = -(-capacity // block) * block
+        self.version = 0
+        self._ts = array("d", bytes(8 * self.capacity))
+        self._values = array("d", bytes(8 * self.capacity))
+        # Per block: first ts, last ts, min, ts of min, max, ts of max
+        self._summary = [None] * (self.capacity // block)
+
+    def __len__(self) -> int:
+        return min(self.version, self.capacity)
+
+    def append(self, ts: float, value: float):
+        """
+        Add a sample; NaN values are skipped.
+
+        Args:
+            ts (float): The Unix time of the sample, not older than the last.
+            value (float): The sample.
+        """
+        if math.isnan(value):
+            return
+        i = self.version % self.capacity
+        self._ts[i] = ts
+        self._values[i] = value
+        self.version += 1
+
+        b = i // self.block
+        summary = self._summary[b]
+        if i % self.block == 0 or summary is None:
+            # The block starts over once the ring wraps around into it
+            self._summary[b] = [ts, ts, value, ts, value, ts]
+            return
+        summary[1] = ts
+        if value < summary[2]:
+            summary[2], summary[3] = value, ts
+        if value > summary[4]:
+            summary[4], summary[5] = value, ts
+
+    def last(self) -> tuple:
+        """Returns the newest (ts, value), or None if the series is empty."""
+        if not self.version:
+            return None
+        i = (self.version - 1) % self.capacity
+        return self._ts[i], self._values[i]
+
+    def span(self) -> tuple:
+        """Returns the (first, last) sample times, or None if empty."""
+        if not self.version:
+            return None
+        first = self.version % self.capacity if self.version > self.capacity else 0
+        return self._ts[first], self.last()[0]
+
+    def _runs(self):
+        # Yield the samples oldest first, as ("block", index) for whole
+        # summarized blocks and ("raw", start, stop) for index ranges
+        n = len(self)
+        head = self.version % self.capacity
+        if self.version <= self.capacity:
+            segments = [(0, n)]
+        else:
+            segments = [(head, self.capacity), (0, head)]
+        block = self.block
+        for start, stop in segments:
+            i = start
+            while i < stop:
+                b, offset = divmod(i, block)
+                end = min((b + 1) * block, stop)
+                # A block is summarized only if all of its samples are in
+                # this run; the block being overwritten is read sample by sample
+                if offset == 0 and end - i == block and not (
+                    self.version > self.capacity and b == head // block
+                ):
+                    yield ("block", b)
+                else:
+                    yield ("raw", i, end)
+                i = end
+
+    def columns(self, t0: float, t1: float, width: int) -> list:
+        """
+        Downsample to the minimum and maximum of each pixel column.
+
+        Args:
+            t0 (float): The time at the left edge.
+            t1 (float): The time at the right edge.
+            width (int): The number of pixel columns.
+
+        Returns:
+            list: ``(column, value, value)`` per column holding samples,
+            with the minimum and maximum in the order they occurred.
+        """
+        if width <= 0 or not self.version:
+            return []
+        scale = width / (t1 - t0) if t1 > t0 else 0.0
+        last_column = width - 1
+        # Per column: [column, min, ts of min, max, ts of max]
+        columns = []
+        current = [-1, 0.0, 0.0, 0.0, 0.0]
+
+        ts, values, summary = self._ts, self._values, self._summary
+        for run in self._runs():
+            if run[0] == "block":
+                first, last, lo, lo_t, hi, hi_t = summary[run[1]]
+                column = min(int((first - t0) * scale), last_column)
+                if column == min(int((last - t0) * scale), last_column):
+                    # The whole block falls into one column
+                    if column != current[0]:
+                        current = [column, lo, lo_t, hi, hi_t]
+                        columns.append(current)
+                        continue
+                    if lo < current[1]:
+                        current[1], current[2] = lo, lo_t
+                    if hi > current[3]:
+                        current[3], current[4] = hi, hi_t
+                    continue
+                start, stop = run[1] * self.block, (run[1] + 1) * self.block
+            else:
+                _, start, stop = run
+            for i in range(start, stop):
+                t = ts[i]
+                value = values[i]
+                column = min(int((t - t0) * scale), last_column)
+                if column != current[0]:
+                    current = [column, value, t, value, t]
+                    columns.append(current)
+                elif value < current[1]:
+                    current[1], current[2] = value, t
+                elif value > current[3]:
+                    current[3], current[4] = value, t
+
+        return [
+            (column, lo, hi) if lo_t <= hi_t else (column, hi, lo)
+            for column, lo, lo_t, hi, hi_t in columns
+        ]
+
+
+class LiveChart:
+    """
+    Draws the latest values of a monitor on a Tk Canvas.
+
+    Every numeric column of the monitor's records (temperature, pressure,
+    close price, ...) is a Series drawn as one line, scaled to its own
+    range and labelled with its latest value. The Canvas items are created
+    once and only their coordinates change, and a series is only redrawn
+    when it received samples or the canvas was resized.
+
+    Redraws are throttled: samples mark the chart dirty and one redraw is
+    scheduled at most every ``min_interval`` seconds. A redraw stops once
+    it has spent ``budget`` seconds and leaves the remaining series for
+    the next one, so that many charts never stall the window.
+
+    Attributes:
+        canvas (tk.Canvas): The canvas to draw on.
+        series (dict): The Series of every column, by name.
+        min_interval (float): The shortest time between two redraws.
+        budget (float): Seconds one redraw may spend.
+        redraws (int): The number of redraws.
+        redraw_max (float): The longest redraw, in seconds.
+    """
+
+    # Pixels kept free around the plot, for the labels
+    PADDING = 4
+    LABEL_HEIGHT = 14
+
+    def __init__(
+        self,
+        canvas,
+        capacity: int = 8192,
+        min_interval: float = 0.2,
+        budget: float = 0.008,
+        clock=time.perf_counter,
+    ):
+        """
+        Initialize the LiveChart instance.
+
+        Args:
+            canvas (tk.Canvas): The canvas to draw on.
+            capacity (int): The most samples kept per series.
+            min_interval (float): The shortest time between two redraws.
+            budget (float): Seconds one redraw may spend.
+            clock (callable): Returns seconds, for throttling.
+        """
+        self.canvas = canvas
+        self.capacity = capacity
+        self.min_interval = min_interval
+        self.budget = budget
+        self.clock = clock
+        self.series = {}
+        self.redraws = 0
+        self.redraw_max = 0.0
+        self._items = {}
+        self._drawn = {}
+        self._last_redraw = 0.0
+        self._after_id = None
+        self._closed = False
+
+    def add(self, ts: float, values: dict):
+        """
+        Add the numeric values of an observation and schedule a redraw.
+
+        Args:
+            ts (float): The Unix time of the observation.
+            values (dict): The values by series name.
+        """
+        for name, value in values.items():
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = Series(self.capacity)
+            series.append(ts, value)
+        self.schedule()
+
+    def schedule(self):
+        """Schedule a redraw, unless one is already pending."""
+        if self._after_id is not None or self._closed:
+            return
+        wait = max(self._last_redraw + self.min_interval - self.clock(), 0.001)
+        self._after_id = self.canvas.after(int(wait * 1000) or 1, self.redraw)
+
+    def redraw(self):
+        """Redraw the series that changed, within the frame budget."""
+        self._after_id = None
+        started = self._last_redraw = self.clock()
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        names = list(self.series)
+        spans = [span for span in (s.span() for s in self.series.values()) if span]
+        if not spans or width <= 2 * self.PADDING:
+            return
+        # Every series shares the time axis, so they line up
+        t0 = min(span[0] for span in spans)
+        t1 = max(span[1] for span in spans)
+
+        pending = False
+        for row, name in enumerate(names):
+            series = self.series[name]
+            state = (series.version, width, height, t0, t1)
+            if self._drawn.get(name) == state:
+                continue
+            if self.clock() - started >= self.budget:
+                pending = True
+                break
+            self._draw(row, name, series, width, height, t0, t1)
+            self._drawn[name] = state
+
+        elapsed = self.clock() - started
+        self.redraws += 1
+        self.redraw_max = max(self.redraw_max, elapsed)
+        if pending:
+            self.schedule()
+
+    def _draw(self, row, name, series, width, height, t0, t1):
+        pad = self.PADDING
+        plot_width = width - 2 * pad
+        top = pad + self.LABEL_HEIGHT * len(self.series)
+        plot_height = max(height - top - pad, 1)
+        columns = series.columns(t0, t1, plot_width)
+        lo = min(min(c[1], c[2]) for c in columns)
+        hi = max(max(c[1], c[2]) for c in columns)
+        scale = plot_height / (hi - lo) if hi > lo else 0.0
+        bottom = top + plot_height if scale else top + plot_height / 2
+
+        points = []
+        for column, first, second in columns:
+            x = pad + column
+            points += (x, bottom - (first - lo) * scale, x, bottom - (second - lo) * scale)
+        if len(points) == 4:
+            # A single column is drawn as a short dash
+            points += (points[0] + 1, points[1])
+
+        items = self._items.get(name)
+        if items is None:
+            color = COLORS[len(self._items) % len(COLORS)]
+            items = self._items[name] = (
+                self.canvas.create_line(*points, fill=color),
+                self.canvas.create_text(pad, pad, anchor="nw", fill=color),
+            )
+        line, label = items
+        self.canvas.coords(line, *points)
+        self.canvas.coords(label, pad, pad + row * self.LABEL_HEIGHT)
+        self.canvas.itemconfigure(
+            label, text=f"{name}: {series.last()[1]:.6g} (range {lo:.6g} to {hi:.6g})"
+        )
+
+    def close(self):
+        """Cancel the pending redraw; the chart is no longer shown."""
+        self._closed = True
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+
+    def stats(self) -> dict:
+        """Returns the number of series and samples, redraws and the longest."""
+        return {
+            "series": len(self.series),
+            "samples": sum(len(series) for series in self.series.values()),
+            "redraws": self.redraws,
+            "redraw_max_ms": self.redraw_max * 1000,
+        }
@@ -0,0 +1,177 @@
+import queue
+import threading
+import time
+
+# Exit statuses of "api-watchdog check"; 2 is argparse's usage error
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_TIMEOUT = 3
+
+
+class CheckResult:
+    """
+    The outcome of checking one target once.
+
+    Attributes:
+        name (str): The target name.
+        ok (bool): True if the target returned at least one observation.
+        status (int): The HTTP status, or None.
+        latency (float): Seconds spent fetching, or None.
+        from_cache (bool): True if no download was needed.
+        records (list): The extracted observations.
+        error (str): Why the check failed, or None.
+        timed_out (bool): True if the deadline passed before it finished.
+    """
+
+    __slots__ = (
+        "name",
+        "ok",
+        "status",
+        "latency",
+        "from_cache",
+        "records",
+        "error",
+        "timed_out",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        ok: bool = False,
+        status=None,
+        latency=None,
+        from_cache: bool = False,
+        records=None,
+        error=None,
+        timed_out: bool = False,
+    ):
+        self.name = name
+        self.ok = ok
+        self.status = status
+        self.latency = latency
+        self.from_cache = from_cache
+        self.records = records or []
+        self.error = error
+        self.timed_out = timed_out
+
+    def to_dict(self) -> dict:
+        """Returns the result as a JSON-compatible dict."""
+        return {
+            "target": self.name,
+            "ok": self.ok,
+            "status": self.status,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 3),
+            "from_cache": self.from_cache,
+            "error": self.error,
+            "timed_out": self.timed_out,
+            "records": self.records,
+        }
+
+
+def check_target(target, fetch) -> CheckResult:
+    """
+    Fetch a target once and pass the result to its outputs.
+
+    Args:
+        target (Target): The target to check.
+        fetch (callable): Returns the FetchResult of a target.
+
+    Returns:
+        CheckResult: The outcome; errors are reported in it, not raised.
+    """
+    fetched_at = time.time()
+    try:
+        result = fetch(target)
+        # Log, sink and store it like a monitoring tick would
+        target.handle(result, fetched_at)
+    except Exception as e:
+        target.failed(fetched_at)
+        return CheckResult(target.name, error=str(e) or type(e).__name__)
+
+    if result.data is None:
+        records, error = [], "no data"
+    elif hasattr(target.api, "extract"):
+        records = target.api.extract(result.data)
+        error = None if records else "no observation in the response"
+    else:
+        records, error = [], None
+    return CheckResult(
+        target.name,
+        ok=error is None,
+        status=result.status,
+        latency=result.latency,
+        from_cache=result.from_cache,
+        records=records,
+        error=error,
+    )
+
+
+def check_targets(
+    targets, fetch, deadline: float = 30.0, max_concurrency: int = 10, clock=time.monotonic
+) -> list:
+    """
+    Check every target once, concurrently, within a total deadline.
+
+    Up to ``max_concurrency`` daemon threads take targets from a shared
+    queue. Targets still unfinished at the deadline are reported as timed
+    out and their threads are abandoned, so the wall time stays bounded
+    however many targets there are and however slowly they answer.
+
+    Args:
+        targets (list): The Target instances.
+        fetch (callable): Returns the FetchResult of a target.
+        deadline (float): Seconds until unfinished targets are given up.
+        max_concurrency (int): The most targets fetched at once.
+        clock (callable): Returns monotonic seconds.
+
+    Returns:
+        list: One CheckResult per target, in the order of ``targets``.
+
+    Raises:
+        ValueError: If max_concurrency is not positive.
+    """
+    # Without a worker every target would time out without being fetched
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be positive, got {max_concurrency}")
+    pending = queue.SimpleQueue()
+    for index, target in enumerate(targets):
+        pending.put((index, target))
+    done = queue.SimpleQueue()
+
+    def work():
+        while True:
+            try:
+                index, target = pending.get_nowait()
+            except queue.Empty:
+                return
+            done.put((index, check_target(target, fetch)))
+
+    for _ in range(min(max_concurrency, len(targets))):
+        threading.Thread(target=work, name="api_watchdog-check", daemon=True).start()
+
+    results = [None] * len(targets)
+    until = clock() + deadline
+    for _ in targets:
+        try:
+            index, result = done.get(timeout=max(until - clock(), 0.0))
+        except queue.Empty:
+            break
+        results[index] = result
+
+    return [
+        result
+        or CheckResult(target.name, error=f"deadline of {deadline:g}s exceeded", timed_out=True)
+        for target, result in zip(targets, results)
+    ]
+
+
+def exit_status(results) -> int:
+    """
+    Returns the exit status for a check: EXIT_TIMEOUT if any target ran out
+    of time, else EXIT_FAILED if any failed, else EXIT_OK.
+    """
+    if any(result.timed_out for result in results):
+        return EXIT_TIMEOUT
+    if any(not result.ok for result in results):
+        return EXIT_FAILED
+    return EXIT_OK
@@ -0,0 +1,167 @@
+import hashlib
+import json
+
+
+def content_hash(data) -> str:
+    """
+    Returns a digest of the canonical JSON form of ``data``.
+
+    Keys are sorted and whitespace is dropped, so two responses with the same
+    content hash equally regardless of key order.
+
+    Args:
+        data: A JSON-compatible value.
+
+    Returns:
+        str: The hex digest.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Change:
+    """
+    A single difference between two JSON documents.
+
+    Attributes:
+        path (tuple): The keys and list indexes leading to the value.
+        old: The previous value, or None if the path was added.
+        new: The current value, or None if the path was removed.
+    """
+
+    __slots__ = ("path", "old", "new")
+
+    def __init__(self, path: tuple, old, new):
+        self.path = path
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return f"Change({format_path(self.path)}: {self.old!r} -> {self.new!r})"
+
+
+def format_path(path: tuple) -> str:
+    """Returns a dotted, human-readable form of a change path."""
+    return ".".join(str(part) for part in path) or "<root>"
+
+
+def diff_json(old, new, path: tuple = ()) -> list:
+    """
+    Returns the paths at which two JSON documents differ.
+
+    Dictionaries are compared key by key and lists index by index, so a
+    change deep inside a response is reported at its own path rather than as
+    a change of the whole document.
+
+    Args:
+        old: The previous document.
+        new: The current document.
+        path (tuple): The path of ``old``/``new`` within the full documents.
+
+    Returns:
+        list: The Change instances, in document order.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in new:
+            if key not in old:
+                changes.append(Change(path + (key,), None, new[key]))
+            elif old[key] != new[key]:
+                changes.extend(diff_json(old[key], new[key], path + (key,)))
+        for key in old:
+            if key not in new:
+                changes.append(Change(path + (key,), old[key], None))
+        return changes
+
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        for index in range(max(len(old), len(new))):
+            if index >= len(new):
+                changes.append(Change(path + (index,), old[index], None))
+            elif index >= len(old):
+                changes.append(Change(path + (index,), None, new[index]))
+            elif old[index] != new[index]:
+                changes.extend(diff_json(old[index], new[index], path + (index,)))
+        return changes
+
+    if old != new:
+        return [Change(path, old, new)]
+    return []
+
+
+class Diff:
+    """
+    The result of comparing a response with the previous one for a target.
+
+    Attributes:
+        first (bool): True if there was no previous response.
+        changes (list): The Change instances; empty if nothing changed.
+    """
+
+    __slots__ = ("first", "changes")
+
+    def __init__(self, first: bool, changes: list):
+        self.first = first
+        self.changes = changes
+
+    @property
+    def changed(self) -> bool:
+        """True if this is the first response or anything differs."""
+        return self.first or bool(self.changes)
+
+    def touches(self, path: tuple) -> bool:
+        """
+        Returns True if a value at or under ``path`` changed.
+
+        A change of a parent of ``path`` (such as a whole object being added)
+        counts as touching it too.
+
+        Args:
+            path (tuple): The path that a logged field is read from.
+        """
+        if self.first:
+            return True
+        for change in self.changes:
+            common = min(len(change.path), len(path))
+            if change.path[:common] == path[:common]:
+                return True
+        return False
+
+
+class ChangeDetector:
+    """
+    Compares each response for a target with the previous one.
+
+    The fast path compares canonical content hashes, so an unchanged response
+    costs one serialisation and no tree walk. Only when the hashes differ is
+    the structural diff run to find the changed paths.
+
+    Attributes:
+        previous: The last response seen.
+        previous_hash (str): The content hash of the last response.
+    """
+
+    def __init__(self):
+        self.previous = None
+        self.previous_hash = None
+
+    def compare(self, data) -> Diff:
+        """
+        Compare a response with the previous one and remember it.
+
+        Args:
+            data: The parsed API response.
+
+        Returns:
+            Diff: What changed since the previous response.
+        """
+        digest = content_hash(data)
+        if self.previous_hash is None:
+            diff = Diff(True, [])
+        elif digest == self.previous_hash:
+            diff = Diff(False, [])
+        else:
+            diff = Diff(False, diff_json(self.previous, data))
+        self.previous = data
+        self.previous_hash = digest
+        return diff
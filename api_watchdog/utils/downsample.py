@@ -0,0 +1,247 @@
+import math
+import threading
+import time
+from api_watchdog.utils.log_rotation import parse_duration
+from api_watchdog.utils.logger import get_logger
+from api_watchdog.utils.timeseries import COLUMNS, STATS
+
+# Raw rows for a week, 1-minute buckets for 90 days, 1-hour buckets after that
+DEFAULT_TIERS = "raw:7d,1m:90d,1h"
+
+
+class Tier:
+    """
+    One level of stored history.
+
+    Attributes:
+        name (str): "raw", or the bucket size as written (e.g. "1m").
+        resolution (int): The bucket size in milliseconds, 0 for raw rows.
+        retention (int): How long rows are kept, in milliseconds, or None to
+            keep them forever.
+    """
+
+    __slots__ = ("name", "resolution", "retention")
+
+    def __init__(self, name: str, resolution: int, retention=None):
+        self.name = name
+        self.resolution = resolution
+        self.retention = retention
+
+
+def parse_tiers(spec: str) -> list:
+    """
+    Parse tiers written as "raw:7d,1m:90d,1h": a bucket size (or "raw"),
+    optionally followed by how long to keep it.
+
+    Args:
+        spec (str): The tier list, finest first, starting with "raw".
+
+    Returns:
+        list: The Tier instances, finest first.
+
+    Raises:
+        ValueError: If the list does not start with "raw" or the bucket
+            sizes do not grow.
+    """
+    tiers = []
+    for part in spec.split(","):
+        name, _, keep = part.strip().partition(":")
+        name = name.strip().lower()
+        resolution = 0 if name == "raw" else int(parse_duration(name) * 1000)
+        retention = int(parse_duration(keep) * 1000) if keep.strip() else None
+        tiers.append(Tier(name, resolution, retention))
+    if not tiers or tiers[0].name != "raw":
+        raise ValueError(f"invalid tiers {spec!r}: the first tier must be 'raw'")
+    for finer, coarser in zip(tiers, tiers[1:]):
+        if coarser.resolution <= finer.resolution or (
+            finer.resolution and coarser.resolution % finer.resolution
+        ):
+            raise ValueError(
+                f"invalid tiers {spec!r}: {coarser.name} is not a multiple of {finer.name}"
+            )
+    return tiers
+
+
+class _Bucket:
+    """Accumulates the statistics of one column over one bucket."""
+
+    __slots__ = ("first", "max", "min", "last", "total", "weight")
+
+    def __init__(self):
+        self.first = self.last = math.nan
+        self.max = -math.inf
+        self.min = math.inf
+        self.total = 0.0
+        self.weight = 0
+
+    def add(self, first, high, low, last, mean, weight):
+        if math.isnan(mean):
+            return
+        if not self.weight:
+            self.first = first
+        self.last = last
+        self.max = max(self.max, high)
+        self.min = min(self.min, low)
+        self.total += mean * weight
+        self.weight += weight
+
+    def values(self) -> tuple:
+        if not self.weight:
+            return (math.nan,) * len(STATS)
+        return (self.first, self.max, self.min, self.last, self.total / self.weight)
+
+
+def rollup(rows: dict, resolution: int, from_raw: bool) -> list:
+    """
+    Aggregate rows into buckets of ``resolution`` milliseconds.
+
+    Args:
+        rows (dict): The result of Series.query on the source series.
+        resolution (int): The bucket size in milliseconds.
+        from_raw (bool): True if the rows are raw observations, False if
+            they are buckets of a finer tier.
+
+    Returns:
+        list: (bucket start, {column: value}) pairs, in time order.
+    """
+    buckets = []
+    current = None
+    for i, ts in enumerate(rows["ts"]):
+        start = ts - ts % resolution
+        if current is None or start != current[0]:
+            current = (start, {c: _Bucket() for c in COLUMNS}, [0])
+            buckets.append(current)
+        _, stats, count = current
+        if from_raw:
+            count[0] += 1
+            for c in COLUMNS:
+                v = rows[c][i]
+                stats[c].add(v, v, v, v, v, 1)
+        else:
+            weight = int(rows["count"][i])
+            count[0] += weight
+            for c in COLUMNS:
+                stats[c].add(*(rows[f"{c}.{stat}"][i] for stat in STATS), weight)
+
+    result = []
+    for start, stats, count in buckets:
+        values = {"count": float(count[0])}
+        for c in COLUMNS:
+            values.update(zip((f"{c}.{stat}" for stat in STATS), stats[c].values()))
+        result.append((start, values))
+    return result
+
+
+class Compactor:
+    """
+    Rolls stored observations up into coarser tiers and enforces retention.
+
+    Each pass builds every tier from the one below it (raw rows into
+    1-minute buckets, 1-minute buckets into 1-hour buckets, ...), starting
+    after the last bucket the tier already holds and stopping at the last
+    bucket that is complete, so work is incremental and buckets are never
+    rewritten. Segments older than a tier's retention are then deleted,
+    but only once the next tier has rolled them up.
+
+    Passes run on a background thread and only read the series that the
+    fetch threads append to, so ingestion waits for one segment read at
+    most. A failed pass is logged and the next one runs as scheduled.
+
+    Attributes:
+        store (TimeSeriesStore): The store to compact.
+        tiers (list): The Tier instances, finest first.
+        interval (float): Seconds between background passes.
+        buckets (int): Buckets written so far.
+        dropped (int): Segments deleted so far.
+    """
+
+    def __init__(self, store, tiers=None, interval: float = 60.0, clock=time.time):
+        """
+        Initialize the Compactor instance.
+
+        Args:
+            store (TimeSeriesStore): The store to compact.
+            tiers (list): The Tier instances, defaults to DEFAULT_TIERS.
+            interval (float): Seconds between background passes.
+            clock (callable): Returns the current Unix time in seconds.
+        """
+        self.store = store
+        self.tiers = tiers if tiers is not None else parse_tiers(DEFAULT_TIERS)
+        self.interval = interval
+        self.clock = clock
+        self.buckets = 0
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def compact(self):
+        """Run one pass over every target in the store."""
+        now = int(self.clock() * 1000)
+        for target in self.store.targets():
+            self.compact_target(target, now)
+
+    def compact_target(self, target: str, now: int):
+        """
+        Bring a target's tiers up to date and apply retention.
+
+        Args:
+            target (str): The target name.
+            now (int): The current time in Unix milliseconds.
+        """
+        series = [self.store.series(target)]
+        for finer, tier in zip(self.tiers, self.tiers[1:]):
+            source = series[-1]
+            dest = self.store.series(target, tier.name)
+            series.append(dest)
+
+            # Only whole buckets, starting after the newest one written
+            start = None if dest.last_ts is None else dest.last_ts + tier.resolution
+            end = now - now % tier.resolution - 1
+            if start is not None and start > end:
+                continue
+            rows = source.query(start, end)
+            for bucket, values in rollup(rows, tier.resolution, finer.resolution == 0):
+                dest.append(bucket, values)
+                self.buckets += 1
+
+        for index, tier in enumerate(self.tiers):
+            if tier.retention is None:
+                continue
+            cutoff = now - tier.retention
+            if index + 1 < len(series):
+                # Keep what the next tier has not rolled up yet
+                rolled = series[index + 1].last_ts
+                cutoff = min(cutoff, -1 if rolled is None else rolled)
+            self.dropped += series[index].drop_before(cutoff)
+
+    def start(self):
+        """Start compacting in the background every ``interval`` seconds."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="api_watchdog-compactor", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread after its current pass."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.compact()
+            except Exception as e:
+                # A full disk, a deleted store or a bad tier directory should
+                # not stop monitoring; the next pass tries again
+                logger = get_logger(
+                    name="api_watchdog_compactor", log_to_console=True, log_to_file=False
+                )
+                logger.error(f"Compaction failed: {e!r}")
+
+    def stats(self) -> dict:
+        """Returns the buckets written and segments deleted."""
+        return {"buckets": self.buckets, "dropped_segments": self.dropped}
@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+from api_watchdog.utils.logger import get_logger
+
+
+class FetchPool:
+    """
+    Runs blocking work on worker threads and hands the results to Tk.
+
+    Tk widgets may only be touched from the thread running the main loop,
+    and anything that blocks that thread freezes the window. Work submitted
+    here (fetches, with their retries, backoff sleeps and timeouts) runs on
+    a thread pool instead; each result is put on a queue that the Tk thread
+    drains every ``drain_interval`` milliseconds, where the work's callback
+    runs. A drain stops after ``budget`` seconds so that a burst of results
+    from many monitors is spread over several frames.
+
+    Attributes:
+        root (tk.Misc): The widget whose ``after`` schedules the drains.
+        drain_interval (int): Milliseconds between drains of the queue.
+        budget (float): Seconds one drain may spend running callbacks.
+        submitted (int): The number of work items submitted.
+        completed (int): The number of callbacks run.
+        drain_max (float): The longest drain, in seconds.
+    """
+
+    def __init__(
+        self,
+        root,
+        max_workers: int = 16,
+        drain_interval: int = 50,
+        budget: float = 0.02,
+        clock=time.perf_counter,
+    ):
+        """
+        Initialize the FetchPool instance and start draining.
+
+        Args:
+            root (tk.Misc): The widget whose ``after`` schedules the drains.
+            max_workers (int): The number of worker threads; monitors beyond
+                that wait for a free worker rather than for each other.
+            drain_interval (int): Milliseconds between drains of the queue.
+            budget (float): Seconds one drain may spend running callbacks.
+            clock (callable): Returns seconds, for the drain budget.
+        """
+        self.root = root
+        self.drain_interval = drain_interval
+        self.budget = budget
+        self.clock = clock
+        self.submitted = 0
+        self.completed = 0
+        self.drain_max = 0.0
+        self.max_workers = max_workers
+        self._work = queue.SimpleQueue()
+        self._results = queue.SimpleQueue()
+        self._workers = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._drain_id = root.after(drain_interval, self.drain)
+
+    def submit(self, work, callback):
+        """
+        Run ``work()`` on a worker, then ``callback(result, error)`` on Tk.
+
+        Args:
+            work (callable): The blocking work, called without arguments.
+            callback (callable): Called on the Tk thread with the result of
+                ``work`` and None, or with None and the exception it raised.
+
+        Returns:
+            bool: False if the pool is closed and the work was dropped.
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            self.submitted += 1
+            # Workers are started as work comes in, up to max_workers
+            if self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(
+                    target=self._work_loop, name="api_watchdog-gui", daemon=True
+                ).start()
+            self._work.put((work, callback))
+        return True
+
+    def _work_loop(self):
+        while True:
+            item = self._work.get()
+            if item is None or self._closed:
+                return
+            work, callback = item
+            try:
+                self._results.put((callback, work(), None))
+            except Exception as e:
+                self._results.put((callback, None, e))
+
+    def drain(self):
+        """
+        Run the callbacks of finished work, on the Tk thread.
+
+        Reschedules itself: after ``drain_interval`` milliseconds, or at once
+        if results were left over when the budget ran out.
+        """
+        started = self.clock()
+        left_over = False
+        try:
+            while True:
+                try:
+                    callback, result, error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                self.completed += 1
+                try:
+                    callback(result, error)
+                except Exception as e:
+                    # One failing callback must not stop the results of
+                    # every other monitor from being delivered
+                    logger = get_logger(
+                        name="api_watchdog_gui", log_to_console=True, log_to_file=False
+                    )
+                    logger.error(f"Error handling a fetch result: {e!r}")
+                if self.clock() - started >= self.budget:
+                    left_over = True
+                    break
+        finally:
+            self.drain_max = max(self.drain_max, self.clock() - started)
+            if not self._closed:
+                self._drain_id = self.root.after(
+                    1 if left_over else self.drain_interval, self.drain
+                )
+
+    def close(self):
+        """
+        Stop draining and drop queued work.
+
+        Work already running is left to finish on its daemon worker thread,
+        which never holds up the exit; its result is discarded.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = self._workers
+        self.root.after_cancel(self._drain_id)
+        for _ in range(workers):
+            self._work.put(None)
+
+    def stats(self) -> dict:
+        """
+        Returns counters that show how busy the pool is.
+
+        Returns:
+            dict: The work submitted, the callbacks run, the work still
+            pending and the longest drain in milliseconds.
+        """
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "pending": self.submitted - self.completed,
+            "drain_max_ms": self.drain_max * 1000,
+        }
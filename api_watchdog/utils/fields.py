@@ -0,0 +1,178 @@
+import logging
+import time
+
+
+def local_time(value) -> str:
+    """Formats a Unix timestamp as local "YYYY-mm-dd HH:MM:SS"."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+
+
+def number(value) -> str:
+    """Formats a number without trailing zeros or an exponent (e.g. "182.5")."""
+    return f"{value:.10g}"
+
+
+def kelvin_to_celsius(value) -> float:
+    """Converts a temperature from kelvin to °C, rounded to 2 decimals."""
+    return round(value - 273.15, 2)
+
+
+class Field:
+    """
+    One value a configuration reads from an API response.
+
+    Attributes:
+        name (str): The key of the value in extracted records.
+        path (tuple): The keys and list indexes leading to the value.
+        label (str): The label the value is logged with.
+        type (callable): Converts the JSON value (e.g. float for prices sent
+            as strings), or None to keep it as is.
+        convert (callable): Converts the typed value to the unit recorded
+            (e.g. kelvin to °C), or None.
+        format (str or callable): Renders the value as text: a template such
+            as "{} hPa", or a function of the value.
+        required (bool): True if a response without this value holds no
+            observation at all.
+    """
+
+    __slots__ = ("name", "path", "label", "type", "convert", "format", "required")
+
+    def __init__(
+        self,
+        name: str,
+        path: tuple,
+        label: str = None,
+        type=None,
+        convert=None,
+        format="{}",
+        required: bool = False,
+    ):
+        self.name = name
+        self.path = tuple(path)
+        self.label = label or name
+        self.type = type
+        self.convert = convert
+        self.format = format
+        self.required = required
+
+    def text(self, value) -> str:
+        """Returns the value as logged, or "Not available" if it is None."""
+        if value is None:
+            return "Not available"
+        if isinstance(self.format, str):
+            return self.format.format(value)
+        return self.format(value)
+
+
+class _Text:
+    """Renders a field value when a log handler asks for it, not before."""
+
+    __slots__ = ("field", "value")
+
+    def __init__(self, field: Field, value):
+        self.field = field
+        self.value = value
+
+    def __str__(self):
+        return self.field.text(self.value)
+
+
+# Marks a path that is absent from a response
+_MISSING = object()
+
+
+def _getter(path: tuple):
+    """Returns a function that follows a path, or returns _MISSING."""
+
+    def get(data):
+        for key in path:
+            try:
+                data = data[key]
+            except (KeyError, IndexError, TypeError):
+                return _MISSING
+        return data
+
+    return get
+
+
+class Extractor:
+    """
+    Reads a fixed set of fields from API responses.
+
+    The fields are declared once and compiled into one getter per path, so
+    each response costs a few lookups per field. Values are typed and
+    converted, but not rendered as text: ``log`` hands the logger objects
+    that format themselves only if a handler emits the message, and the
+    JSONL sink writes the typed values directly.
+
+    A field that is missing, null or cannot be converted is None in the
+    record and "Not available" in the log, without affecting the other
+    fields; only a missing required field discards the record.
+
+    Attributes:
+        fields (tuple): The Field instances, in record and log order.
+    """
+
+    def __init__(self, fields):
+        """
+        Initialize the Extractor instance.
+
+        Args:
+            fields (list): The Field instances.
+        """
+        self.fields = tuple(fields)
+        self._compiled = [(field, _getter(field.path)) for field in self.fields]
+
+    def extract(self, data, partial: bool = False) -> dict:
+        """
+        Returns the fields of a response.
+
+        Args:
+            data: The parsed response, or the part of it the paths start at.
+            partial (bool): Return the record even if a required field is
+                missing, e.g. to log what the response does hold.
+
+        Returns:
+            dict: The typed value (or None) of every field, by name, or None
+            if a required field is missing.
+        """
+        record = {}
+        for field, get in self._compiled:
+            value = get(data)
+            if value is _MISSING or value is None:
+                if field.required and not partial:
+                    return None
+                value = None
+            else:
+                try:
+                    if field.type is not None:
+                        value = field.type(value)
+                    if field.convert is not None:
+                        value = field.convert(value)
+                except (TypeError, ValueError):
+                    if field.required and not partial:
+                        return None
+                    value = None
+            record[field.name] = value
+        return record
+
+    def log(self, logger, data, changed=None, prefix: tuple = ()):
+        """
+        Log every field of a response as "<label>: <text>".
+
+        Nothing is extracted if the logger would drop INFO messages.
+
+        Args:
+            logger (logging.Logger): The logger to write to.
+            data: The parsed response, or the part of it the paths start at.
+            changed (callable): Given a field's full path, returns True if
+                the field should be logged; None logs every field.
+            prefix (tuple): The path from the response root to where the
+                field paths start, passed to ``changed``.
+        """
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        record = self.extract(data, partial=True)
+        for field in self.fields:
+            if changed is None or changed(prefix + field.path):
+                logger.info("%s: %s", field.label, _Text(field, record[field.name]))
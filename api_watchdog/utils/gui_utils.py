@@ -1,3 +1,4 @@
+import tkinter as tk
 from tkinter import ttk
 
 
@@ -73,7 +74,8 @@ def select_api_args(frame, api_type, values_dict):
     Args:
         frame: The tkinter frame where the entry widgets should be placed.
         api_type: The type of API to select arguments for.
-        values_dict: A dictionary containing API types as keys and their corresponding values.
+        values_dict: A dictionary mapping API types to their APIPlugin, whose
+            ``var`` names the argument.
 
     Returns:
         A list of ttk.Entry widgets for entering API arguments.
@@ -110,8 +112,69 @@ def stop_button(frame, command):
         command: The function to be called when the button is clicked.
 
     Returns:
-        A ttk.Button widget for stopping the API monitoring.
+        A ttk.Button widget for stopping the selected monitor.
     """
-    return ttk.Button(frame, text="Stop", command=command).grid(
-        column=0, row=7, columnspan=2, pady=5
-    )
+    button = ttk.Button(frame, text="Stop", command=command)
+    button.grid(column=0, row=7, columnspan=2, pady=5)
+    return button
+
+
+def monitor_list(frame):
+    """Create and place the list of running monitors in the given frame.
+
+    Args:
+        frame: The tkinter frame where the list should be placed.
+
+    Returns:
+        A tk.Listbox widget with one line per running monitor.
+    """
+    ttk.Label(frame, text="Running monitors").grid(column=0, row=8, columnspan=2)
+    monitors = tk.Listbox(frame, height=5, width=40, exportselection=False)
+    monitors.grid(column=0, row=9, columnspan=2, pady=5)
+    return monitors
+
+
+def quit_button(frame, command):
+    """Create and place a quit button in the given frame.
+
+    Args:
+        frame: The tkinter frame where the button should be placed.
+        command: The function to be called when the button is clicked.
+
+    Returns:
+        A ttk.Button widget for stopping every monitor and closing the GUI.
+    """
+    button = ttk.Button(frame, text="Quit", command=command)
+    button.grid(column=0, row=10, columnspan=2, pady=5)
+    return button
+
+
+def chart_panel(frame):
+    """Create and place the panel of live charts in the given frame.
+
+    Args:
+        frame: The tkinter frame where the panel should be placed.
+
+    Returns:
+        A ttk.Notebook widget with one tab per monitor chart.
+    """
+    charts = ttk.Notebook(frame)
+    charts.grid(column=2, row=0, rowspan=11, padx=5, pady=5, sticky="NSEW")
+    frame.columnconfigure(2, weight=1)
+    frame.rowconfigure(9, weight=1)
+    return charts
+
+
+def chart_canvas(notebook, title):
+    """Create a canvas for a chart in a new tab of the given notebook.
+
+    Args:
+        notebook: The ttk.Notebook holding the charts.
+        title: The tab title.
+
+    Returns:
+        A tk.Canvas widget filling the tab.
+    """
+    canvas = tk.Canvas(notebook, width=480, height=240, background="white")
+    notebook.add(canvas, text=title)
+    return canvas
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def parse_max_age(cache_control: str):
+    """
+    Returns the freshness lifetime a Cache-Control header allows.
+
+    Args:
+        cache_control (str): The value of the Cache-Control header.
+
+    Returns:
+        int: The max-age in seconds, 0 when the response must be revalidated,
+        or None when it must not be stored at all.
+    """
+    max_age = 0
+    for directive in (cache_control or "").split(","):
+        name, _, value = directive.strip().partition("=")
+        name = name.lower()
+        if name == "no-store":
+            return None
+        if name == "no-cache":
+            return 0
+        if name == "max-age":
+            try:
+                max_age = max(int(value.strip('"')), 0)
+            except ValueError:
+                max_age = 0
+    return max_age
+
+
+def url_key(url: str) -> str:
+    """Returns the hash of a URL that names its on-disk entry."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class CacheEntry:
+    """
+    A cached API response and the validators needed to revalidate it.
+
+    Attributes:
+        url (str): The URL the response was fetched from.
+        body (str): The raw response body.
+        etag (str): The ETag header, sent back as If-None-Match.
+        last_modified (str): The Last-Modified header, sent back as
+            If-Modified-Since.
+        expires (float): The wall-clock time until which the entry is fresh.
+        version (str): A digest of the body that changes whenever the body does.
+        data: The parsed body, kept in memory only.
+    """
+
+    __slots__ = ("url", "body", "etag", "last_modified", "expires", "version", "data")
+
+    def __init__(self, url, body, etag=None, last_modified=None, expires=0.0, data=None):
+        """
+        Initialize the CacheEntry instance.
+
+        Args:
+            url (str): The URL the response was fetched from.
+            body (str): The raw response body.
+            etag (str): The ETag header, if any.
+            last_modified (str): The Last-Modified header, if any.
+            expires (float): The wall-clock time until which the entry is fresh.
+            data: The parsed body, if it has already been parsed.
+        """
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+        self.version = hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+        self.data = data
+
+    def is_fresh(self, now=None) -> bool:
+        """Returns True if the entry can be served without contacting the server."""
+        return (now if now is not None else time.time()) < self.expires
+
+    def conditional_headers(self) -> dict:
+        """Returns the headers that ask the server for a 304 if nothing changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_dict(self) -> dict:
+        # The URL carries the API key, so only its hash is written to disk
+        return {
+            "key": url_key(self.url),
+            "body": self.body,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "expires": self.expires,
+        }
+
+
+class ResponseCache:
+    """
+    An in-memory LRU of API responses with an optional on-disk backend.
+
+    With ``cache_dir`` set, every stored entry is also written to one JSON
+    file per URL, so a restarted watchdog (or a one-shot check) starts with
+    the validators and fresh bodies of the previous run.
+
+    Attributes:
+        max_entries (int): The number of entries kept in memory.
+        cache_dir (Path): The directory for on-disk entries, or None.
+        hits (int): Lookups served from a fresh entry.
+        revalidated (int): Lookups answered by a 304 Not Modified.
+        misses (int): Lookups that needed a full response.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir=None):
+        """
+        Initialize the ResponseCache instance.
+
+        Args:
+            max_entries (int): The number of entries kept in memory.
+            cache_dir (str): The directory for on-disk entries, or None to
+                keep the cache in memory only.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / (url_key(url) + ".json")
+
+    def get(self, url: str):
+        """
+        Returns the entry for a URL, loading it from disk if needed.
+
+        Args:
+            url (str): The URL to look up.
+
+        Returns:
+            CacheEntry: The cached entry, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                return entry
+
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get("key") != url_key(url):
+            return None
+
+        entry = CacheEntry(
+            url,
+            stored["body"],
+            etag=stored.get("etag"),
+            last_modified=stored.get("last_modified"),
+            expires=stored.get("expires", 0.0),
+        )
+        self._remember(entry)
+        return entry
+
+    def store(self, url: str, response, data):
+        """
+        Store a 200 response, unless its Cache-Control forbids it.
+
+        Args:
+            url (str): The URL that was fetched.
+            response (requests.Response): The HTTP response.
+            data: The parsed body.
+
+        Returns:
+            CacheEntry: The stored entry, or None if it was not stored.
+        """
+        headers = response.headers
+        max_age = parse_max_age(headers.get("Cache-Control"))
+        if max_age is None:
+            return None
+        entry = CacheEntry(
+            url,
+            response.text,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            expires=time.time() + max_age,
+            data=data,
+        )
+        self._remember(entry)
+        self._save(entry)
+        return entry
+
+    def refresh(self, entry: CacheEntry, response):
+        """
+        Extend an entry's lifetime after the server answered 304 Not Modified.
+
+        Args:
+            entry (CacheEntry): The entry that was revalidated.
+            response (requests.Response): The 304 response.
+        """
+        max_age = parse_max_age(response.headers.get("Cache-Control"))
+        entry.expires = time.time() + (max_age or 0)
+        entry.etag = response.headers.get("ETag") or entry.etag
+        entry.last_modified = response.headers.get("Last-Modified") or entry.last_modified
+        self._save(entry)
+
+    def _remember(self, entry: CacheEntry):
+        with self._lock:
+            self._entries[entry.url] = entry
+            self._entries.move_to_end(entry.url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _save(self, entry: CacheEntry):
+        if self.cache_dir is None:
+            return
+        path = self._path(entry.url)
+        temp = path.with_suffix(".tmp")
+        try:
+            # Write to a temporary file first so readers never see half an entry
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(entry.to_dict(), f)
+            temp.replace(path)
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        """Returns the hit, revalidation and miss counters."""
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
@@ -0,0 +1,130 @@
+import json
+import re
+from json.decoder import scanstring
+
+try:
+    import orjson
+except ImportError:  # Optional fast backend
+    orjson = None
+
+
+# A projection value meaning "keep only the first member of this object"
+FIRST = "first"
+
+# Payloads smaller than this are decoded whole: a partial parse saves little
+# on them, and error responses (always small) keep every key for the logs
+PARTIAL_THRESHOLD = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_raw_decode = json.JSONDecoder().raw_decode
+
+
+if orjson is not None:
+    loads = orjson.loads
+else:
+    loads = json.loads
+
+
+def decode(body, projection=None, threshold: int = PARTIAL_THRESHOLD):
+    """
+    Decode a JSON response body, parsing only what a projection asks for
+    when the body is large.
+
+    A projection maps the top-level keys a config reads to what it needs of
+    each value: None for the whole value, FIRST for only the first member
+    of an object (e.g. the newest bar of a time series), or a nested
+    projection. Unlisted keys are skipped, and parsing stops as soon as
+    every listed key has been read, so the rest of the body is never
+    decoded (nor validated).
+
+    Args:
+        body (bytes): The response body.
+        projection (dict): The paths the caller reads, or None to decode
+            the whole body.
+        threshold (int): Bodies shorter than this many bytes are decoded
+            whole with the fastest available backend.
+
+    Returns:
+        The decoded value.
+
+    Raises:
+        ValueError: If the body is not valid JSON.
+    """
+    if projection is None or len(body) < threshold:
+        return loads(body)
+    if isinstance(body, (bytes, bytearray)):
+        body = body.decode(json.detect_encoding(body))
+    idx = _skip(body, 0)
+    if not body.startswith("{", idx):
+        return loads(body)
+    return _object(body, idx, projection, stop=True)[0]
+
+
+def _skip(s: str, idx: int) -> int:
+    return _WHITESPACE.match(s, idx).end()
+
+
+def _expect(s: str, idx: int, char: str) -> int:
+    idx = _skip(s, idx)
+    if not s.startswith(char, idx):
+        raise json.JSONDecodeError(f"Expecting {char!r}", s, idx)
+    return _skip(s, idx + 1)
+
+
+def _object(s: str, idx: int, projection: dict, stop: bool) -> tuple:
+    """
+    Decode the object starting at ``s[idx]`` through a projection.
+
+    Returns:
+        tuple: (value, end). With ``stop``, parsing ends once every
+        projected key has been read, and ``end`` is None.
+    """
+    wanted = set(projection)
+    result = {}
+    idx = _expect(s, idx, "{")
+    if s.startswith("}", idx):
+        return result, idx + 1
+    while True:
+        if not s.startswith('"', idx):
+            raise json.JSONDecodeError("Expecting property name", s, idx)
+        key, idx = scanstring(s, idx + 1)
+        idx = _expect(s, idx, ":")
+        if key in wanted:
+            wanted.discard(key)
+            spec = projection[key]
+            last = stop and not wanted
+            if spec is None:
+                result[key], idx = _raw_decode(s, idx)
+            elif spec == FIRST:
+                result[key], idx = _first(s, idx, last)
+            else:
+                result[key], idx = _object(s, idx, spec, last)
+            if last:
+                return result, None
+        else:
+            # Still has to be scanned to find where the next key starts
+            _, idx = _raw_decode(s, idx)
+        idx = _skip(s, idx)
+        if s.startswith("}", idx):
+            return result, idx + 1
+        idx = _expect(s, idx, ",")
+
+
+def _first(s: str, idx: int, stop: bool) -> tuple:
+    """Decode only the first member of the object at ``s[idx]``."""
+    if not stop or not s.startswith("{", idx):
+        # The end of the value is needed to go on, so decode it whole
+        value, idx = _raw_decode(s, idx)
+        if isinstance(value, dict) and value:
+            key = next(iter(value))
+            value = {key: value[key]}
+        return value, idx
+    inner = _skip(s, idx + 1)
+    if s.startswith("}", inner):
+        return {}, inner + 1
+    if not s.startswith('"', inner):
+        raise json.JSONDecodeError("Expecting property name", s, inner)
+    key, inner = scanstring(s, inner + 1)
+    inner = _expect(s, inner, ":")
+    value, _ = _raw_decode(s, inner)
+    return {key: value}, None
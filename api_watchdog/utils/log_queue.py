@@ -0,0 +1,304 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+
+
+# Put on the queue by LogPipeline.stop to end the writer thread
+_STOP = object()
+
+
+class _Detach:
+    """Put on the queue by LogPipeline.detach after a logger's last record."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    A FileHandler that leaves flushing to its caller.
+
+    logging.FileHandler flushes the file after every record. The pipeline's
+    writer thread flushes once per batch instead, so a burst of records
+    costs one write to the OS rather than one each.
+
+    Attributes:
+        deferred (bool): Leave flushing to the caller; when False the
+            handler flushes after every record like a FileHandler.
+    """
+
+    deferred = True
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if not self.deferred:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class PipelineHandler(logging.handlers.QueueHandler):
+    """
+    The handler attached to each watchdog logger while the pipeline runs.
+
+    Records are put on the pipeline's queue unformatted; formatting happens
+    on the writer thread. When the queue is full the record is dropped or
+    the caller waits, depending on the pipeline's overflow policy.
+    """
+
+    def __init__(self, pipeline):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+
+    def prepare(self, record):
+        # Resolve the traceback now, while it still describes this thread
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self.pipeline.put(record)
+
+
+class LogPipeline:
+    """
+    Moves log formatting and file writes off the threads that log.
+
+    Every logger returned by get_logger while the pipeline is running gets a
+    single PipelineHandler; its real handlers are registered with the
+    pipeline instead. One background thread drains the shared queue, hands
+    each record to the handlers of the logger that emitted it, and flushes
+    them every ``flush_interval`` seconds or when the queue runs dry.
+
+    Attributes:
+        queue (queue.Queue): The bounded queue of pending records.
+        flush_interval (float): The longest time a written record stays in
+            a file buffer, in seconds.
+        overflow (str): "block" to make callers wait for room in a full
+            queue, or "drop" to discard the record.
+        batch_size (int): The most records written between two flushes.
+        written (int): Records handed to a handler.
+        dropped (int): Records discarded because the queue was full.
+        batches (int): Flushes performed.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        overflow: str = "block",
+        batch_size: int = 500,
+    ):
+        """
+        Initialize the LogPipeline instance.
+
+        Args:
+            flush_interval (float): The longest time a record stays buffered.
+            max_queue (int): The most records waiting to be written.
+            overflow (str): "block" or "drop", applied when the queue is full.
+            batch_size (int): The most records written between two flushes.
+
+        Raises:
+            ValueError: If the overflow policy is unknown.
+        """
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"Unknown overflow policy: {overflow!r}")
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._routes = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def handlers(self, name: str) -> list:
+        """Returns the handlers registered for the logger with this name."""
+        return self._routes.get(name, [])
+
+    def attach(self, logger: logging.Logger, handler: logging.Handler):
+        """
+        Route a logger's records to a handler through the queue.
+
+        Args:
+            logger (logging.Logger): The logger that emits the records.
+            handler (logging.Handler): The handler that writes them.
+        """
+        with self._lock:
+            self._routes.setdefault(logger.name, []).append(handler)
+        if not any(isinstance(h, PipelineHandler) for h in logger.handlers):
+            logger.addHandler(PipelineHandler(self))
+
+    def detach(self, logger: logging.Logger):
+        """
+        Stop routing a logger's records and close its handlers.
+
+        Records the logger already queued are written first; the handlers
+        are closed by the writer thread once it reaches them.
+
+        Args:
+            logger (logging.Logger): The logger to detach.
+        """
+        for handler in list(logger.handlers):
+            if isinstance(handler, PipelineHandler):
+                logger.removeHandler(handler)
+        if self._thread is None:
+            self._close(logger.name)
+        else:
+            self.queue.put(_Detach(logger.name))
+
+    def _close(self, name: str):
+        with self._lock:
+            handlers = self._routes.pop(name, [])
+        for handler in handlers:
+            handler.close()
+
+    def put(self, record: logging.LogRecord):
+        """Queue a record, applying the overflow policy when the queue is full."""
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        """Start the writer thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="api_watchdog-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """
+        Write every queued record, flush the handlers and stop the writer
+        thread. The loggers get their handlers back and write synchronously.
+        """
+        if self._thread is not None:
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            routes, self._routes = self._routes, {}
+        for name, handlers in routes.items():
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                if isinstance(handler, PipelineHandler):
+                    logger.removeHandler(handler)
+            for handler in handlers:
+                if isinstance(handler, BufferedFileHandler):
+                    handler.deferred = False
+                logger.addHandler(handler)
+
+    def _run(self):
+        last_flush = time.monotonic()
+        pending = 0
+        while True:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                record = None
+
+            if record is _STOP:
+                self._flush()
+                return
+            if isinstance(record, _Detach):
+                self._close(record.name)
+                continue
+            if record is not None:
+                self._handle(record)
+                pending += 1
+
+            # Flush when the queue is idle, the batch is full or the interval is up
+            now = time.monotonic()
+            if pending and (
+                record is None
+                or self.queue.empty()
+                and now - last_flush >= self.flush_interval
+                or pending >= self.batch_size
+            ):
+                self._flush()
+                pending = 0
+                last_flush = now
+
+    def _handle(self, record):
+        for handler in self.handlers(record.name):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        self.written += 1
+
+    def _flush(self):
+        self.batches += 1
+        with self._lock:
+            handlers = [h for hs in self._routes.values() for h in hs]
+        for handler in handlers:
+            handler.flush()
+
+    def stats(self) -> dict:
+        """Returns the written, dropped and batch counts and the queue depth."""
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "queued": self.queue.qsize(),
+        }
+
+
+# The running pipeline, or None while loggers write synchronously
+_pipeline = None
+
+
+def start_queue_logging(
+    flush_interval: float = 1.0,
+    max_queue: int = 10000,
+    overflow: str = "block",
+    batch_size: int = 500,
+) -> LogPipeline:
+    """
+    Send every logger created from now on by get_logger through one
+    background writer.
+
+    Loggers that already exist keep their handlers. The pipeline is stopped
+    and flushed at interpreter exit if stop_queue_logging is not called.
+
+    Args:
+        flush_interval (float): The longest time a record stays buffered.
+        max_queue (int): The most records waiting to be written.
+        overflow (str): "block" or "drop", applied when the queue is full.
+        batch_size (int): The most records written between two flushes.
+
+    Returns:
+        LogPipeline: The running pipeline.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = LogPipeline(flush_interval, max_queue, overflow, batch_size)
+        _pipeline.start()
+        atexit.register(stop_queue_logging)
+    return _pipeline
+
+
+def stop_queue_logging():
+    """Flush and stop the pipeline started by start_queue_logging, if any."""
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.stop()
+        _pipeline = None
+
+
+def get_pipeline():
+    """Returns the running LogPipeline, or None."""
+    return _pipeline
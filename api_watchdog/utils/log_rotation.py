@@ -0,0 +1,282 @@
+import gzip
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from api_watchdog.utils.log_queue import BufferedFileHandler
+
+
+# Units accepted by parse_duration, in seconds
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Units accepted by parse_size, in bytes
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def parse_duration(value: str) -> float:
+    """
+    Parse a duration such as "90", "30m", "6h" or "1d" into seconds.
+
+    Raises:
+        ValueError: If the value is not a positive duration.
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(value).lower())
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"invalid duration {value!r}")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2) or "s"]
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a size such as "500000", "10M" or "2G" into bytes.
+
+    Raises:
+        ValueError: If the value is not a positive size.
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([bkmg]?)b?\s*", str(value).lower())
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"invalid size {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+class RotationPolicy:
+    """
+    When to rotate a log file and how many rotated segments to keep.
+
+    Attributes:
+        max_bytes (int): Rotate before the file would grow past this size,
+            or None for no size limit.
+        interval (float): Rotate after this many seconds, or None.
+        backup_count (int): The most rotated segments kept per log file.
+        max_total_bytes (int): The most bytes kept in rotated segments per
+            log file, or None for no limit.
+        compress (bool): Gzip rotated segments.
+    """
+
+    def __init__(
+        self,
+        max_bytes=None,
+        interval=None,
+        backup_count: int = 5,
+        max_total_bytes=None,
+        compress: bool = True,
+    ):
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.max_total_bytes = max_total_bytes
+        self.compress = compress
+
+
+class SegmentWorker:
+    """
+    Compresses rotated log segments and prunes old ones on a background thread.
+
+    Rotation itself is a rename, so the thread that logs only pays for that;
+    the gzip pass and the retention sweep happen here.
+
+    Attributes:
+        failures (int): Segments that could not be compressed or pruned.
+    """
+
+    def __init__(self):
+        self.failures = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, handler, segment):
+        """
+        Queue a rotated segment for compression and its log file for pruning.
+
+        Args:
+            handler (RotatingLogHandler): The handler that rotated the file.
+            segment (Path): The rotated segment, or None to only prune.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="api_watchdog-log-rotation", daemon=True
+                )
+                self._thread.start()
+        self._queue.put((handler, segment))
+
+    def wait(self):
+        """Block until every queued segment has been processed."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            handler, segment = self._queue.get()
+            try:
+                if segment is not None and handler.policy.compress:
+                    compress_segment(segment)
+                handler.prune()
+            except Exception as e:
+                # A full disk or a permission error must not stop rotation,
+                # but left-over plain segments should not go unnoticed. The
+                # module logger has no file handler, so this cannot recurse
+                self.failures += 1
+                logging.getLogger(__name__).error(
+                    f"Could not compress or prune {segment or handler.baseFilename}: {e!r}"
+                )
+            finally:
+                self._queue.task_done()
+
+
+# Shared by every rotating handler
+segment_worker = SegmentWorker()
+
+
+def compress_segment(segment: Path) -> Path:
+    """
+    Gzip a rotated segment and remove the original.
+
+    The archive is written under a temporary name first, so a crash leaves
+    either the plain segment or a complete archive, never a truncated one.
+
+    Returns:
+        Path: The compressed segment.
+    """
+    target = segment.with_name(segment.name + ".gz")
+    partial = segment.with_name(segment.name + ".gz.tmp")
+    with open(segment, "rb") as src, gzip.open(partial, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(partial, target)
+    segment.unlink()
+    return target
+
+
+class RotatingLogHandler(BufferedFileHandler):
+    """
+    A file handler that rotates its file by size, by age, or both.
+
+    A full file is renamed to ``<name>.<YYYYmmdd-HHMMSS>`` and a new one is
+    opened. The rotated segment is then gzipped, and segments beyond the
+    policy's count or total size are deleted, by the shared SegmentWorker.
+
+    Attributes:
+        policy (RotationPolicy): When to rotate and what to keep.
+        deferred (bool): Leave flushing to the caller, as when the handler
+            runs behind the log queue.
+    """
+
+    def __init__(
+        self, filename, policy: RotationPolicy, deferred=False, mode="a", encoding=None
+    ):
+        """
+        Initialize the RotatingLogHandler instance.
+
+        Args:
+            filename (str): The path to the log file.
+            policy (RotationPolicy): When to rotate and what to keep.
+            deferred (bool): Leave flushing to the caller.
+            mode (str): The mode to open the file in.
+            encoding (str): The file's encoding.
+        """
+        super().__init__(filename, mode=mode, encoding=encoding)
+        self.policy = policy
+        self.deferred = deferred
+        self.rollover_at = self._next_rollover()
+
+        # Finish the work of a previous run that stopped before compressing
+        leftovers = [s for s in self.segments() if s.suffix != ".gz"]
+        for segment in leftovers:
+            segment_worker.submit(self, segment)
+
+    def _next_rollover(self):
+        if self.policy.interval is None:
+            return None
+        return time.time() + self.policy.interval
+
+    def should_rollover(self, message: str) -> bool:
+        """Returns True if writing ``message`` should go to a new file."""
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        if self.policy.max_bytes is not None:
+            if self.stream is None:
+                self.stream = self._open()
+            size = self.stream.tell()
+            return size > 0 and size + len(message.encode()) > self.policy.max_bytes
+        return False
+
+    def emit(self, record):
+        try:
+            message = self.format(record) + self.terminator
+            if self.should_rollover(message):
+                self.rollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(message)
+            if not self.deferred:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def rollover(self):
+        """Rename the current file to a timestamped segment and start a new one."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        source = Path(self.baseFilename)
+        if source.exists() and source.stat().st_size > 0:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            segment = source.with_name(f"{source.name}.{stamp}")
+            counter = 1
+            while segment.exists() or segment.with_name(segment.name + ".gz").exists():
+                segment = source.with_name(f"{source.name}.{stamp}.{counter}")
+                counter += 1
+            os.replace(source, segment)
+            segment_worker.submit(self, segment)
+        self.rollover_at = self._next_rollover()
+
+    def segments(self) -> list:
+        """Returns the rotated segments of this log file, oldest first."""
+        source = Path(self.baseFilename)
+        pattern = re.compile(
+            re.escape(source.name) + r"\.(\d{8}-\d{6})(?:\.(\d+))?(?:\.gz)?"
+        )
+        found = []
+        for path in source.parent.iterdir():
+            match = pattern.fullmatch(path.name)
+            if match:
+                found.append((match.group(1), int(match.group(2) or 0), path))
+        return [path for _, _, path in sorted(found)]
+
+    def prune(self):
+        """Delete the oldest segments beyond the policy's count and size limits."""
+        segments = self.segments()
+        sizes = [segment.stat().st_size for segment in segments]
+        total = sum(sizes)
+        limit = self.policy.max_total_bytes
+        for index, segment in enumerate(segments):
+            kept = len(segments) - index
+            if kept <= self.policy.backup_count and (limit is None or total <= limit):
+                break
+            segment.unlink()
+            total -= sizes[index]
+
+
+# The policy applied to log files opened by get_logger, or None to never rotate
+_policy = None
+
+
+def set_rotation(policy):
+    """
+    Rotate the log files that get_logger opens from now on.
+
+    Args:
+        policy (RotationPolicy): The rotation policy, or None to stop rotating
+            newly opened files.
+    """
+    global _policy
+    _policy = policy
+
+
+def get_rotation():
+    """Returns the RotationPolicy applied by get_logger, or None."""
+    return _policy
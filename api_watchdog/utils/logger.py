@@ -1,5 +1,8 @@
 import logging
 from pathlib import Path
+from functools import partial
+from api_watchdog.utils.log_queue import BufferedFileHandler, get_pipeline
+from api_watchdog.utils.log_rotation import RotatingLogHandler, get_rotation
 
 
 def get_logger(
@@ -20,23 +23,48 @@ def get_logger(
     The function returns a logger instance with the specified name and configuration.
     If the logger already exists, it returns the existing logger instance. Otherwise,
     it creates a new logger instance with the specified name and configuration.
+
+    While queue logging is running (see log_queue.start_queue_logging) the
+    handlers are registered with the background writer instead, and the
+    logger itself only puts records on its queue. While a rotation policy is
+    set (see log_rotation.set_rotation) new log files are rotated by size
+    and age.
     """
 
     # Obtain a logger instance with the specified name
     logger = logging.getLogger(name)
 
+    # Attach handlers directly, or behind the log queue when it is running;
+    # loggers configured before the queue started keep writing directly
+    pipeline = get_pipeline()
+    if pipeline is None or logger.handlers and not pipeline.handlers(name):
+        handlers = logger.handlers
+        attach = logger.addHandler
+        file_handler = logging.FileHandler
+    else:
+        handlers = pipeline.handlers(name)
+        attach = partial(pipeline.attach, logger)
+        file_handler = BufferedFileHandler
+
+    # Rotate log files when a policy is set, so they do not grow forever
+    policy = get_rotation()
+    if policy is not None:
+        file_handler = partial(
+            RotatingLogHandler,
+            policy=policy,
+            deferred=file_handler is BufferedFileHandler,
+        )
+
     # Check if the logger already has handlers
-    if logger.handlers:
+    if handlers:
         # Determine if a console handler is already present
         has_console_handler = any(
             isinstance(h, logging.StreamHandler)
             and not isinstance(h, logging.FileHandler)
-            for h in logger.handlers
+            for h in handlers
         )
         # Determine if a file handler is already present
-        has_file_handler = any(
-            isinstance(h, logging.FileHandler) for h in logger.handlers
-        )
+        has_file_handler = any(isinstance(h, logging.FileHandler) for h in handlers)
 
         # Add a console handler if logging to console is enabled and no handler is present
         if log_to_console and not has_console_handler:
@@ -49,7 +77,7 @@ def get_logger(
             ch = logging.StreamHandler()
             ch.setLevel(logging.INFO)
             ch.setFormatter(formatter)
-            logger.addHandler(ch)
+            attach(ch)
 
         # Add a file handler if logging to file is enabled and no handler is present
         if log_to_file and not has_file_handler:
@@ -57,14 +85,14 @@ def get_logger(
             log_path = Path(log_file)
             log_path.parent.mkdir(parents=True, exist_ok=True)
             # Create and configure the file handler
-            fh = logging.FileHandler(log_path, mode="a", encoding="utf-8")
+            fh = file_handler(log_path, mode="a", encoding="utf-8")
             fh.setLevel(logging.DEBUG)
             formatter = logging.Formatter(
                 "[%(asctime)s] %(levelname)s: %(message)s",
                 datefmt="%Y-%m-%d %H:%M:%S",
             )
             fh.setFormatter(formatter)
-            logger.addHandler(fh)
+            attach(fh)
 
         # Return the logger instance with updated handlers
         return logger
@@ -84,7 +112,7 @@ def get_logger(
         ch = logging.StreamHandler()
         ch.setLevel(logging.INFO)
         ch.setFormatter(formatter)
-        logger.addHandler(ch)
+        attach(ch)
 
     # Add a file handler if logging to file is enabled
     if log_to_file:
@@ -92,10 +120,30 @@ def get_logger(
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
         # Create and configure the file handler
-        fh = logging.FileHandler(log_path, mode="a", encoding="utf-8")
+        fh = file_handler(log_path, mode="a", encoding="utf-8")
         fh.setLevel(logging.DEBUG)
         fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        attach(fh)
 
     # Return the fully configured logger instance
     return logger
+
+
+def close_logger(name: str):
+    """
+    Remove the handlers get_logger attached to a logger and close them.
+
+    Records the logger queued for the background writer are written before
+    its files are closed. A later get_logger call with the name configures
+    the logger again.
+
+    Args:
+        name: The name of the logger.
+    """
+    logger = logging.getLogger(name)
+    pipeline = get_pipeline()
+    if pipeline is not None and pipeline.handlers(name):
+        pipeline.detach(logger)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
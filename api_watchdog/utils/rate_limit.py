@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+
+# Free-tier budgets of the built-in providers, as (calls per minute, calls
+# per day). None means the provider does not limit that window.
+DEFAULT_QUOTAS = {
+    "www.alphavantage.co": (5, 25),
+    "api.openweathermap.org": (60, None),
+}
+
+# Query parameters that carry the API key for the built-in providers
+API_KEY_PARAMS = ("apikey", "appid", "api_key", "key")
+
+
+class RateLimited(Exception):
+    """
+    Raised instead of sending a request that would exceed a quota.
+
+    Attributes:
+        url (str): The URL that was not fetched.
+        retry_after (float): Seconds until the request fits in the budget.
+    """
+
+    def __init__(self, url: str, retry_after: float):
+        super().__init__(f"Rate limit reached, next call allowed in {retry_after:.1f}s")
+        self.url = url
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    A token bucket that refills ``budget`` tokens evenly over ``period`` seconds.
+
+    Keeping ``burst`` small makes the bucket spread calls across the whole
+    window (e.g. one call every 12 seconds for 5 calls per minute) instead
+    of allowing the budget to be spent at once and then running dry.
+
+    Attributes:
+        budget (int): The number of calls allowed per period.
+        period (float): The length of the quota window in seconds.
+        burst (float): The most tokens the bucket holds at once.
+        tokens (float): The tokens currently available.
+    """
+
+    def __init__(self, budget: int, period: float, burst: float = 1, clock=time.monotonic):
+        """
+        Initialize the TokenBucket instance.
+
+        Args:
+            budget (int): The number of calls allowed per period.
+            period (float): The length of the quota window in seconds.
+            burst (float): The most tokens the bucket holds at once.
+            clock (callable): The monotonic clock.
+        """
+        self.budget = budget
+        self.period = period
+        self.rate = budget / period
+        self.burst = max(min(burst, budget), 1)
+        self.clock = clock
+        self.tokens = self.burst
+        self._updated = clock()
+        self._started = self._updated
+        # Times of the calls made in the current window; at most ``budget``
+        self._calls = deque(maxlen=budget)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now: float = None) -> float:
+        """Returns the seconds until a token is available, 0 if one is now."""
+        now = self.clock() if now is None else now
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Take a token; call only after ``wait_time`` returned 0."""
+        self.tokens -= 1
+        self._calls.append(self._updated)
+
+    def status(self, now: float = None) -> dict:
+        """
+        Returns the remaining budget and a predicted exhaustion time.
+
+        The prediction assumes calls keep coming at the rate observed in the
+        current window.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            dict: ``remaining`` calls in the current window, the ``budget``,
+            and ``exhausts_in`` seconds, or None if no calls were made.
+        """
+        now = self.clock() if now is None else now
+        while self._calls and self._calls[0] <= now - self.period:
+            self._calls.popleft()
+        remaining = self.budget - len(self._calls)
+        exhausts_in = None
+        if self._calls:
+            observed = max(now - max(self._calls[0], self._started), 1.0)
+            exhausts_in = remaining / (len(self._calls) / observed)
+        return {"remaining": remaining, "budget": self.budget, "exhausts_in": exhausts_in}
+
+
+class RateLimiter:
+    """
+    Per-key and per-provider token buckets for the fetch path.
+
+    Each provider (API host) can have minute and day budgets. Every API key
+    used with that provider gets its own pair of buckets, and the provider
+    as a whole gets a shared pair, so several keys can never add up to more
+    than the provider allows either.
+
+    A request may only go out if every bucket that applies to it has a
+    token; otherwise ``reserve`` reports how long to wait and takes nothing.
+    """
+
+    def __init__(self, quotas=None, burst: float = 1, clock=time.monotonic):
+        """
+        Initialize the RateLimiter instance.
+
+        Args:
+            quotas (dict): ``{host: (per_minute, per_day)}``; defaults to the
+                built-in providers' free-tier budgets.
+            burst (float): The number of calls a bucket allows back to back.
+            clock (callable): The monotonic clock.
+        """
+        self.quotas = dict(DEFAULT_QUOTAS if quotas is None else quotas)
+        self.burst = burst
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _buckets_for(self, host: str, key: str) -> list:
+        per_minute, per_day = self.quotas[host]
+        buckets = []
+        scopes = [(host, None)] if key is None else [(host, None), (host, key)]
+        for scope in scopes:
+            for window, budget, period in (
+                ("minute", per_minute, 60),
+                ("day", per_day, 86400),
+            ):
+                if not budget:
+                    continue
+                bucket_key = scope + (window,)
+                bucket = self._buckets.get(bucket_key)
+                if bucket is None:
+                    bucket = self._buckets[bucket_key] = TokenBucket(
+                        budget, period, self.burst, self.clock
+                    )
+                buckets.append(bucket)
+        return buckets
+
+    def reserve(self, api_url: str) -> float:
+        """
+        Take a token for a request if the quota allows it.
+
+        Args:
+            api_url (str): The URL about to be fetched.
+
+        Returns:
+            float: 0 if the request may go out now, otherwise the number of
+            seconds until it would fit in every budget.
+        """
+        parts = urlsplit(api_url)
+        host = parts.netloc
+        if host not in self.quotas:
+            return 0.0
+        query = parse_qs(parts.query)
+        key = next((query[p][0] for p in API_KEY_PARAMS if p in query), None)
+
+        with self._lock:
+            buckets = self._buckets_for(host, key)
+            now = self.clock()
+            wait = max((bucket.wait_time(now) for bucket in buckets), default=0.0)
+            if wait > 0:
+                return wait
+            for bucket in buckets:
+                bucket.take()
+            return 0.0
+
+    def status(self) -> dict:
+        """
+        Returns the remaining budget and predicted exhaustion per bucket.
+
+        Returns:
+            dict: ``{"host window": status}`` for provider-wide buckets and
+            ``{"host key=... window": status}`` for per-key ones. API keys are
+            shortened so they do not end up in logs.
+        """
+        with self._lock:
+            now = self.clock()
+            status = {}
+            for (host, key, window), bucket in self._buckets.items():
+                label = host if key is None else f"{host} key={key[:4]}…"
+                status[f"{label} {window}"] = bucket.status(now)
+            return status
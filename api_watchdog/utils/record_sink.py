@@ -0,0 +1,117 @@
+import json
+import threading
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # Optional fast backend
+    orjson = None
+
+
+# The output formats a target can write its observations in
+SINKS = ("log", "jsonl")
+
+
+if orjson is not None:
+
+    def dumps(record: dict) -> bytes:
+        """Returns a record as one compact JSON line, encoded as UTF-8."""
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+    loads = orjson.loads
+
+else:
+    _encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    def dumps(record: dict) -> bytes:
+        """Returns a record as one compact JSON line, encoded as UTF-8."""
+        return (_encode(record) + "\n").encode("utf-8")
+
+    loads = json.loads
+
+
+class JSONLSink:
+    """
+    Writes one JSON object per line to a file.
+
+    Each observation becomes a single compact record instead of a dozen
+    formatted log lines, so downstream tools read it with one JSON parse
+    rather than reassembling fields with regular expressions.
+
+    Attributes:
+        path (Path): The file the records are appended to.
+        records (int): The number of records written.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the JSONLSink instance.
+
+        Args:
+            path (str): The file to append records to; its directory is
+                created if needed.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.records = 0
+        self._file = open(self.path, "ab")
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        """
+        Append a record and flush it, so readers never see half a line.
+
+        Args:
+            record (dict): A JSON-serializable record.
+        """
+        line = dumps(record)
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.records += 1
+
+    def close(self):
+        """Close the file."""
+        with self._lock:
+            self._file.close()
+
+
+# Sinks by resolved path, so targets writing to the same file share one handle
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+def get_sink(path: str) -> JSONLSink:
+    """
+    Returns the JSONLSink for the given file, opening it on first use.
+
+    Args:
+        path (str): The path to the JSONL file.
+    """
+    key = str(Path(path).resolve())
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None:
+            sink = _sinks[key] = JSONLSink(path)
+        return sink
+
+
+def close_sinks():
+    """Close every sink opened by get_sink."""
+    with _sinks_lock:
+        for sink in _sinks.values():
+            sink.close()
+        _sinks.clear()
+
+
+def read_records(path: str):
+    """
+    Yields the records in a JSONL file, skipping a truncated last line.
+
+    Args:
+        path (str): The path to the JSONL file.
+    """
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                yield loads(line)
@@ -0,0 +1,239 @@
+import importlib
+import logging
+import threading
+
+# The entry point group that installed packages register API plugins under:
+#
+#     [project.entry-points."api_watchdog.apis"]
+#     github = "my_package.plugin:PLUGIN"
+#
+# where PLUGIN is an APIPlugin (or an API configuration class)
+ENTRY_POINT_GROUP = "api_watchdog.apis"
+
+
+class APIPlugin:
+    """
+    Describes an API configuration without importing it.
+
+    The CLI and the GUI build their choices from this description alone;
+    the configuration class is imported only when the API is selected.
+
+    Attributes:
+        name (str): The CLI subcommand and the "api" key in targets files.
+        target (str): The class to load, as "package.module:Class".
+        var (str): The name of the API argument (e.g. "location"), used
+            as the CLI option, the targets file key and the GUI label.
+        label (str): The name shown in the GUI.
+        help (str): The CLI subcommand help.
+        arg_help (str): The CLI help for the API argument.
+        short (str): A short CLI option for the argument, e.g. "-L".
+        interval (int): The default seconds between fetches.
+        log_file (str): The default log file.
+    """
+
+    __slots__ = (
+        "name",
+        "target",
+        "var",
+        "label",
+        "help",
+        "arg_help",
+        "short",
+        "interval",
+        "log_file",
+        "_class",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        var: str,
+        label: str = None,
+        help: str = None,
+        arg_help: str = None,
+        short: str = None,
+        interval: int = 5,
+        log_file: str = None,
+    ):
+        self.name = name
+        self.target = target
+        self.var = var
+        self.label = label or name.capitalize()
+        self.help = help or f"Monitor the {name} API"
+        self.arg_help = arg_help or f"The {var} to monitor"
+        self.short = short
+        self.interval = interval
+        self.log_file = log_file or f"{name}_api_watchdog.log"
+        self._class = None
+
+    @classmethod
+    def from_class(cls, name: str, api_class):
+        """
+        Describe an already imported configuration class.
+
+        Args:
+            name (str): The API name.
+            api_class (type): The configuration class; its ``var`` names
+                the API argument.
+        """
+        plugin = cls(
+            name, f"{api_class.__module__}:{api_class.__qualname__}", api_class.var
+        )
+        plugin._class = api_class
+        return plugin
+
+    def load(self):
+        """
+        Import the configuration class, on first use.
+
+        Returns:
+            type: The configuration class.
+        """
+        if self._class is None:
+            load_env()
+            module, _, qualname = self.target.partition(":")
+            value = importlib.import_module(module)
+            for attribute in qualname.split("."):
+                value = getattr(value, attribute)
+            self._class = value
+        return self._class
+
+
+_BUILTIN = (
+    APIPlugin(
+        "weather",
+        "api_watchdog.utils.api_configuration.weather_api:WeatherConfig",
+        "location",
+        label="Weather",
+        help="Monitor the weather API",
+        arg_help="Location to monitor",
+        short="-L",
+        interval=5,
+        log_file="weather_api_watchdog.log",
+    ),
+    APIPlugin(
+        "stock",
+        "api_watchdog.utils.api_configuration.stock_api:StockConfig",
+        "stock",
+        label="Stock",
+        help="Monitor the stock API",
+        arg_help="Stock to monitor",
+        short="-s",
+        interval=5,
+        log_file="stock_api_watchdog.log",
+    ),
+    APIPlugin(
+        "stocks",
+        "api_watchdog.utils.api_configuration.multi_stock_api:MultiStockConfig",
+        "stocks",
+        label="Stocks",
+        help="Monitor many stocks with batched quote requests",
+        arg_help="Comma-separated stocks to monitor",
+        short="-s",
+        interval=60,
+        log_file="stock_api_watchdog.log",
+    ),
+)
+
+_plugins = {plugin.name: plugin for plugin in _BUILTIN}
+_discovered = False
+_lock = threading.Lock()
+
+
+def register(plugin):
+    """
+    Make an API available to the CLI, the GUI and targets files.
+
+    Args:
+        plugin (APIPlugin): The API description. A plugin registered under
+            the name of another replaces it.
+    """
+    with _lock:
+        _plugins[plugin.name] = plugin
+
+
+def _entry_points():
+    from importlib import metadata
+
+    found = metadata.entry_points()
+    if hasattr(found, "select"):
+        return found.select(group=ENTRY_POINT_GROUP)
+    return found.get(ENTRY_POINT_GROUP, [])  # Python < 3.10
+
+
+def discover():
+    """
+    Register the plugins of installed packages, once per process.
+
+    Only the entry points' registration objects are imported here, not the
+    configuration classes they describe. A plugin that fails to load is
+    logged as a warning and skipped.
+    """
+    global _discovered
+    with _lock:
+        if _discovered:
+            return
+        _discovered = True
+    for entry_point in _entry_points():
+        try:
+            value = entry_point.load()
+        except Exception as e:
+            logging.getLogger(__name__).warning(
+                f"Skipping plugin {entry_point.name!r}: {e}"
+            )
+            continue
+        if not isinstance(value, APIPlugin):
+            value = APIPlugin.from_class(entry_point.name, value)
+        with _lock:
+            # Built-in names cannot be taken over by an installed package
+            _plugins.setdefault(value.name, value)
+
+
+def get_plugin(name: str) -> APIPlugin:
+    """
+    Returns the plugin registered under a name.
+
+    Installed packages are only searched when the name is not built in, so
+    selecting a built-in API costs nothing per installed plugin.
+
+    Raises:
+        KeyError: If no plugin has that name.
+    """
+    plugin = _plugins.get(name)
+    if plugin is None:
+        discover()
+        plugin = _plugins[name]
+    return plugin
+
+
+def plugins(installed: bool = True) -> list:
+    """
+    Returns the registered plugins.
+
+    Args:
+        installed (bool): Include the plugins of installed packages.
+    """
+    if installed:
+        discover()
+    with _lock:
+        return list(_plugins.values())
+
+
+def is_builtin(name: str) -> bool:
+    """Returns True if the name is one of the APIs that ship with the package."""
+    return any(plugin.name == name for plugin in _BUILTIN)
+
+
+_env_loaded = False
+
+
+def load_env():
+    """Load API keys from the .env file into the environment, once per process."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    from dotenv import load_dotenv
+
+    load_dotenv()
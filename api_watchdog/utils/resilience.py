@@ -0,0 +1,205 @@
+import random
+import threading
+import time
+
+
+# Statuses that signal a temporary problem worth retrying
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of contacting a host whose circuit breaker is open.
+
+    Attributes:
+        host (str): The host that is being shed.
+        retry_after (float): Seconds until the breaker lets a probe through.
+    """
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Circuit open for {host}, next probe in {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class Cancelled(Exception):
+    """
+    Raised by a fetch whose cancel event was set, before its next attempt
+    or while it was backing off.
+
+    Attributes:
+        api_url (str): The URL that was being fetched.
+    """
+
+    def __init__(self, api_url: str):
+        super().__init__(f"Fetch of {api_url} cancelled")
+        self.api_url = api_url
+
+
+class RetryPolicy:
+    """
+    Decides which failures are retried and how long to wait between attempts.
+
+    Waits follow "decorrelated jitter": each one is drawn uniformly between
+    the base delay and three times the previous wait, capped at ``cap``.
+    Targets that fail together therefore drift apart instead of retrying a
+    struggling host in lockstep.
+
+    Attributes:
+        base (float): The shortest wait between attempts, in seconds.
+        cap (float): The longest wait between attempts, in seconds.
+        retry_statuses (frozenset): HTTP statuses that are retried.
+    """
+
+    def __init__(
+        self,
+        base: float = 1.0,
+        cap: float = 60.0,
+        retry_statuses=RETRYABLE_STATUSES,
+        rng=random,
+    ):
+        """
+        Initialize the RetryPolicy instance.
+
+        Args:
+            base (float): The shortest wait between attempts, in seconds.
+            cap (float): The longest wait between attempts, in seconds.
+            retry_statuses (frozenset): HTTP statuses that are retried.
+            rng: The random number generator used for jitter.
+        """
+        self.base = base
+        self.cap = cap
+        self.retry_statuses = retry_statuses
+        self.rng = rng
+
+    def is_retryable(self, error: Exception, status=None) -> bool:
+        """
+        Returns True if the failure is temporary and the request may succeed
+        if sent again.
+
+        Timeouts and connection errors are retried; HTTP errors only if their
+        status is in ``retry_statuses``, so a bad API key or an unknown
+        location (4XX) fails at once.
+
+        Args:
+            error (Exception): The exception raised by the request.
+            status (int): The HTTP status of the response, if there was one.
+        """
+        # Only failed fetches get here, so the import is kept off startup
+        import requests
+
+        if isinstance(error, requests.exceptions.HTTPError):
+            if status is None and error.response is not None:
+                status = error.response.status_code
+            return isinstance(status, int) and status in self.retry_statuses
+        return isinstance(
+            error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+        )
+
+    def next_wait(self, previous: float, retry_after=None, base=None) -> float:
+        """
+        Returns the wait before the next attempt.
+
+        Args:
+            previous (float): The previous wait, or 0 before the first retry.
+            retry_after (str): The response's Retry-After header, which is
+                honoured as a minimum when it holds a number of seconds.
+            base (float): Overrides the policy's base delay for this call.
+        """
+        base = self.base if base is None else base
+        upper = max(previous * 3, base)
+        wait = min(self.cap, self.rng.uniform(base, upper))
+        try:
+            wait = max(wait, min(float(retry_after), self.cap))
+        except (TypeError, ValueError):
+            pass
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after repeated failures.
+
+    The breaker is "closed" while the host is healthy. After
+    ``failure_threshold`` consecutive failed requests it "opens" and every
+    request is refused without touching the network. Once ``reset_timeout``
+    has passed it is "half-open": a single probe request is let through,
+    and its outcome closes the breaker again or re-opens it.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the breaker.
+        reset_timeout (float): Seconds the breaker stays open before a probe.
+        state (str): "closed", "open" or "half-open".
+        failures (int): The current run of consecutive failures.
+        shed (int): Requests refused while the breaker was open.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic
+    ):
+        """
+        Initialize the CircuitBreaker instance.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the breaker.
+            reset_timeout (float): Seconds the breaker stays open before a probe.
+            clock (callable): The monotonic clock.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.shed = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        """Returns the seconds until the breaker lets a probe through."""
+        return max(self._opened_at + self.reset_timeout - self.clock(), 0.0)
+
+    def allow(self) -> bool:
+        """
+        Returns True if a request may be sent now.
+
+        In the half-open state only one caller gets True until that probe
+        reports its outcome.
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.retry_after() > 0:
+                self.shed += 1
+                return False
+            if self._probing:
+                self.shed += 1
+                return False
+            self.state = "half-open"
+            self._probing = True
+            return True
+
+    def release(self):
+        """
+        Give up a probe that was let through but never sent (e.g. because
+        the quota ran out), so that the next caller may probe instead.
+        Does nothing once the probe's outcome was recorded.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        """Close the breaker after the host answered."""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """Count a failure, opening the breaker at the threshold or after a failed probe."""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = self.clock()
+            self._probing = False
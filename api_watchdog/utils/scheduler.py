@@ -0,0 +1,320 @@
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+
+
+class Cadence:
+    """
+    A fixed grid of due times for one periodic job.
+
+    Due times are ``start + offset + k * interval`` on a monotonic clock, so
+    the time spent fetching and processing never pushes later ticks back.
+    Ticks that are missed because a run overran are coalesced into the next
+    grid point rather than queued and fired back to back.
+
+    Attributes:
+        interval (float): The number of seconds between grid points.
+        offset (float): A fixed phase offset, drawn once from the jitter range
+            so that targets with the same interval do not all fire together.
+        next_due (float): The monotonic time of the next grid point.
+        skipped (int): Grid points skipped because the job was overrunning.
+        deferred (int): Grid points skipped because the job asked to wait.
+        fired (int): The number of ticks that fired.
+        lag_last (float): Seconds between the last due time and when it fired.
+        lag_max (float): The largest lag observed.
+        lag_total (float): The sum of all observed lags.
+    """
+
+    __slots__ = (
+        "interval",
+        "offset",
+        "next_due",
+        "skipped",
+        "deferred",
+        "fired",
+        "lag_last",
+        "lag_max",
+        "lag_total",
+    )
+
+    def __init__(self, interval: float, start: float, jitter: float = 0.0, rng=random):
+        """
+        Initialize the Cadence instance.
+
+        Args:
+            interval (float): The number of seconds between grid points.
+            start (float): The monotonic time of the first grid point.
+            jitter (float): The upper bound, in seconds, of the random phase
+                offset; it is capped at one interval.
+            rng: The random number generator used to draw the offset.
+
+        Raises:
+            ValueError: If the interval is not positive.
+        """
+        if not interval > 0:
+            raise ValueError(f"Interval must be positive, got {interval!r}")
+        self.interval = interval
+        self.offset = rng.uniform(0, min(jitter, interval)) if jitter > 0 else 0.0
+        self.next_due = start + self.offset
+        self.skipped = 0
+        self.deferred = 0
+        self.fired = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self.lag_total = 0.0
+
+    def fire(self, now: float) -> float:
+        """
+        Record that the current grid point fired at ``now``.
+
+        Args:
+            now (float): The monotonic time at which the tick fired.
+
+        Returns:
+            float: The schedule lag, in seconds.
+        """
+        lag = max(now - self.next_due, 0.0)
+        self.fired += 1
+        self.lag_last = lag
+        self.lag_total += lag
+        if lag > self.lag_max:
+            self.lag_max = lag
+        return lag
+
+    def advance(self, now: float) -> float:
+        """
+        Move to the first grid point after ``now``, skipping missed ones.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            float: The new due time.
+        """
+        next_due = self.next_due + self.interval
+        if next_due <= now:
+            missed = math.floor((now - next_due) / self.interval) + 1
+            self.skipped += missed
+            next_due += missed * self.interval
+        self.next_due = next_due
+        return next_due
+
+    def defer(self, until: float) -> float:
+        """
+        Push the next due time to the first grid point at or after ``until``.
+
+        Used when a run reports that it cannot usefully run again before a
+        given time, e.g. because a rate-limit quota is exhausted.
+
+        Args:
+            until (float): The earliest monotonic time for the next run.
+
+        Returns:
+            float: The new due time.
+        """
+        if until > self.next_due:
+            missed = math.ceil((until - self.next_due) / self.interval)
+            self.deferred += missed
+            self.next_due += missed * self.interval
+        return self.next_due
+
+    def delay(self, now: float) -> float:
+        """
+        Returns the number of seconds from ``now`` until the next grid point.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        return max(self.next_due - now, 0.0)
+
+
+def lag_stats(cadences) -> dict:
+    """
+    Summarise schedule lag across many cadences.
+
+    Args:
+        cadences: The Cadence instances to summarise.
+
+    Returns:
+        dict: The mean and maximum lag in milliseconds and the number of
+        skipped and deferred ticks.
+    """
+    fired = skipped = deferred = 0
+    total = peak = 0.0
+    for cadence in cadences:
+        fired += cadence.fired
+        skipped += cadence.skipped
+        deferred += cadence.deferred
+        total += cadence.lag_total
+        peak = max(peak, cadence.lag_max)
+    return {
+        "lag_ms_mean": (total / fired * 1000) if fired else 0.0,
+        "lag_ms_max": peak * 1000,
+        "skipped_ticks": skipped,
+        "deferred_ticks": deferred,
+    }
+
+
+class Job:
+    """
+    A unit of work that the scheduler runs every ``interval`` seconds.
+
+    Attributes:
+        name (str): A label for the job, used in logs and stats.
+        func (callable): The function to run, called without arguments.
+        cadence (Cadence): The grid of due times the job runs on.
+        runs (int): The number of times the job has run.
+    """
+
+    __slots__ = ("name", "func", "cadence", "runs", "cancelled")
+
+    def __init__(self, name: str, func, cadence: Cadence):
+        """
+        Initialize the Job instance.
+
+        Args:
+            name (str): A label for the job.
+            func (callable): The function to run.
+            cadence (Cadence): The grid of due times the job runs on.
+        """
+        self.name = name
+        self.func = func
+        self.cadence = cadence
+        self.runs = 0
+        self.cancelled = False
+
+
+class Scheduler:
+    """
+    Runs many periodic jobs from a single thread.
+
+    Jobs are kept in a heap keyed on their next due time, so adding a target
+    costs one heap entry rather than a thread, and each wake-up only touches
+    the jobs that are actually due. Each job fires on a fixed grid (see
+    Cadence), so fetch and processing time do not make the schedule drift.
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=None):
+        """
+        Initialize the Scheduler instance.
+
+        Args:
+            clock (callable): The monotonic clock used to order jobs.
+            sleep (callable): Waits for the given number of seconds, defaults
+                to waiting on the scheduler's stop event.
+        """
+        self.clock = clock
+        self._heap = []
+        self._counter = itertools.count()
+        self._stop = threading.Event()
+        self._sleep = sleep or self._stop.wait
+        self.runs = 0
+        self.cpu_seconds = 0.0
+
+    def add(
+        self, name: str, func, interval: float, delay: float = 0.0, jitter: float = 0.0
+    ) -> Job:
+        """
+        Add a periodic job to the scheduler.
+
+        Args:
+            name (str): A label for the job.
+            func (callable): The function to run, called without arguments.
+                If it returns a number of seconds, the job's next run is
+                deferred until at least that long from now.
+            interval (float): The number of seconds between runs.
+            delay (float): The number of seconds before the first run.
+            jitter (float): The upper bound of a random phase offset added
+                to every run, used to spread load across jobs.
+
+        Returns:
+            Job: The scheduled job, which can be passed to ``cancel``.
+        """
+        job = Job(name, func, Cadence(interval, self.clock() + delay, jitter))
+        self._push(job)
+        return job
+
+    def cancel(self, job: Job):
+        """
+        Cancel a job; it is dropped from the heap the next time it comes due.
+
+        Args:
+            job (Job): The job returned by ``add``.
+        """
+        job.cancelled = True
+
+    def _push(self, job: Job):
+        # The counter breaks ties so jobs never have to be compared
+        heapq.heappush(self._heap, (job.cadence.next_due, next(self._counter), job))
+
+    def __len__(self):
+        return sum(1 for _, _, job in self._heap if not job.cancelled)
+
+    def run_pending(self) -> float:
+        """
+        Run every job that is due and reschedule it.
+
+        Returns:
+            float: The number of seconds until the next job is due, or None
+            if there are no jobs left.
+        """
+        while self._heap:
+            due, _, job = self._heap[0]
+            if job.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            now = self.clock()
+            if due > now:
+                return due - now
+
+            heapq.heappop(self._heap)
+            job.cadence.fire(now)
+            started = time.process_time()
+            defer = None
+            try:
+                defer = job.func()
+            finally:
+                self.cpu_seconds += time.process_time() - started
+                self.runs += 1
+                job.runs += 1
+                # Stay on the job's grid; ticks missed while it ran are skipped
+                now = self.clock()
+                job.cadence.advance(now)
+                if defer:
+                    job.cadence.defer(now + defer)
+                self._push(job)
+        return None
+
+    def run_forever(self):
+        """Run jobs as they come due until ``stop`` is called or no jobs remain."""
+        while not self._stop.is_set():
+            wait = self.run_pending()
+            if wait is None:
+                break
+            self._sleep(wait)
+
+    def stop(self):
+        """Ask ``run_forever`` to return after the job that is currently running."""
+        self._stop.set()
+
+    def stats(self) -> dict:
+        """
+        Returns counters that show how much work the scheduler is doing.
+
+        Returns:
+            dict: The number of jobs, total runs, CPU seconds spent running
+            jobs, the average CPU milliseconds per run and the schedule lag.
+        """
+        stats = {
+            "jobs": len(self),
+            "runs": self.runs,
+            "cpu_seconds": self.cpu_seconds,
+            "cpu_ms_per_run": (self.cpu_seconds / self.runs * 1000) if self.runs else 0.0,
+        }
+        stats.update(
+            lag_stats(job.cadence for _, _, job in self._heap if not job.cancelled)
+        )
+        return stats
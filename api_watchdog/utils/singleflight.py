@@ -0,0 +1,153 @@
+import threading
+import time
+from api_watchdog.utils.resilience import Cancelled
+
+# Seconds between checks of a caller's cancel event while it waits
+_POLL = 0.05
+
+
+class _Cancel:
+    """
+    The cancel event of a shared call: set once every caller waiting for
+    it has cancelled. It offers the ``is_set`` and ``wait`` of an Event.
+    """
+
+    __slots__ = ("events",)
+
+    def __init__(self):
+        self.events = []
+
+    def is_set(self) -> bool:
+        # A caller without a cancel event (None) never gives up on the call
+        events = list(self.events)
+        return bool(events) and all(e is not None and e.is_set() for e in events)
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not self.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, _POLL))
+        return True
+
+
+class _Call:
+    """A fetch in flight, or one that finished within the linger window."""
+
+    __slots__ = ("done", "result", "error", "finished_at", "cancel")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        self.cancel = _Cancel()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into a single call.
+
+    The first caller for a key (the "leader") runs the function; callers that
+    arrive while it is running wait for it and receive the same result, or
+    the same exception. A successful result is also handed to callers that
+    arrive within ``linger`` seconds after it finished, which covers monitors
+    whose schedules are close but not identical.
+
+    Attributes:
+        linger (float): Seconds a finished result is shared with late callers.
+        leaders (int): Calls that actually ran the function.
+        shared (int): Calls answered with another caller's result.
+    """
+
+    def __init__(self, linger: float = 0.5, clock=time.monotonic):
+        """
+        Initialize the SingleFlight instance.
+
+        Args:
+            linger (float): Seconds a finished result is shared with late callers.
+            clock (callable): The monotonic clock.
+        """
+        self.linger = linger
+        self.clock = clock
+        self.leaders = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, cancel=None):
+        """
+        Run ``func`` for ``key`` unless an identical call is already in flight.
+
+        Every caller may cancel its own wait. The shared call itself is only
+        cancelled once all of its callers have cancelled, so stopping one
+        caller never fails the others.
+
+        Args:
+            key: Identifies calls that may share a result (e.g. the URL).
+            func (callable): Called by the leader with the call's cancel
+                event, which is set once every waiting caller has cancelled.
+            cancel (threading.Event): This caller's cancel event, or None.
+
+        Returns:
+            The result of ``func``, from this call or a shared one.
+
+        Raises:
+            Cancelled: If ``cancel`` was set before the call finished.
+            Exception: Whatever ``func`` raised for the leader.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.finished_at is not None:
+                # Drop results that are older than the linger window
+                if self.clock() - call.finished_at > self.linger:
+                    del self._calls[key]
+                    call = None
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.leaders += 1
+            else:
+                leader = False
+                self.shared += 1
+            call.cancel.events.append(cancel)
+
+        if not leader:
+            if cancel is None:
+                call.done.wait()
+            else:
+                while not call.done.wait(_POLL):
+                    if cancel.is_set():
+                        raise Cancelled(key)
+            if isinstance(call.error, Cancelled) and not (cancel and cancel.is_set()):
+                # Every other caller gave up before this one joined; run it anew
+                return self.do(key, func, cancel)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(call.cancel)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                # Failures are not shared with callers that come later
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            raise
+        finally:
+            call.finished_at = self.clock()
+            call.done.set()
+        if self.linger <= 0:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+        # The other callers still get the result this caller no longer wants
+        if cancel is not None and cancel.is_set():
+            raise Cancelled(key)
+        return call.result
+
+    def stats(self) -> dict:
+        """Returns the number of leader calls and of deduplicated calls."""
+        return {"leaders": self.leaders, "shared": self.shared}
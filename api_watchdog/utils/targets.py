@@ -0,0 +1,401 @@
+import hashlib
+from pathlib import Path
+from api_watchdog.utils.logger import get_logger
+from api_watchdog.utils.record_sink import SINKS, get_sink
+from api_watchdog.utils.registry import get_plugin
+from api_watchdog.utils.timeseries import column_values
+from api_watchdog.utils.alerts import build_rule
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# How much of each response a target logs: every field, or the changed ones
+LOG_MODES = ("all", "changes")
+
+
+class Target:
+    """
+    A single monitored endpoint: a configured API instance and its interval.
+
+    Attributes:
+        name (str): A label for the target, used in console logs.
+        api: The API configuration instance (e.g. WeatherConfig).
+        api_url (str): The URL to fetch.
+        interval (int): The number of seconds between fetches.
+        log_file (str): The file that the API instance logs to.
+        last_version (str): The version of the last response passed to the
+            API instance, used to tell it when nothing has changed.
+        sink (JSONLSink): Where structured records are written, or None to
+            log the response as text through the API instance.
+        store (TimeSeriesStore): Where the numeric fields of each
+            observation are kept as history, or None.
+        analytics (Analytics): Rolling window statistics fed with the same
+            numeric fields, or None.
+        alerts (AlertEngine): The alert rules evaluated on each observation
+            and on failed fetches, or None.
+        failures (int): The current run of consecutive failed fetches.
+    """
+
+    __slots__ = (
+        "name",
+        "api",
+        "api_url",
+        "interval",
+        "log_file",
+        "last_version",
+        "sink",
+        "store",
+        "analytics",
+        "alerts",
+        "failures",
+    )
+
+    def __init__(
+        self, name: str, api, sink=None, store=None, analytics=None, alerts=None
+    ):
+        """
+        Initialize the Target instance.
+
+        Args:
+            name (str): A label for the target.
+            api: The API configuration instance.
+            sink (JSONLSink): Where to write structured records, or None.
+            store (TimeSeriesStore): Where to keep the history, or None.
+            analytics (Analytics): The rolling statistics to update, or None.
+            alerts (AlertEngine): The alert rules to evaluate, or None.
+        """
+        self.name = name
+        self.api = api
+        self.api_url, self.interval, self.log_file = api.get_config()
+        self.last_version = None
+        self.sink = sink
+        self.store = store
+        self.analytics = analytics
+        self.alerts = alerts
+        self.failures = 0
+
+    def handle(self, result, fetched_at: float):
+        """
+        Pass a fetch result to the target's output.
+
+        Text output goes through the API instance's ``configuration``. With a
+        sink, each observation is written as one JSON record holding the
+        target name, fetch time, latency and status next to the extracted
+        fields; responses without observations (API errors) are still
+        logged as text. With a store, the numeric fields are also appended
+        to the target's history and rolling statistics; targets that batch
+        many symbols keep one series per symbol, named "<target>:<symbol>".
+        Alert rules are evaluated last, once the observation is logged.
+
+        Args:
+            result (FetchResult): The result of fetching the target's URL.
+            fetched_at (float): The Unix time the fetch started.
+        """
+        ts = int(fetched_at * 1000)
+        if self.failures:
+            # A successful fetch ends the run of failures
+            self.failures = 0
+            if self.alerts is not None:
+                self.alerts.update(self.name, ts, {"failures": 0})
+
+        not_modified = self.not_modified(result)
+        if (
+            self.sink is None
+            and self.store is None
+            and self.analytics is None
+            and self.alerts is None
+        ):
+            self.api.configuration(result.data, not_modified=not_modified)
+            return
+        if not_modified:
+            return
+
+        records = self.api.extract(result.data)
+        if self.sink is None or not records:
+            self.api.configuration(result.data)
+        batched = hasattr(self.api, "symbols")
+        for fields in records:
+            if self.sink is not None:
+                record = {
+                    "target": self.name,
+                    "ts": round(fetched_at, 3),
+                    "latency_ms": round(result.latency * 1000, 1),
+                    "status": result.status,
+                    "cached": result.from_cache,
+                }
+                record.update(fields)
+                self.sink.write(record)
+            series = f"{self.name}:{fields['symbol']}" if batched else self.name
+            if self.store is not None:
+                self.store.append(series, ts, fields)
+            values = column_values(fields)
+            if self.analytics is not None:
+                self.analytics.update(series, ts, values)
+            if self.alerts is not None:
+                self.alerts.update(series, ts, values)
+
+    def failed(self, fetched_at: float):
+        """
+        Count a failed fetch and let the "failures" alert rules see the run.
+
+        Args:
+            fetched_at (float): The Unix time the fetch started.
+        """
+        self.failures += 1
+        if self.alerts is not None:
+            self.alerts.update(
+                self.name, int(fetched_at * 1000), {"failures": self.failures}
+            )
+
+    def not_modified(self, result) -> bool:
+        """
+        Record a fetch result and report whether its body is unchanged since
+        the last result this target processed.
+
+        Args:
+            result (FetchResult): The result of fetching the target's URL.
+
+        Returns:
+            bool: True if the response is the same one seen last time.
+        """
+        unchanged = result.version is not None and result.version == self.last_version
+        self.last_version = result.version
+        return unchanged
+
+
+def file_logger(log_file: str):
+    """
+    Returns the file logger for the given log file.
+
+    Targets that write to the same file share one logger, so the number of
+    loggers and open files grows with the number of log files rather than
+    the number of targets.
+
+    Args:
+        log_file (str): The path to the log file.
+
+    Returns:
+        logging.Logger: The logger writing to ``log_file``.
+    """
+    log_name = f"api_watchdog_{hashlib.md5(log_file.encode()).hexdigest()[:8]}"
+    return get_logger(name=log_name, log_file=log_file, log_to_console=False)
+
+
+def build_target(
+    api_class,
+    argument: str,
+    interval: int,
+    log_file: str,
+    name=None,
+    log_mode="all",
+    sink="log",
+    sink_file=None,
+):
+    """
+    Create a Target for the given API class and argument.
+
+    Args:
+        api_class (type): The API configuration class.
+        argument (str): The API argument (e.g. the location or stock symbol).
+        interval (int): The number of seconds between fetches.
+        log_file (str): The file to log API responses to.
+        name (str): A label for the target, defaults to the argument.
+        log_mode (str): "all" to log every field, or "changes" to log only
+            the fields that changed since the previous response.
+        sink (str): "log" to write text log lines, or "jsonl" to write one
+            JSON record per observation.
+        sink_file (str): The JSONL file, defaults to the log file with a
+            ".jsonl" suffix.
+
+    Returns:
+        Target: The configured target.
+
+    Raises:
+        ValueError: If the log mode or the sink is unknown.
+    """
+    if log_mode not in LOG_MODES:
+        raise ValueError(
+            f"Unknown log mode {log_mode!r}, expected one of {', '.join(LOG_MODES)}"
+        )
+    if sink not in SINKS:
+        raise ValueError(f"Unknown sink {sink!r}, expected one of {', '.join(SINKS)}")
+    api = api_class(
+        logger=file_logger(log_file),
+        argument=argument,
+        interval=interval,
+        log_file=log_file,
+        log_mode=log_mode,
+    )
+    if sink == "jsonl":
+        sink = get_sink(sink_file or str(Path(log_file).with_suffix(".jsonl")))
+    else:
+        sink = None
+    return Target(name or argument, api, sink)
+
+
+def build_targets(
+    api_class,
+    argument: str,
+    interval: int,
+    log_file: str,
+    name=None,
+    log_mode="all",
+    sink="log",
+    sink_file=None,
+) -> list:
+    """
+    Create the Targets for the given API class and argument.
+
+    API classes that batch many items into one request (they define a
+    ``batches`` classmethod, like MultiStockConfig) are split into one target
+    per batch; every other class yields a single target.
+
+    Args:
+        api_class (type): The API configuration class.
+        argument (str): The API argument (e.g. the location or stock symbols).
+        interval (int): The number of seconds between fetches.
+        log_file (str): The file to log API responses to.
+        name (str): A label for the targets, defaults to the argument.
+        log_mode (str): "all" or "changes".
+        sink (str): "log" or "jsonl".
+        sink_file (str): The JSONL file for the "jsonl" sink.
+
+    Returns:
+        list: The configured targets.
+    """
+    batches = api_class.batches(argument) if hasattr(api_class, "batches") else [argument]
+    targets = []
+    for index, batch in enumerate(batches, start=1):
+        label = name or batch
+        if name and len(batches) > 1:
+            label = f"{name}[{index}]"
+        targets.append(
+            build_target(
+                api_class, batch, interval, log_file, label, log_mode, sink, sink_file
+            )
+        )
+    return targets
+
+
+def load_targets(
+    path: str,
+    default_interval: int = 5,
+    default_log_mode="all",
+    default_sink="log",
+    default_sink_file=None,
+) -> list:
+    """
+    Load the targets listed in a TOML file.
+
+    The file holds an array of ``[[targets]]`` tables. Each one names the API
+    (``api = "weather"``, ``"stock"``, ``"stocks"`` or an installed plugin,
+    see registry) and its argument under the same key as the CLI option
+    (``location``, ``stock`` or ``stocks``),
+    and may set
+    ``interval``, ``log_file``, ``log_mode``, ``name``, ``sink`` (``"log"``
+    or ``"jsonl"``) and ``sink_file``. An optional ``[defaults]`` table
+    supplies values for keys that a target leaves out::
+
+        [defaults]
+        interval = 60
+
+        [[targets]]
+        api = "weather"
+        location = "Chennai"
+
+        [[targets]]
+        api = "stock"
+        stock = "IBM"
+        interval = 5
+        log_file = "ibm.log"
+
+    Args:
+        path (str): The path to the TOML file.
+        default_interval (int): The interval for targets that do not set one.
+        default_log_mode (str): The log mode for targets that do not set one.
+        default_sink (str): The sink for targets that do not set one.
+        default_sink_file (str): The JSONL file for targets that do not set
+            one; targets sharing it are told apart by their "target" field.
+
+    Returns:
+        list: The Target instances, in file order.
+
+    Raises:
+        RuntimeError: If no TOML parser is available.
+        ValueError: If an entry names an unknown API, log mode or sink,
+            lacks its argument or has an interval that is not positive.
+    """
+    if tomllib is None:
+        raise RuntimeError("Reading a targets file requires Python 3.11+ or 'tomli'")
+
+    with open(path, "rb") as f:
+        document = tomllib.load(f)
+
+    defaults = document.get("defaults", {})
+    targets = []
+    for index, entry in enumerate(document.get("targets", []), start=1):
+        entry = {**defaults, **entry}
+        api_name = entry.get("api")
+        try:
+            plugin = get_plugin(api_name)
+        except KeyError:
+            raise ValueError(f"Target {index}: unknown api {api_name!r}")
+        api_class = plugin.load()
+
+        argument = entry.get(api_class.var)
+        if not argument:
+            raise ValueError(f"Target {index}: missing {api_class.var!r}")
+
+        interval = int(entry.get("interval", default_interval))
+        if interval <= 0:
+            raise ValueError(f"Target {index}: interval must be positive, got {interval}")
+
+        # A list of symbols may be written as a TOML array
+        if isinstance(argument, list):
+            argument = ",".join(str(item) for item in argument)
+
+        targets.extend(
+            build_targets(
+                api_class,
+                argument=str(argument),
+                interval=interval,
+                log_file=entry.get("log_file", plugin.log_file),
+                name=entry.get("name"),
+                log_mode=entry.get("log_mode", default_log_mode),
+                sink=entry.get("sink", default_sink),
+                sink_file=entry.get("sink_file", default_sink_file),
+            )
+        )
+    return targets
+
+
+def load_alerts(path: str) -> list:
+    """
+    Load the alert rules listed in a targets file's ``[[alerts]]`` tables
+    (see alerts.build_rule).
+
+    Args:
+        path (str): The path to the TOML file.
+
+    Returns:
+        list: The Rule instances, in file order.
+
+    Raises:
+        RuntimeError: If no TOML parser is available.
+        ValueError: If a table holds an invalid rule.
+    """
+    if tomllib is None:
+        raise RuntimeError("Reading a targets file requires Python 3.11+ or 'tomli'")
+
+    with open(path, "rb") as f:
+        document = tomllib.load(f)
+
+    return [
+        build_rule(entry, index)
+        for index, entry in enumerate(document.get("alerts", []), start=1)
+    ]
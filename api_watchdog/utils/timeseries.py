@@ -0,0 +1,445 @@
+import mmap
+import os
+import shutil
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from urllib.parse import quote, unquote
+from api_watchdog.utils.log_rotation import parse_duration
+
+
+# The float columns every observation is stored with; fields a target does
+# not report (e.g. "close" for a weather target) are stored as NaN
+COLUMNS = ("temp", "humidity", "pressure", "open", "high", "low", "close", "volume")
+
+# Extracted record fields whose column name differs from the field name
+FIELD_COLUMNS = {"temp_c": "temp"}
+
+NAN = float("nan")
+
+# The statistics a downsampled tier keeps for each column of a bucket
+STATS = ("first", "max", "min", "last", "mean")
+
+
+def column_values(fields: dict) -> dict:
+    """
+    Returns the numeric fields of an extracted record, keyed by column name.
+
+    Args:
+        fields (dict): A record from an API class's ``extract``.
+    """
+    values = {}
+    for field, value in fields.items():
+        name = FIELD_COLUMNS.get(field, field)
+        if name in COLUMNS and isinstance(value, (int, float)):
+            values[name] = float(value)
+    return values
+
+
+def rollup_columns(columns=COLUMNS) -> tuple:
+    """
+    Returns the columns of a downsampled tier: "<column>.<stat>" for every
+    column and statistic, plus "count", the raw rows in the bucket.
+    """
+    return tuple(f"{c}.{stat}" for c in columns for stat in STATS) + ("count",)
+
+
+class MappedColumn:
+    """
+    A read-only, memory-mapped column file that can be indexed and bisected
+    without copying it.
+
+    Attributes:
+        rows (int): The number of complete values in the file.
+    """
+
+    def __init__(self, path: Path, typecode: str, rows=None):
+        """
+        Map a column file into memory.
+
+        Args:
+            path (Path): The column file.
+            typecode (str): "q" for int64 or "d" for float64.
+            rows (int): Only expose this many rows, or None for the whole file.
+        """
+        self._format = struct.Struct("=" + typecode)
+        self._map = None
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        self.rows = size // 8 if rows is None else min(size // 8, rows)
+        if self.rows:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row: int):
+        return self._format.unpack_from(self._map, row * 8)[0]
+
+    def read(self, lo: int, hi: int) -> bytes:
+        """Returns the raw bytes of rows lo..hi-1, clipped to the file."""
+        if self._map is None:
+            return b""
+        return self._map[lo * 8 : min(hi, self.rows) * 8]
+
+    def close(self):
+        """Unmap the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class Series:
+    """
+    The append-only, columnar history of one target.
+
+    Rows are split into numbered segment directories of at most
+    ``segment_rows`` rows. Each segment holds one file per column: ``ts``
+    (int64 Unix milliseconds, never decreasing) and one float64 file per
+    value column, so a query reads only the columns it asks for. The file
+    ``index`` lists the first timestamp of every segment.
+
+    A range query bisects the index to find the segments, memory-maps their
+    ``ts`` columns and bisects them to find the rows: O(log n) to locate
+    the range plus a scan of the rows in it.
+
+    Attributes:
+        path (Path): The directory holding the segments.
+        columns (tuple): The names of the float64 columns.
+        segment_rows (int): The most rows per segment.
+    """
+
+    def __init__(self, path, columns=COLUMNS, segment_rows: int = 65536):
+        """
+        Initialize the Series instance, repairing a row that a crash left
+        half-written.
+
+        Args:
+            path (str): The directory holding the segments.
+            columns (tuple): The names of the float64 columns.
+            segment_rows (int): The most rows per segment.
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.columns = tuple(columns)
+        self.segment_rows = segment_rows
+        self._lock = threading.Lock()
+        self._files = None
+        self._index = array("q")
+        index_path = self.path / "index"
+        if index_path.exists():
+            data = index_path.read_bytes()
+            self._index.frombytes(data[: len(data) - len(data) % 8])
+        self._rows = 0
+        self._last_ts = None
+        if self._index:
+            segment = self._segment_path(len(self._index) - 1)
+            self._rows = min(
+                (segment / name).stat().st_size // 8
+                if (segment / name).exists()
+                else 0
+                for name in ("ts",) + self.columns
+            )
+            for name in ("ts",) + self.columns:
+                column = segment / name
+                if column.exists():
+                    os.truncate(column, self._rows * 8)
+            if self._rows:
+                ts = MappedColumn(segment / "ts", "q", self._rows)
+                self._last_ts = ts[self._rows - 1]
+                ts.close()
+
+    def _segment_path(self, number: int) -> Path:
+        return self.path / f"{number:06d}"
+
+    @property
+    def last_ts(self):
+        """The timestamp of the newest row, or None if the series is empty."""
+        return self._last_ts
+
+    def first_ts(self):
+        """Returns the timestamp of the oldest row still stored, or None."""
+        for number, first in enumerate(self._index):
+            if self._segment_path(number).is_dir():
+                return first
+        return None
+
+    def drop_before(self, ts: int) -> int:
+        """
+        Delete the segments whose rows are all older than ``ts``.
+
+        The segment being appended to is always kept, and index entries stay
+        in place so segment numbers do not change.
+
+        Args:
+            ts (int): The cutoff in Unix milliseconds.
+
+        Returns:
+            int: The number of segments deleted.
+        """
+        dropped = 0
+        # Segment n ends before segment n + 1 starts
+        for number in range(len(self._index) - 1):
+            if self._index[number + 1] > ts:
+                break
+            segment = self._segment_path(number)
+            # Not while a query is mapping the segment's columns
+            with self._lock:
+                if segment.is_dir():
+                    shutil.rmtree(segment)
+                    dropped += 1
+        return dropped
+
+    def __len__(self) -> int:
+        """Returns the number of rows stored."""
+        if not self._index:
+            return 0
+        return (len(self._index) - 1) * self.segment_rows + self._rows
+
+    def append(self, ts: int, values: dict):
+        """
+        Append one row.
+
+        Args:
+            ts (int): The observation time in Unix milliseconds. A time
+                earlier than the last row's (a clock step) is stored as the
+                last row's time, so the column stays sorted.
+            values (dict): Column values; missing columns are stored as NaN.
+        """
+        with self._lock:
+            if self._last_ts is not None and ts < self._last_ts:
+                ts = self._last_ts
+            if not self._index or self._rows >= self.segment_rows:
+                self._start_segment(ts)
+            elif self._files is None:
+                self._open_files(len(self._index) - 1)
+
+            self._files[0].write(array("q", (ts,)).tobytes())
+            for f, name in zip(self._files[1:], self.columns):
+                value = values.get(name)
+                f.write(array("d", (NAN if value is None else value,)).tobytes())
+            # The ts column is flushed last, so readers never see a
+            # timestamp without its values
+            for f in self._files[1:] + self._files[:1]:
+                f.flush()
+            self._rows += 1
+            self._last_ts = ts
+
+    def _start_segment(self, ts: int):
+        self.close()
+        self._index.append(ts)
+        self._open_files(len(self._index) - 1)
+        with open(self.path / "index", "ab") as f:
+            f.write(array("q", (ts,)).tobytes())
+        self._rows = 0
+
+    def _open_files(self, number: int):
+        segment = self._segment_path(number)
+        segment.mkdir(exist_ok=True)
+        self._files = [open(segment / name, "ab") for name in ("ts",) + self.columns]
+
+    def close(self):
+        """Close the files of the segment being appended to."""
+        if self._files is not None:
+            for f in self._files:
+                f.close()
+            self._files = None
+
+    def query(self, start=None, end=None, columns=None) -> dict:
+        """
+        Returns the rows with start <= ts <= end.
+
+        Args:
+            start (int): The first timestamp in Unix milliseconds, or None.
+            end (int): The last timestamp in Unix milliseconds, or None.
+            columns (list): The value columns to read, defaults to all.
+
+        Returns:
+            dict: "ts" and each requested column, mapped to an array of
+            values in time order.
+        """
+        columns = self.columns if columns is None else tuple(columns)
+        unknown = set(columns) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        result = {"ts": array("q")}
+        result.update({name: array("d") for name in columns})
+
+        # The segments whose time span can overlap [start, end]
+        first = 0 if start is None else max(bisect_right(self._index, start) - 1, 0)
+        last = len(self._index) if end is None else bisect_right(self._index, end)
+
+        for number in range(first, last):
+            segment = self._segment_path(number)
+            # One segment at a time, so retention cannot delete it mid-read
+            # and appends wait for one segment rather than the whole query
+            with self._lock:
+                ts = MappedColumn(segment / "ts", "q")
+                lo = 0 if start is None else bisect_left(ts, start)
+                hi = len(ts) if end is None else bisect_right(ts, end)
+                if lo < hi:
+                    result["ts"].frombytes(ts.read(lo, hi))
+                    for name in columns:
+                        values = MappedColumn(segment / name, "d", len(ts))
+                        chunk = values.read(lo, hi)
+                        result[name].frombytes(chunk)
+                        # Rows the writer has not finished yet read as NaN
+                        result[name].extend([NAN] * (hi - lo - len(chunk) // 8))
+                        values.close()
+                ts.close()
+        return result
+
+
+class TimeSeriesStore:
+    """
+    A directory of Series, one per target.
+
+    A target's raw series lives in ``<root>/<target>``; downsampled tiers
+    written by a Compactor live in ``<root>/<target>/tiers/<resolution>``
+    (e.g. ``1m``), with the columns from rollup_columns.
+
+    Attributes:
+        root (Path): The store directory.
+        segment_rows (int): The most rows per segment of each series.
+    """
+
+    def __init__(self, root, segment_rows: int = 65536):
+        """
+        Initialize the TimeSeriesStore instance.
+
+        Args:
+            root (str): The store directory, created if needed.
+            segment_rows (int): The most rows per segment of each series.
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_rows = segment_rows
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def series(self, target: str, tier=None) -> Series:
+        """
+        Returns a Series of a target, creating it on first use.
+
+        Args:
+            target (str): The target name.
+            tier (str): The name of a downsampled tier, or None for the raw
+                observations.
+        """
+        with self._lock:
+            series = self._series.get((target, tier))
+            if series is None:
+                path = self.root / quote(target, safe="")
+                if tier is None:
+                    series = Series(path, segment_rows=self.segment_rows)
+                else:
+                    series = Series(
+                        path / "tiers" / tier,
+                        columns=rollup_columns(),
+                        segment_rows=self.segment_rows,
+                    )
+                self._series[(target, tier)] = series
+            return series
+
+    def tiers(self, target: str) -> list:
+        """Returns the names of a target's downsampled tiers, finest first."""
+        path = self.root / quote(target, safe="") / "tiers"
+        if not path.is_dir():
+            return []
+        names = [p.name for p in path.iterdir() if p.is_dir()]
+        return sorted(names, key=parse_duration)
+
+    def targets(self) -> list:
+        """Returns the names of the targets with stored history."""
+        return sorted(unquote(p.name) for p in self.root.iterdir() if p.is_dir())
+
+    def append(self, target: str, ts: int, fields: dict):
+        """
+        Store the numeric fields of one observation.
+
+        Args:
+            target (str): The target name.
+            ts (int): The observation time in Unix milliseconds.
+            fields (dict): The fields extracted by the target's API class.
+        """
+        self.series(target).append(ts, column_values(fields))
+
+    def choose_tier(self, target: str, start=None, resolution=None):
+        """
+        Returns the tier to read for a query, or None for the raw series.
+
+        The coarsest tier whose resolution is no coarser than ``resolution``
+        is chosen. If that tier has already dropped data from before
+        ``start``, the next coarser tier that still holds it is used instead.
+
+        Args:
+            target (str): The target name.
+            start (int): The first timestamp wanted, in Unix milliseconds.
+            resolution (float): The coarsest acceptable spacing, in seconds.
+        """
+        if not resolution:
+            return None
+        candidates = [None] + self.tiers(target)
+        fine_enough = [
+            tier for tier in candidates if tier is None or parse_duration(tier) <= resolution
+        ]
+        chosen = fine_enough[-1]
+        if start is not None:
+            for tier in candidates[candidates.index(chosen) :]:
+                first = self.series(target, tier).first_ts()
+                if first is not None and first <= start:
+                    return tier
+        return chosen
+
+    def query(
+        self, target: str, start=None, end=None, columns=None, resolution=None
+    ) -> dict:
+        """
+        Returns a target's rows with start <= ts <= end (see Series.query).
+
+        With a resolution, the rows come from the tier picked by choose_tier.
+        A plain column name then reads the bucket means (e.g. "close" reads
+        "close.mean"), and "<column>.<stat>" reads another statistic; on the
+        raw series "<column>.<stat>" reads the raw column.
+
+        Args:
+            target (str): The target name.
+            start (int): The first timestamp in Unix milliseconds, or None.
+            end (int): The last timestamp in Unix milliseconds, or None.
+            columns (list): The columns to read, defaults to all.
+            resolution (float): The coarsest acceptable spacing between rows,
+                in seconds, or None for raw rows.
+
+        Returns:
+            dict: "ts" and each requested column, mapped to an array of
+            values in time order.
+
+        Raises:
+            KeyError: If the target has no stored history.
+        """
+        if (target, None) not in self._series and not (
+            self.root / quote(target, safe="")
+        ).is_dir():
+            raise KeyError(target)
+        tier = self.choose_tier(target, start, resolution)
+        if columns is None:
+            columns = COLUMNS
+        if tier is None:
+            names = {c: c.partition(".")[0] for c in columns}
+        else:
+            names = {c: c if "." in c or c == "count" else f"{c}.mean" for c in columns}
+        rows = self.series(target, tier).query(start, end, set(names.values()))
+        result = {"ts": rows["ts"]}
+        result.update({c: rows[name] for c, name in names.items()})
+        return result
+
+    def close(self):
+        """Close every series."""
+        with self._lock:
+            for series in self._series.values():
+                series.close()
@@ -0,0 +1,47 @@
+"""
+Time per observation of evaluating thousands of alert rules.
+
+    python benchmarks/alerts.py [--thresholds 3000] [--changes 100] [--updates 1000]
+
+Threshold rules ("temp > N") are indexed by threshold, so an observation
+only checks the ones its value crossed; change rules ("close change > N%
+within 15m") are checked on every observation. The engine should stay
+well under a millisecond per observation.
+"""
+
+import argparse
+import io
+import time
+from api_watchdog.utils.alerts import AlertEngine, Rule, StdoutNotifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--thresholds", type=int, default=3000)
+    parser.add_argument("--changes", type=int, default=100)
+    parser.add_argument("--updates", type=int, default=1000)
+    args = parser.parse_args()
+
+    rules = [Rule(f"t{i}", f"temp > {i / 10}") for i in range(args.thresholds)]
+    rules += [
+        Rule(f"c{i}", f"close change > {i % 50 + 1}% within 15m")
+        for i in range(args.changes)
+    ]
+    alerts = AlertEngine(rules, notifiers=[StdoutNotifier(io.StringIO())])
+    alerts.update("x", 0, {"temp": 0.0, "close": 100.0})
+    first = alerts.evaluated
+
+    started = time.perf_counter()
+    for i in range(1, args.updates + 1):
+        alerts.update("x", i * 1000, {"temp": 150 + (i % 7) / 10, "close": 100.0 + i % 3})
+    per_update = (time.perf_counter() - started) / args.updates
+
+    print(f"{'rules':>6} {'time/update':>12} {'checks/update':>14}")
+    print(
+        f"{len(rules):>6} {per_update * 1e6:>10.0f}us "
+        f"{(alerts.evaluated - first) / args.updates:>14.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
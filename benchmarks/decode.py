@@ -0,0 +1,105 @@
+"""
+Time and memory per tick of decoding an intraday stock response and reading
+its newest bar, before and after projected decoding.
+
+    pip install -e .[fast]
+    python benchmarks/decode.py [--bars 100,5000,20000] [--repeat 50]
+
+"before" is what a tick used to do: response.json() (the standard library
+parser) and ``list(time_series.keys())[0]``. "orjson" decodes the whole body
+with orjson, when it is installed. "projected" is json_decode.decode with
+StockConfig's projection, as the fetcher does now.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from api_watchdog.utils.api_configuration.stock_api import StockConfig
+from api_watchdog.utils.json_decode import decode, orjson
+
+
+def make_body(bars: int) -> bytes:
+    start = datetime(2024, 1, 2, 16, 0)
+    series = {}
+    for i in range(bars):
+        stamp = (start - timedelta(minutes=5 * i)).strftime("%Y-%m-%d %H:%M:%S")
+        series[stamp] = {
+            "1. open": f"{180 + i % 7:.4f}",
+            "2. high": f"{181 + i % 5:.4f}",
+            "3. low": f"{179 + i % 3:.4f}",
+            "4. close": f"{180 + i % 11:.4f}",
+            "5. volume": str(1000 + i),
+        }
+    data = {
+        "Meta Data": {
+            "1. Information": "Intraday (5min) open, high, low, close prices and volume",
+            "2. Symbol": "IBM",
+            "3. Last Refreshed": "2024-01-02 16:00:00",
+            "4. Interval": "5min",
+            "5. Output Size": "Full size",
+            "6. Time Zone": "US/Eastern",
+        },
+        "Time Series (5min)": series,
+    }
+    return json.dumps(data, indent=4).encode()
+
+
+def before(body, projection):
+    api = json.loads(body)
+    series = api["Time Series (5min)"]
+    return series[list(series.keys())[0]]
+
+
+def full_orjson(body, projection):
+    api = orjson.loads(body)
+    series = api["Time Series (5min)"]
+    return series[next(iter(series))]
+
+
+def projected(body, projection):
+    api = decode(body, projection)
+    series = api["Time Series (5min)"]
+    return series[next(iter(series))]
+
+
+def measure(func, body, projection, repeat):
+    func(body, projection)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(body, projection)
+    per_tick = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    func(body, projection)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_tick, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bars", default="100,5000,20000")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    projection = StockConfig("IBM", Mock(), 5, "ibm.log").projection
+    cases = [("before", before), ("projected", projected)]
+    if orjson is not None:
+        cases.insert(1, ("orjson", full_orjson))
+
+    print(f"{'bars':>6} {'body':>9} {'decoder':>10} {'time/tick':>11} {'peak alloc':>11}")
+    for bars in (int(b) for b in args.bars.split(",")):
+        body = make_body(bars)
+        for name, func in cases:
+            per_tick, peak = measure(func, body, projection, args.repeat)
+            print(
+                f"{bars:>6} {len(body) / 1024:>7.0f}KB {name:>10} "
+                f"{per_tick * 1e6:>9.0f}us {peak / 1024:>9.0f}KB"
+            )
+
+
+if __name__ == "__main__":
+    main()
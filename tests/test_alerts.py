@@ -0,0 +1,95 @@
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from unittest.mock import Mock
+from api_watchdog.utils.alerts import (
+    AlertEngine,
+    FileNotifier,
+    Rule,
+    StdoutNotifier,
+    WebhookNotifier,
+    build_rule,
+)
+from api_watchdog.utils.targets import Target
+
+MINUTE = 60_000
+
+def engine(*rules, **kwargs):
+    return AlertEngine(list(rules), notifiers=[StdoutNotifier(io.StringIO())], **kwargs)
+
+def test_threshold_fires_once_per_crossing_and_respects_cooldown():
+    alerts = engine(Rule("freezing", "temp < 0", cooldown=600))
+    fired = [alerts.update("chennai", m * MINUTE, {"temp": t})
+             for m, t in enumerate([5, -1, -2, 3, -1, 4, -3])]
+    # Fires on the first crossing, is held back by the 10 minute cooldown on
+    # the second, then fires again once the cooldown is over
+    assert [len(f) for f in fired] == [0, 1, 0, 0, 0, 0, 0]
+    assert alerts.stats() == {"fired": 1, "suppressed": 2}
+    assert len(alerts.update("chennai", 20 * MINUTE, {"temp": 5})) == 0
+    assert len(alerts.update("chennai", 21 * MINUTE, {"temp": -5})) == 1
+
+def test_change_within_window():
+    alerts = engine(Rule("move", "close change > 2% within 15m", cooldown=0))
+    assert not alerts.update("ibm", 0, {"close": 100.0})
+    assert not alerts.update("ibm", 10 * MINUTE, {"close": 101.5})
+    (alert,) = alerts.update("ibm", 14 * MINUTE, {"close": 97.0})
+    assert alert.value == pytest.approx(-100 * 4.5 / 101.5)
+    # 100 has left the window and 101.5 too; 97 -> 98 is a 1% move
+    assert not alerts.update("ibm", 40 * MINUTE, {"close": 98.0})
+
+def test_rules_only_apply_to_matching_series_and_fields():
+    alerts = engine(Rule("hot", "temp > 30", target="chen*"))
+    assert not alerts.update("london", 0, {"temp": 35})
+    assert not alerts.update("chennai", 0, {"close": 35})
+    assert alerts.update("chennai", 0, {"temp": 35})
+
+def test_consecutive_failures_via_target(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    alerts = AlertEngine([build_rule({"when": "failures >= 3", "cooldown": 0})],
+                         notifiers=[FileNotifier(str(path))])
+    api = Mock(get_config=Mock(return_value=("u", 5, "l")), extract=Mock(return_value=[]))
+    target = Target("ibm", api, alerts=alerts)
+    for i in range(4):
+        target.failed(i)
+    target.handle(Mock(version=None, data={}), 5)
+    for i in range(3):
+        target.failed(10 + i)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["value"] for r in records] == [3, 3]
+
+def test_webhook_posts_to_local_stub():
+    received = []
+
+    class Stub(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        webhook = WebhookNotifier(f"http://127.0.0.1:{server.server_port}/hook")
+        AlertEngine([Rule("hot", "temp > 30")], [webhook]).update("x", 0, {"temp": 31})
+        webhook.wait()
+    finally:
+        server.shutdown()
+    assert webhook.sent == 1
+    assert received[0]["rule"] == "hot" and received[0]["value"] == 31
+
+def test_thousands_of_rules_only_check_crossed_thresholds():
+    rules = [Rule(f"t{i}", f"temp > {i / 10}") for i in range(3000)]
+    rules += [Rule(f"c{i}", f"close change > {i % 50 + 1}% within 15m") for i in range(100)]
+    alerts = engine(*rules)
+    alerts.update("x", 0, {"temp": 0.0, "close": 100.0})
+    assert alerts.evaluated == 3100
+    for i in range(1, 1001):
+        alerts.update("x", i * 1000, {"temp": 150 + (i % 7) / 10, "close": 100.0 + i % 3})
+    # Each temp update checks the few thresholds it crossed, not all 3000;
+    # change rules have no threshold and are checked every time
+    assert alerts.evaluated - 3100 <= 1000 * (8 + 100)
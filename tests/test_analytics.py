@@ -0,0 +1,65 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from api_watchdog.utils.analytics import Analytics, RollingWindow, rolling_stats
+
+def observations(n, seed=1):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        close = 100 + rng.gauss(0, 5)
+        volume = float(rng.randint(1, 1000))
+        rows.append((i * 5000, {"close": close, "volume": volume}))
+    return rows
+
+def test_incremental_stats_match_a_full_recompute():
+    window = RollingWindow(7, columns=("close", "volume", "temp"))
+    rows = observations(50)
+    for ts, values in rows:
+        window.update(ts, values)
+
+    tail = rows[-7:]
+    close = np.array([v["close"] for _, v in tail])
+    volume = np.array([v["volume"] for _, v in tail])
+    stats = window.stats()
+    assert "temp" not in stats  # never reported
+    assert stats["close"]["mean"] == pytest.approx(close.mean())
+    assert stats["close"]["std"] == pytest.approx(close.std())
+    assert stats["close"]["min"] == close.min()
+    assert stats["close"]["max"] == close.max()
+    assert stats["close"]["roc"] == pytest.approx((close[-1] - close[0]) / 30)
+    assert stats["vwap"] == pytest.approx((close * volume).sum() / volume.sum())
+
+def test_trend_is_slope_per_hour():
+    window = RollingWindow(10, columns=("temp",))
+    for i in range(20):
+        window.update(i * 60_000, {"temp": 20 + 0.1 * i})  # +0.1°C per minute
+    assert window.stats()["temp"]["trend"] == pytest.approx(6.0)
+
+def test_batch_recompute_agrees_with_the_window():
+    rows = observations(30)
+    history = {
+        "ts": [ts for ts, _ in rows],
+        "close": [v["close"] for _, v in rows],
+        "volume": [v["volume"] for _, v in rows],
+    }
+    batch = rolling_stats(history, 5)
+    window = RollingWindow(5, columns=("close", "volume"))
+    for ts, values in rows:
+        window.update(ts, values)
+    stats = window.stats()
+    assert batch["close.mean"][-1] == pytest.approx(stats["close"]["mean"])
+    assert batch["close.max"][-1] == stats["close"]["max"]
+    assert batch["vwap"][-1] == pytest.approx(stats["vwap"])
+    assert batch["close.trend"][-1] == pytest.approx(stats["close"]["trend"])
+    # The first rows use the observations available so far
+    assert batch["close.mean"][0] == pytest.approx(history["close"][0])
+
+def test_analytics_keeps_one_window_per_series():
+    analytics = Analytics(window=3)
+    analytics.update("a", 0, {"temp": 1.0})
+    analytics.update("b", 0, {"temp": 5.0})
+    assert analytics.stats()["a"]["temp"]["mean"] == 1.0
+    assert analytics.stats()["b"]["temp"]["mean"] == 5.0
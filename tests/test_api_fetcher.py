@@ -1,23 +1,34 @@
 
 import pytest
 from unittest.mock import patch, Mock
-from api_watchdog.utils.api_fetcher import fetch_api
+from api_watchdog.utils import api_fetcher
+from api_watchdog.utils.api_fetcher import fetch_api, APIFetcher
+from api_watchdog.utils.resilience import CircuitOpen
 import requests
 
+@pytest.fixture(autouse=True)
+def fresh_default_fetcher():
+    # Circuit breakers live on the shared fetcher; start every test closed
+    api_fetcher._default_fetcher = None
+    yield
+    api_fetcher._default_fetcher = None
+
 def test_fetch_api_success_json():
     mock_resp = Mock()
     mock_resp.raise_for_status = Mock()
-    mock_resp.json.return_value = {"ok": True}
-    with patch("api_watchdog.utils.api_fetcher.requests.get", return_value=mock_resp) as mget:
+    mock_resp.content = b'{"ok": true}'
+    with patch("api_watchdog.utils.api_fetcher.APIFetcher.get", return_value=mock_resp) as mget:
         data = fetch_api("https://example.com/data", max_retries=3, delay=0)
         assert data == {"ok": True}
         assert mget.call_count == 1
-        mget.assert_called_with("https://example.com/data", timeout=10)
+        mget.assert_called_with("https://example.com/data", timeout=10, headers=None)
 
 def test_fetch_api_http_error_retries_and_raises():
     mock_resp = Mock()
+    mock_resp.status_code = 503
+    mock_resp.headers = {}
     mock_resp.raise_for_status.side_effect = requests.exceptions.HTTPError("boom")
-    with patch("api_watchdog.utils.api_fetcher.requests.get", return_value=mock_resp) as mget:
+    with patch("api_watchdog.utils.api_fetcher.APIFetcher.get", return_value=mock_resp) as mget:
         with pytest.raises(requests.exceptions.HTTPError):
             fetch_api("https://example.com/err", max_retries=3, delay=0)
         # Should have attempted exactly max_retries times
@@ -25,7 +36,7 @@ def test_fetch_api_http_error_retries_and_raises():
 
 def test_fetch_api_timeout_retries_and_raises():
     # Simulate a RequestException such as Timeout on get()
-    with patch("api_watchdog.utils.api_fetcher.requests.get", side_effect=requests.exceptions.Timeout("t")) as mget:
+    with patch("api_watchdog.utils.api_fetcher.APIFetcher.get", side_effect=requests.exceptions.Timeout("t")) as mget:
         with pytest.raises(requests.exceptions.Timeout):
             fetch_api("https://example.com/timeout", max_retries=2, delay=0)
         assert mget.call_count == 2
@@ -33,7 +44,48 @@ def test_fetch_api_timeout_retries_and_raises():
 def test_fetch_api_non_json_bubbles_value_error():
     mock_resp = Mock()
     mock_resp.raise_for_status = Mock()
-    mock_resp.json.side_effect = ValueError("not json")
-    with patch("api_watchdog.utils.api_fetcher.requests.get", return_value=mock_resp):
+    mock_resp.content = b"not json"
+    with patch("api_watchdog.utils.api_fetcher.APIFetcher.get", return_value=mock_resp):
         with pytest.raises(ValueError):
             fetch_api("https://example.com/notjson", max_retries=1, delay=0)
+
+def test_fetcher_reuses_one_session_per_host():
+    fetcher = APIFetcher(pool_maxsize=2)
+    a = fetcher.session_for("https://example.com/a")
+    b = fetcher.session_for("https://example.com/b?x=1")
+    c = fetcher.session_for("https://other.example.com/a")
+    assert a is b
+    assert a is not c
+    adapter = a.get_adapter("https://example.com/a")
+    assert adapter._pool_maxsize == 2
+    fetcher.close()
+
+def test_fetcher_pool_stats_counts_hits_and_misses():
+    fetcher = APIFetcher()
+    session = fetcher.session_for("https://example.com/a")
+    pool = session.get_adapter("https://example.com/a").poolmanager.connection_from_url("https://example.com/a")
+    pool.num_requests = 3
+    pool.num_connections = 1
+    assert fetcher.pool_stats() == {"example.com": {"requests": 3, "hits": 2, "misses": 1}}
+    fetcher.close()
+
+def test_fetch_api_client_error_is_not_retried():
+    mock_resp = Mock()
+    mock_resp.status_code = 404
+    mock_resp.raise_for_status.side_effect = requests.exceptions.HTTPError("missing")
+    with patch("api_watchdog.utils.api_fetcher.APIFetcher.get", return_value=mock_resp) as mget:
+        with pytest.raises(requests.exceptions.HTTPError):
+            fetch_api("https://example.com/missing", max_retries=5, delay=0)
+        assert mget.call_count == 1
+
+def test_circuit_opens_and_sheds_requests_for_host():
+    fetcher = APIFetcher(failure_threshold=3, reset_timeout=60)
+    with patch.object(APIFetcher, "get", side_effect=requests.exceptions.ConnectionError("down")) as mget:
+        with pytest.raises(requests.exceptions.ConnectionError):
+            fetcher.fetch("https://down.example.com/a", max_retries=5, delay=0)
+        # The breaker opened after three failures and stopped the retries
+        assert mget.call_count == 3
+        with pytest.raises(CircuitOpen):
+            fetcher.fetch("https://down.example.com/b", max_retries=5, delay=0)
+        assert mget.call_count == 3
+    assert fetcher.breaker_for("https://down.example.com/").state == "open"
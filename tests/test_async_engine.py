@@ -0,0 +1,66 @@
+
+import asyncio
+import threading
+import time
+from api_watchdog.utils.async_engine import AsyncEngine
+
+class FakeTarget:
+    def __init__(self, name, api_url, interval):
+        self.name = name
+        self.api_url = api_url
+        self.interval = interval
+
+def run_for(engine, targets, poll, seconds):
+    async def main():
+        task = asyncio.ensure_future(engine.run(targets, poll))
+        await asyncio.sleep(seconds)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    asyncio.run(main())
+
+def test_slow_target_does_not_delay_fast_target():
+    calls = {"slow": 0, "fast": 0}
+    def poll(target):
+        calls[target.name] += 1
+        if target.name == "slow":
+            time.sleep(0.5)
+    targets = [
+        FakeTarget("slow", "https://slow.example.com/", 0.05),
+        FakeTarget("fast", "https://fast.example.com/", 0.05),
+    ]
+    engine = AsyncEngine(max_concurrency=4, per_host=1)
+    run_for(engine, targets, poll, 0.3)
+    assert calls["slow"] == 1
+    assert calls["fast"] >= 4
+    assert engine.skipped >= 4
+
+def test_per_host_limit_is_respected():
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+    def poll(target):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+    targets = [FakeTarget(f"t{i}", "https://same.example.com/", 0.02) for i in range(6)]
+    engine = AsyncEngine(max_concurrency=6, per_host=2)
+    run_for(engine, targets, poll, 0.3)
+    assert state["peak"] == 2
+
+def test_saturated_host_does_not_starve_other_hosts():
+    calls = {"fast": 0}
+    def poll(target):
+        if target.name == "fast":
+            calls["fast"] += 1
+        else:
+            time.sleep(0.2)
+    targets = [FakeTarget(f"slow{i}", "https://slow.example.com/", 0.02) for i in range(4)]
+    targets.append(FakeTarget("fast", "https://fast.example.com/", 0.02))
+    engine = AsyncEngine(max_concurrency=2, per_host=1)
+    run_for(engine, targets, poll, 0.3)
+    assert calls["fast"] >= 5
@@ -0,0 +1,87 @@
+import random
+from api_watchdog.utils.chart import LiveChart, Series
+
+class FakeCanvas:
+    """Keeps item coordinates and after() callbacks instead of drawing."""
+    def __init__(self, width=200, height=100):
+        self.width, self.height = width, height
+        self.items, self.created, self.pending = {}, 0, []
+    def winfo_width(self):
+        return self.width
+    def winfo_height(self):
+        return self.height
+    def _create(self, *coords, **options):
+        self.created += 1
+        self.items[self.created] = {"coords": list(coords), **options}
+        return self.created
+    create_line = create_text = _create
+    def coords(self, item, *coords):
+        self.items[item]["coords"] = list(coords)
+    def itemconfigure(self, item, **options):
+        self.items[item].update(options)
+    def after(self, ms, callback):
+        self.pending.append(callback)
+        return len(self.pending)
+    def after_cancel(self, id):
+        pass
+
+def brute_columns(samples, t0, t1, width):
+    columns = {}
+    for t, v in samples:
+        c = min(int((t - t0) * width / (t1 - t0)), width - 1)
+        lo, hi = columns.get(c, (v, v))
+        columns[c] = (min(lo, v), max(hi, v))
+    return [(c, *columns[c]) for c in sorted(columns)]
+
+def test_columns_match_a_full_scan_after_wrapping():
+    rng = random.Random(1)
+    series = Series(capacity=256, block=16)
+    samples = [(float(t), rng.uniform(-50, 50)) for t in range(1000)]
+    for t, v in samples:
+        series.append(t, v)
+    kept = samples[-256:]
+    assert len(series) == 256 and series.span() == (kept[0][0], kept[-1][0])
+    for width in (3, 37, 300):
+        got = [(c, min(a, b), max(a, b)) for c, a, b in series.columns(kept[0][0], kept[-1][0], width)]
+        assert got == brute_columns(kept, kept[0][0], kept[-1][0], width)
+
+def test_columns_keep_the_order_of_the_extremes():
+    series = Series(capacity=64, block=8)
+    for t, v in enumerate([5, 9, 1, 5]):
+        series.append(t, v)
+    assert series.columns(0, 4, 1) == [(0, 9, 1)]
+
+def test_redraw_cost_follows_width_not_samples():
+    series = Series(capacity=1 << 16)
+    for t in range(1 << 16):
+        series.append(t, t % 97)
+    assert len(series.columns(0, (1 << 16) - 1, 100)) == 100
+
+def test_chart_updates_items_in_place_and_only_when_changed():
+    canvas = FakeCanvas()
+    chart = LiveChart(canvas)
+    chart.add(0, {"temp": 20.0, "pressure": 1000.0})
+    chart.add(1, {"temp": 21.0, "pressure": 1001.0})
+    assert len(canvas.pending) == 1  # throttled to one scheduled redraw
+    canvas.pending.pop()()
+    assert canvas.created == 4
+    line = canvas.items[1]["coords"]
+    assert len(line) >= 8 and all(4 <= x <= 196 for x in line[::2])
+    assert "temp: 21" in canvas.items[2]["text"]
+
+    # Nothing changed: the items are left alone
+    canvas.items[1]["coords"] = "untouched"
+    chart.redraw()
+    assert canvas.items[1]["coords"] == "untouched"
+
+    chart.add(2, {"temp": 22.0})
+    canvas.pending.pop()()
+    assert canvas.created == 4 and canvas.items[1]["coords"] != "untouched"
+
+def test_redraw_stops_at_its_budget():
+    canvas = FakeCanvas()
+    ticks = iter(range(100)).__next__
+    chart = LiveChart(canvas, budget=2, clock=ticks)
+    chart.add(0, {name: 1.0 for name in "abcdef"})
+    canvas.pending.pop()()
+    assert 0 < len(chart._drawn) < 6 and len(canvas.pending) == 1
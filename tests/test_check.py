@@ -0,0 +1,85 @@
+import json
+import threading
+import time
+from unittest.mock import patch, Mock
+import pytest
+from api_watchdog.cli_api import run_check
+from api_watchdog.core_gui_and_cli.cli import parse_args
+from api_watchdog.utils import api_fetcher
+from api_watchdog.utils.api_fetcher import APIFetcher, FetchResult
+from api_watchdog.utils.check import (
+    EXIT_FAILED, EXIT_OK, EXIT_TIMEOUT, check_targets, exit_status,
+)
+
+WEATHER = {"name": "Chennai", "dt": 1700000000, "main": {"temp": 300.15, "humidity": 70}}
+
+def target(name, records=({"temp_c": 27.0},)):
+    t = Mock()
+    t.name = name
+    t.api.extract.return_value = list(records)
+    return t
+
+def test_results_keep_target_order_and_report_failures():
+    def fetch(t):
+        if t.name == "down":
+            raise ConnectionError("refused")
+        return FetchResult({"x": 1}, status=200, latency=0.01)
+    targets = [target("a"), target("down"), target("empty", records=())]
+    results = check_targets(targets, fetch, deadline=5, max_concurrency=2)
+    assert [r.name for r in results] == ["a", "down", "empty"]
+    assert results[0].ok and results[0].records == [{"temp_c": 27.0}]
+    assert results[1].error == "refused"
+    targets[1].failed.assert_called_once()
+    assert results[2].error == "no observation in the response"
+    assert exit_status(results) == EXIT_FAILED
+    assert exit_status(results[:1]) == EXIT_OK
+
+def test_deadline_bounds_the_wall_time():
+    release = threading.Event()
+    def fetch(t):
+        if t.name == "slow":
+            release.wait(10)
+        return FetchResult({}, status=200)
+    started = time.monotonic()
+    results = check_targets([target("fast"), target("slow")], fetch, deadline=0.2)
+    release.set()
+    assert time.monotonic() - started < 2
+    assert results[0].ok and results[1].timed_out
+    assert exit_status(results) == EXIT_TIMEOUT
+
+def run(argv):
+    with patch("sys.argv", ["api-watchdog", *argv]):
+        args = parse_args()
+    with pytest.raises(SystemExit) as exit:
+        run_check(args)
+    return exit.value.code
+
+def test_warm_disk_cache_serves_a_second_check(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    argv = ["check", "weather=Chennai", "--cache-dir", str(tmp_path / "cache"),
+            "--no-rate-limit", "--format", "jsonl"]
+    resp = Mock(status_code=200, headers={"Cache-Control": "max-age=300"}, text=json.dumps(WEATHER))
+    resp.content = resp.text.encode()
+
+    monkeypatch.setattr(api_fetcher, "_default_fetcher", APIFetcher(coalesce_window=0))
+    with patch.object(APIFetcher, "get", return_value=resp):
+        assert run(argv) == EXIT_OK
+    monkeypatch.setattr(api_fetcher, "_default_fetcher", APIFetcher(coalesce_window=0))
+    with patch.object(APIFetcher, "get") as mget:
+        assert run(argv) == EXIT_OK
+    assert mget.call_count == 0
+
+    first, second = map(json.loads, capsys.readouterr().out.splitlines())
+    assert not first["from_cache"] and second["from_cache"]
+    assert second["records"][0]["temp_c"] == 27.0
+
+def test_check_without_targets_is_a_usage_error():
+    assert "Nothing to check" in run(["check"])
+
+def test_concurrency_and_retries_must_be_positive():
+    with pytest.raises(ValueError):
+        check_targets([target("a")], lambda t: None, max_concurrency=0)
+    with pytest.raises(SystemExit):
+        parse_args(["check", "weather=Chennai", "--max-concurrency", "0"])
+    with pytest.raises(SystemExit):
+        parse_args(["check", "weather=Chennai", "--retries", "0"])
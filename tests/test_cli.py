@@ -1,5 +1,8 @@
 
+import os
+import subprocess
 import sys
+from pathlib import Path
 import pytest
 from api_watchdog.core_gui_and_cli.cli import parse_args
 from api_watchdog.utils.api_configuration import WeatherConfig, StockConfig
@@ -34,3 +37,59 @@ def test_parse_args_missing_required_raises():
         run_parse(["weather"])  # missing --location
     with pytest.raises(SystemExit):
         run_parse(["stock"])  # missing --stock
+
+def test_parse_args_run_targets():
+    args = run_parse(["run","--targets","targets.toml"])
+    assert args.api is None and args.command == "run"
+    assert args.targets == "targets.toml"
+    assert args.interval == 5
+
+def test_parse_args_engine_defaults_and_async():
+    assert run_parse(["weather","--location","Chennai"]).engine == "sync"
+    args = run_parse(["run","--targets","t.toml","--engine","async","--max-concurrency","4"])
+    assert args.engine == "async"
+    assert args.max_concurrency == 4
+    assert args.per_host == 2
+
+def test_parse_args_rejects_non_positive_interval():
+    with pytest.raises(SystemExit):
+        run_parse(["weather", "--location", "Chennai", "--interval", "0"])
+    with pytest.raises(SystemExit):
+        run_parse(["run", "--targets", "t.toml", "--interval", "-5"])
+
+def test_parse_args_rejects_bad_alerts():
+    args = run_parse(["weather", "--location", "Chennai", "--alert", "temp < 0", "--alert-notify", "file:a.jsonl"])
+    assert args.alert == ["temp < 0"] and args.alert_notify == ["file:a.jsonl"]
+    with pytest.raises(SystemExit):
+        run_parse(["weather", "--location", "Chennai", "--alert", "temp is cold"])
+    with pytest.raises(SystemExit):
+        run_parse(["weather", "--location", "Chennai", "--alert-notify", "email:me"])
+
+def test_parse_args_rejects_non_positive_windows():
+    with pytest.raises(SystemExit):
+        run_parse(["query", "--store", "history", "--rolling", "-1"])
+    with pytest.raises(SystemExit):
+        run_parse(["run", "--targets", "t.toml", "--analytics-window", "0"])
+
+def test_main_runs_targets_without_the_cli_flag(tmp_path):
+    # Without a display the GUI would fail on tkinter, not on the targets file
+    main = Path(__file__).resolve().parents[1] / "__main__.py"
+    result = subprocess.run(
+        [sys.executable, str(main), "run", "--targets", str(tmp_path / "missing.toml")],
+        capture_output=True, text=True,
+        env={**{k: v for k, v in os.environ.items() if k != "DISPLAY"}, "PYTHONPATH": str(main.parent)},
+    )
+    assert result.returncode == 1
+    assert "missing.toml" in result.stdout + result.stderr
+
+def test_parse_args_rejects_non_positive_concurrency():
+    with pytest.raises(SystemExit):
+        run_parse(["run", "--targets", "t.toml", "--engine", "async", "--max-concurrency", "0"])
+    with pytest.raises(SystemExit):
+        run_parse(["run", "--targets", "t.toml", "--engine", "async", "--per-host", "-1"])
+
+def test_parse_args_rejects_non_finite_times():
+    assert run_parse(["query", "--store", "history", "--start", "1.5"]).start == 1500
+    for value in ("inf", "nan", "1e400", "1e306"):
+        with pytest.raises(SystemExit):
+            run_parse(["query", "--store", "history", "--end", value])
@@ -0,0 +1,42 @@
+
+from unittest.mock import Mock
+from api_watchdog.utils.diff import ChangeDetector, content_hash, diff_json
+from api_watchdog.utils.api_configuration import WeatherConfig
+
+def weather(temp=290.0, humidity=50):
+    return {
+        "name": "Chennai", "dt": 1700000000, "sys": {"country": "IN", "sunrise": 1, "sunset": 2},
+        "weather": [{"description": "clear"}], "wind": {"speed": 1.0, "deg": 90},
+        "main": {"temp": temp, "humidity": humidity, "pressure": 1000},
+        "visibility": 10000, "clouds": {"all": 0},
+    }
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+def test_diff_json_reports_only_changed_paths():
+    changes = diff_json(weather(), weather(temp=291.0))
+    assert [c.path for c in changes] == [("main", "temp")]
+    changes = diff_json({"a": [1, 2], "b": 1}, {"a": [1, 3, 4], "c": 1})
+    assert [c.path for c in changes] == [("a", 1), ("a", 2), ("c",), ("b",)]
+
+def test_detector_fast_path_on_identical_content():
+    detector = ChangeDetector()
+    assert detector.compare(weather()).first
+    diff = detector.compare(weather())
+    assert not diff.changed
+    diff = detector.compare(weather(humidity=60))
+    assert diff.touches(("main", "humidity"))
+    assert not diff.touches(("main", "temp"))
+
+def test_changes_mode_logs_only_changed_fields():
+    log = Mock()
+    config = WeatherConfig(argument="Chennai", logger=log, interval=5, log_file="w.log", log_mode="changes")
+    config.configuration(weather())
+    assert log.info.call_count == 16
+    log.reset_mock()
+    config.configuration(weather())
+    assert log.info.call_count == 0
+    config.configuration(weather(temp=300.15))
+    assert [c.args[0] % c.args[1:] for c in log.info.call_args_list] == ["Temperature: 27.0°C"]
@@ -0,0 +1,81 @@
+import math
+import time
+import pytest
+from api_watchdog.utils.downsample import Compactor, parse_tiers
+from api_watchdog.utils.timeseries import TimeSeriesStore
+
+MINUTE = 60_000
+HOUR = 60 * MINUTE
+
+def test_parse_tiers():
+    raw, minute, hour = parse_tiers("raw:7d,1m:90d,1h")
+    assert (raw.resolution, raw.retention) == (0, 7 * 24 * HOUR)
+    assert (minute.resolution, hour.resolution, hour.retention) == (MINUTE, HOUR, None)
+    with pytest.raises(ValueError):
+        parse_tiers("1m,raw")
+    with pytest.raises(ValueError):
+        parse_tiers("raw,1h,90m")
+
+def fill(store, minutes):
+    # Two observations per minute: close = minute index, then +0.5
+    for m in range(minutes):
+        store.append("ibm", m * MINUTE, {"close": float(m), "volume": 10.0})
+        store.append("ibm", m * MINUTE + 30_000, {"close": m + 0.5, "volume": 30.0})
+
+def test_compaction_rolls_up_incrementally(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    fill(store, 3)
+    now = [3 * MINUTE + 1]
+    compactor = Compactor(store, parse_tiers("raw,1m,1h"), clock=lambda: now[0] / 1000)
+    compactor.compact()
+
+    rows = store.series("ibm", "1m").query(columns=["close.first", "close.max", "close.last", "close.mean", "volume.mean", "count"])
+    assert list(rows["ts"]) == [0, MINUTE, 2 * MINUTE]
+    assert list(rows["close.first"]) == [0.0, 1.0, 2.0]
+    assert list(rows["close.last"]) == [0.5, 1.5, 2.5]
+    assert list(rows["volume.mean"]) == [20.0] * 3
+    assert list(rows["count"]) == [2.0] * 3
+    assert len(store.series("ibm", "1h")) == 0  # the first hour is not over
+
+    # A second pass only adds the new bucket
+    store.append("ibm", 3 * MINUTE, {"close": 9.0})
+    now[0] = 4 * MINUTE
+    compactor.compact()
+    assert compactor.stats()["buckets"] == 4
+    assert math.isnan(store.series("ibm", "1m").query(start=3 * MINUTE)["volume.mean"][0])
+
+def test_retention_waits_for_rollup_and_query_picks_tier(tmp_path):
+    store = TimeSeriesStore(tmp_path, segment_rows=4)
+    fill(store, 120)
+    compactor = Compactor(store, parse_tiers("raw:30m,1m:1h,1h"), clock=lambda: 2 * HOUR / 1000)
+    compactor.compact()
+
+    # Raw segments older than 30 minutes are gone, everything is rolled up
+    assert store.series("ibm").first_ts() >= 90 * MINUTE - 2 * MINUTE
+    assert compactor.stats()["dropped_segments"] > 0
+    rows = store.query("ibm", start=0, columns=["close", "close.max"], resolution=3600)
+    assert list(rows["ts"]) == [0, HOUR]
+    assert list(rows["close.max"]) == [59.5, 119.5]
+    assert rows["close"][0] == pytest.approx(29.75)
+
+    # Asking for minute resolution over dropped raw data reads the 1m tier
+    assert store.choose_tier("ibm", start=100 * MINUTE, resolution=60) == "1m"
+    assert store.choose_tier("ibm", start=119 * MINUTE, resolution=1) is None
+
+def test_background_pass_survives_errors(tmp_path, monkeypatch):
+    store = TimeSeriesStore(tmp_path)
+    fill(store, 3)
+    failures = [ValueError("bad tier"), OSError("disk full")]
+    compact = Compactor.compact
+    def flaky(self):
+        if failures:
+            raise failures.pop(0)
+        compact(self)
+    monkeypatch.setattr(Compactor, "compact", flaky)
+    compactor = Compactor(store, parse_tiers("raw,1m"), interval=0.01, clock=lambda: 3 * MINUTE / 1000)
+    compactor.start()
+    deadline = time.monotonic() + 2
+    while not compactor.buckets and time.monotonic() < deadline:
+        time.sleep(0.01)
+    compactor.stop()
+    assert not failures and compactor.buckets == 3
@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest.mock import patch
+from api_watchdog.monitor_api_gui import MonitorManager
+from api_watchdog.utils.api_fetcher import APIFetcher, FetchResult
+from api_watchdog.utils.api_configuration import WeatherConfig
+from api_watchdog.utils.fetch_pool import FetchPool
+
+class FakeRoot:
+    """Records after() callbacks instead of running a Tk main loop."""
+    def __init__(self):
+        self.calls = []
+    def after(self, ms, callback):
+        self.calls.append((ms, callback))
+        return len(self.calls)
+    def after_cancel(self, id):
+        pass
+
+def wait_for(pool, count, timeout=2):
+    deadline = time.monotonic() + timeout
+    while pool.completed < count and time.monotonic() < deadline:
+        pool.drain()
+        time.sleep(0.005)
+
+def test_callbacks_run_on_the_draining_thread():
+    pool = FetchPool(FakeRoot())
+    seen = []
+    pool.submit(lambda: threading.current_thread(), lambda result, error: seen.append((result, threading.current_thread())))
+    pool.submit(lambda: 1 / 0, lambda result, error: seen.append(error))
+    wait_for(pool, 2)
+    (worker, caller), error = sorted(seen, key=lambda x: isinstance(x, Exception))
+    assert worker is not caller and caller is threading.current_thread()
+    assert isinstance(error, ZeroDivisionError)
+    pool.close()
+    assert not pool.submit(lambda: None, lambda *a: None)
+
+def test_blocked_work_does_not_block_the_drain():
+    release = threading.Event()
+    pool = FetchPool(FakeRoot(), max_workers=4)
+    done = []
+    for _ in range(4):
+        pool.submit(lambda: release.wait(5), lambda r, e: done.append(r))
+    started = time.perf_counter()
+    pool.drain()
+    assert time.perf_counter() - started < 0.05 and not done
+    release.set()
+    wait_for(pool, 4)
+    assert done == [True] * 4
+    pool.close()
+
+def test_drain_stops_at_its_budget():
+    clock = iter(range(100)).__next__
+    root = FakeRoot()
+    pool = FetchPool(root, budget=2, clock=clock)
+    for _ in range(5):
+        pool.submit(lambda: None, lambda r, e: None)
+    while pool._results.qsize() < 5:
+        time.sleep(0.001)
+    pool.drain()
+    assert pool.completed == 2 and root.calls[-1][0] == 1
+    pool.close()
+
+def test_monitor_tick_returns_while_the_fetch_hangs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    release = threading.Event()
+    def hang(*args, **kwargs):
+        release.wait(5)
+        return FetchResult({"main": {"temp": 280.0}}, status=200)
+    root = FakeRoot()
+    pool = FetchPool(root)
+    with patch.object(APIFetcher, "fetch", side_effect=hang):
+        started = time.perf_counter()
+        manager = MonitorManager(root, pool, APIFetcher())
+        manager.start(WeatherConfig, "5", str(tmp_path / "w.log"), ["Oslo"])
+        assert time.perf_counter() - started < 0.05
+        assert pool.stats()["pending"] == 1
+        release.set()
+        wait_for(pool, 1)
+    # The next tick is scheduled only once the fetch came back
+    assert [c.__name__ for _, c in root.calls].count("tick") == 1
+    manager.stop_all()
+    pool.close()
+
+def test_a_failing_callback_does_not_stop_the_drain():
+    root = FakeRoot()
+    pool = FetchPool(root)
+    seen = []
+    def fail(result, error):
+        raise RuntimeError("bad callback")
+    pool.submit(lambda: 1, fail)
+    pool.submit(lambda: 2, lambda result, error: seen.append(result))
+    while pool._results.qsize() < 2:
+        time.sleep(0.001)
+    scheduled = len(root.calls)
+    pool.drain()
+    assert seen == [2] and len(root.calls) == scheduled + 1
+    assert root.calls[-1][1] == pool.drain
+    pool.close()
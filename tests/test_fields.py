@@ -0,0 +1,57 @@
+import logging
+from unittest.mock import Mock
+from api_watchdog.utils.api_configuration import WeatherConfig
+from api_watchdog.utils.fields import Extractor, Field, number
+
+def weather(**overrides):
+    data = {
+        "name": "Chennai", "dt": 1700000000, "sys": {"country": "IN", "sunrise": 1, "sunset": 2},
+        "weather": [{"description": "clear"}], "wind": {"speed": 1.0, "deg": 90},
+        "main": {"temp": 290.0, "humidity": 50, "pressure": 1000},
+        "visibility": 10000, "clouds": {"all": 0},
+    }
+    data.update(overrides)
+    return data
+
+def test_fields_are_typed_and_converted():
+    extractor = Extractor([
+        Field("close", ("bar", "close"), type=float),
+        Field("volume", ("bar", "volume"), type=int),
+        Field("first", ("list", 0)),
+    ])
+    assert extractor.extract({"bar": {"close": "10.5", "volume": "7"}, "list": ["a"]}) == {
+        "close": 10.5, "volume": 7, "first": "a",
+    }
+
+def test_missing_or_bad_optional_fields_do_not_abort_the_record():
+    extractor = Extractor([
+        Field("a", ("a",), type=float), Field("b", ("x", "b")), Field("c", ("c", 3)),
+    ])
+    assert extractor.extract({"a": "n/a", "x": None, "c": [1]}) == {"a": None, "b": None, "c": None}
+
+def test_missing_required_field_discards_the_record():
+    extractor = Extractor([Field("a", ("a",), required=True), Field("b", ("b",))])
+    assert extractor.extract({"b": 1}) is None
+    assert extractor.extract({"b": 1}, partial=True) == {"a": None, "b": 1}
+
+def test_text_is_only_rendered_when_emitted():
+    format = Mock(return_value="rendered")
+    extractor = Extractor([Field("a", ("a",), "A", format=format)])
+    logger = logging.getLogger("test_fields_lazy")
+    logger.setLevel(logging.WARNING)
+    extractor.log(logger, {"a": 1})
+    format.assert_not_called()
+    assert Field("p", ("p",), format=number).text(182.5) == "182.5"
+
+def test_weather_logs_missing_fields_as_not_available():
+    log = Mock()
+    config = WeatherConfig(argument="Chennai", logger=log, interval=5, log_file="w.log")
+    data = weather()
+    del data["wind"]
+    config.configuration(data)
+    messages = [c.args[0] % c.args[1:] for c in log.info.call_args_list]
+    assert "Wind speeds: Not available" in messages
+    assert "Temperature: 16.85°C" in messages and "Humidity: 50%" in messages
+    (record,) = config.extract(data)
+    assert record["wind_speed"] is None and record["temp_c"] == 16.85
+    assert config.extract(weather(main={})) == []
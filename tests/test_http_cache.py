@@ -0,0 +1,76 @@
+
+import json
+from unittest.mock import patch, Mock
+from api_watchdog.utils.api_fetcher import APIFetcher
+from api_watchdog.utils.http_cache import ResponseCache, parse_max_age
+
+def make_response(status=200, body=None, headers=None):
+    resp = Mock()
+    resp.status_code = status
+    resp.headers = headers or {}
+    resp.text = json.dumps(body) if body is not None else ""
+    resp.content = resp.text.encode()
+    resp.raise_for_status = Mock()
+    return resp
+
+def test_parse_max_age():
+    assert parse_max_age("public, max-age=60") == 60
+    assert parse_max_age("no-cache, max-age=60") == 0
+    assert parse_max_age("no-store") is None
+    assert parse_max_age(None) == 0
+
+def test_fresh_entry_is_served_without_a_request():
+    fetcher = APIFetcher(cache=ResponseCache(), coalesce_window=0)
+    resp = make_response(body={"t": 1}, headers={"Cache-Control": "max-age=300"})
+    with patch.object(APIFetcher, "get", return_value=resp) as mget:
+        first = fetcher.fetch("https://example.com/a", delay=0)
+        second = fetcher.fetch("https://example.com/a", delay=0)
+    assert mget.call_count == 1
+    assert second.from_cache and second.data == {"t": 1}
+    assert second.version == first.version
+
+def test_stale_entry_is_revalidated_with_validators():
+    fetcher = APIFetcher(cache=ResponseCache(), coalesce_window=0)
+    ok = make_response(body={"t": 1}, headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    not_modified = make_response(status=304)
+    with patch.object(APIFetcher, "get", side_effect=[ok, not_modified]) as mget:
+        first = fetcher.fetch("https://example.com/a", delay=0)
+        second = fetcher.fetch("https://example.com/a", delay=0)
+    headers = mget.call_args.kwargs["headers"]
+    assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert second.status == 304
+    assert second.data == {"t": 1}
+    assert second.version == first.version
+    assert fetcher.cache.stats() == {"hits": 0, "revalidated": 1, "misses": 1}
+
+def test_disk_backend_survives_restart(tmp_path):
+    resp = make_response(body={"t": 2}, headers={"Cache-Control": "max-age=300"})
+    with patch.object(APIFetcher, "get", return_value=resp):
+        APIFetcher(cache=ResponseCache(cache_dir=tmp_path)).fetch("https://example.com/a", delay=0)
+    restarted = APIFetcher(cache=ResponseCache(cache_dir=tmp_path))
+    with patch.object(APIFetcher, "get") as mget:
+        result = restarted.fetch("https://example.com/a", delay=0)
+    assert mget.call_count == 0
+    assert result.data == {"t": 2}
+
+def test_disk_entries_do_not_store_api_keys(tmp_path):
+    url = "https://example.com/a?q=Oslo&appid=SECRET"
+    resp = make_response(body={"t": 3}, headers={"Cache-Control": "max-age=300"})
+    ResponseCache(cache_dir=tmp_path).store(url, resp, {"t": 3})
+    assert "SECRET" not in "".join(p.read_text() for p in tmp_path.iterdir())
+    entry = ResponseCache(cache_dir=tmp_path).get(url)
+    assert entry.url == url and entry.body == resp.text
+
+def test_lru_evicts_oldest_entry():
+    cache = ResponseCache(max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.store(f"https://example.com/{name}", make_response(body={}), {})
+    assert cache.get("https://example.com/a") is None
+    assert cache.get("https://example.com/c") is not None
+
+def test_not_modified_skips_configuration_logging():
+    from api_watchdog.utils.api_configuration import WeatherConfig
+    log = Mock()
+    config = WeatherConfig(argument="X", logger=log, interval=5, log_file="w.log")
+    config.configuration({}, not_modified=True)
+    assert log.info.call_count == 0
@@ -0,0 +1,69 @@
+import json
+import pytest
+from unittest.mock import Mock
+from api_watchdog.utils.api_configuration.stock_api import StockConfig
+from api_watchdog.utils.json_decode import FIRST, decode
+
+def intraday(bars):
+    series = {
+        f"2024-01-02 {15 - i // 60:02d}:{59 - i % 60:02d}:00": {
+            "1. open": "100.0", "2. high": "101.0", "3. low": "99.0",
+            "4. close": str(100 + i), "5. volume": "1000",
+        }
+        for i in range(bars)
+    }
+    return {
+        "Meta Data": {"2. Symbol": "IBM", "3. Last Refreshed": "2024-01-02 15:59:00"},
+        "Time Series (5min)": series,
+    }
+
+PROJECTION = {"Meta Data": None, "Time Series (5min)": FIRST}
+
+def test_small_bodies_are_decoded_whole():
+    body = json.dumps({"a": 1, "b": [1, 2]}).encode()
+    assert decode(body, PROJECTION) == {"a": 1, "b": [1, 2]}
+    assert decode(body) == {"a": 1, "b": [1, 2]}
+
+def test_large_bodies_are_decoded_up_to_the_projection():
+    data = intraday(500)
+    body = json.dumps(data, indent=1).encode()
+    result = decode(body, PROJECTION, threshold=0)
+    assert result["Meta Data"] == data["Meta Data"]
+    assert list(result["Time Series (5min)"].items()) == [
+        next(iter(data["Time Series (5min)"].items()))
+    ]
+
+def test_projected_keys_missing_from_the_body_are_left_out():
+    body = b'{"Meta Data": {"s": 1}, "other": 2}'
+    assert decode(body, PROJECTION, threshold=0) == {"Meta Data": {"s": 1}}
+
+def test_parsing_stops_after_the_last_projected_key():
+    # The tail is never read, so it need not even be valid JSON
+    body = b'{"skip": {"x": [1, 2]}, "Meta Data": {"s": 1}, "Time Series (5min)": {"t1": 1, "t2": GARBAGE'
+    assert decode(body, PROJECTION, threshold=0) == {
+        "Meta Data": {"s": 1},
+        "Time Series (5min)": {"t1": 1},
+    }
+
+def test_first_member_of_a_value_that_is_not_last():
+    body = b'{"Time Series (5min)": {"t1": 1, "t2": 2}, "Meta Data": {"s": 1}, "z": 0}'
+    assert decode(body, PROJECTION, threshold=0) == {
+        "Time Series (5min)": {"t1": 1},
+        "Meta Data": {"s": 1},
+    }
+
+def test_nested_projection():
+    body = b'{"a": {"keep": [1], "drop": 2}, "b": 3}'
+    assert decode(body, {"a": {"keep": None}}, threshold=0) == {"a": {"keep": [1]}}
+
+def test_invalid_json_raises_value_error():
+    with pytest.raises(ValueError):
+        decode(b'{"Meta Data" 1}', PROJECTION, threshold=0)
+    with pytest.raises(ValueError):
+        decode(b"not json")
+
+def test_stock_config_reads_the_projected_response():
+    data = intraday(300)
+    api = StockConfig("IBM", Mock(), 5, "ibm.log")
+    projected = decode(json.dumps(data).encode(), api.projection, threshold=0)
+    assert api.extract(projected) == api.extract(data)
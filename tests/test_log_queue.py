@@ -0,0 +1,76 @@
+import logging
+import threading
+import pytest
+from api_watchdog.utils.log_queue import (
+    LogPipeline,
+    PipelineHandler,
+    get_pipeline,
+    start_queue_logging,
+    stop_queue_logging,
+)
+from api_watchdog.utils.logger import close_logger, get_logger
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = start_queue_logging(flush_interval=0.05)
+    yield pipeline
+    stop_queue_logging()
+
+
+def test_records_are_written_by_the_background_thread(pipeline, tmp_path):
+    log_file = tmp_path / "queued.log"
+    log = get_logger("test_log_queue_written", log_file=str(log_file))
+
+    assert [type(h) for h in log.handlers] == [PipelineHandler]
+    threads = []
+    handler = pipeline.handlers(log.name)[0]
+    handle = handler.handle
+    handler.handle = lambda record: threads.append(threading.current_thread()) or handle(record)
+
+    for i in range(20):
+        log.info(f"line {i}")
+    stop_queue_logging()
+
+    assert log_file.read_text().count("INFO: line") == 20
+    assert threading.current_thread() not in threads
+    # Once stopped, the logger writes synchronously again
+    log.info("after stop")
+    assert "after stop" in log_file.read_text()
+
+
+def test_get_logger_does_not_duplicate_queued_handlers(pipeline, tmp_path):
+    log_file = str(tmp_path / "dup.log")
+    get_logger("test_log_queue_dup", log_file=log_file)
+    log = get_logger("test_log_queue_dup", log_file=log_file)
+    assert len(pipeline.handlers(log.name)) == 1
+    assert len(log.handlers) == 1
+
+
+def test_close_logger_writes_queued_records_then_closes_files(pipeline, tmp_path):
+    log_file = tmp_path / "closed.log"
+    log = get_logger("test_log_queue_closed", log_file=str(log_file))
+    handler = pipeline.handlers(log.name)[0]
+    for i in range(5):
+        log.info(f"line {i}")
+    close_logger(log.name)
+    assert not log.handlers
+    stop_queue_logging()
+    assert log_file.read_text().count("INFO: line") == 5
+    assert handler.stream is None
+
+
+def test_drop_policy_counts_discarded_records():
+    # Not started, so nothing drains the queue
+    pipeline = LogPipeline(max_queue=2, overflow="drop")
+    record = logging.makeLogRecord({"msg": "x"})
+    for _ in range(5):
+        pipeline.put(record)
+    assert pipeline.stats()["dropped"] == 3
+    assert pipeline.stats()["queued"] == 2
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        LogPipeline(overflow="spill")
+    assert get_pipeline() is None
@@ -0,0 +1,86 @@
+import gzip
+import logging
+import pytest
+from api_watchdog.utils.log_rotation import (
+    RotatingLogHandler,
+    RotationPolicy,
+    parse_duration,
+    parse_size,
+    segment_worker,
+    set_rotation,
+)
+from api_watchdog.utils.logger import get_logger
+
+def record(message):
+    return logging.makeLogRecord({"msg": message, "levelno": logging.INFO})
+
+def test_parse_size_and_duration():
+    assert parse_size("10M") == 10 * 1024**2
+    assert parse_size("512") == 512
+    assert parse_duration("30m") == 1800
+    assert parse_duration("1d") == 86400
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+def test_size_rotation_compresses_segments_in_background(tmp_path):
+    path = tmp_path / "w.log"
+    handler = RotatingLogHandler(str(path), RotationPolicy(max_bytes=100, backup_count=10))
+    for i in range(10):
+        handler.emit(record("x" * 40 + str(i)))
+    segment_worker.wait()
+    handler.close()
+
+    segments = handler.segments()
+    assert segments and all(s.name.endswith(".gz") for s in segments)
+    assert path.stat().st_size <= 100
+    lines = b"".join(gzip.open(s).read() for s in segments) + path.read_bytes()
+    assert lines.count(b"\n") == 10
+
+def test_time_rotation(tmp_path, monkeypatch):
+    path = tmp_path / "w.log"
+    handler = RotatingLogHandler(str(path), RotationPolicy(interval=60, compress=False))
+    handler.emit(record("first"))
+    monkeypatch.setattr(handler, "rollover_at", 0)
+    handler.emit(record("second"))
+    segment_worker.wait()
+    handler.close()
+    (segment,) = handler.segments()
+    assert segment.read_text() == "first\n"
+    assert path.read_text() == "second\n"
+
+def test_retention_by_count_and_total_bytes(tmp_path):
+    path = tmp_path / "w.log"
+    for i in range(6):
+        (tmp_path / f"w.log.20240101-00000{i}").write_bytes(b"x" * 100)
+    handler = RotatingLogHandler(
+        str(path), RotationPolicy(backup_count=4, max_total_bytes=250, compress=False)
+    )
+    segment_worker.wait()
+    handler.close()
+    assert [s.name for s in handler.segments()] == [
+        "w.log.20240101-000004",
+        "w.log.20240101-000005",
+    ]
+
+def test_get_logger_uses_rotation_policy(tmp_path):
+    set_rotation(RotationPolicy(max_bytes=1000))
+    try:
+        log = get_logger("test_log_rotation_policy", log_file=str(tmp_path / "p.log"))
+    finally:
+        set_rotation(None)
+    assert isinstance(log.handlers[0], RotatingLogHandler)
+
+def test_failed_compression_is_logged_and_counted(tmp_path, monkeypatch, caplog):
+    path = tmp_path / "w.log"
+    handler = RotatingLogHandler(str(path), RotationPolicy(max_bytes=100, backup_count=10))
+    def disk_full(segment):
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr("api_watchdog.utils.log_rotation.compress_segment", disk_full)
+    failures = segment_worker.failures
+    with caplog.at_level(logging.ERROR, logger="api_watchdog.utils.log_rotation"):
+        for i in range(4):
+            handler.emit(record("x" * 40 + str(i)))
+        segment_worker.wait()
+    handler.close()
+    assert segment_worker.failures > failures
+    assert "No space left on device" in caplog.text and "w.log" in caplog.text
@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import threading
+import time
+from unittest.mock import Mock, patch
+import pytest
+import requests
+from api_watchdog.monitor_api_gui import MonitorManager
+from api_watchdog.utils.api_fetcher import APIFetcher, FetchResult
+from api_watchdog.utils.api_configuration import StockConfig, WeatherConfig
+from api_watchdog.utils.fetch_pool import FetchPool
+from api_watchdog.utils.resilience import Cancelled
+
+class FakeRoot:
+    """Records after() callbacks instead of running a Tk main loop."""
+    def __init__(self):
+        self.pending = {}
+        self.ids = 0
+    def after(self, ms, callback):
+        self.ids += 1
+        self.pending[self.ids] = callback
+        return self.ids
+    def after_cancel(self, id):
+        self.pending.pop(id, None)
+
+def log_name(path):
+    return f"api_watchdog_{hashlib.md5(path.encode()).hexdigest()[:8]}"
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = FakeRoot()
+    pool = FetchPool(root)
+    manager = MonitorManager(root, pool, APIFetcher(coalesce_window=0))
+    yield manager
+    manager.stop_all()
+    pool.close()
+
+def test_fetch_is_cancelled_mid_backoff():
+    cancel = threading.Event()
+    fetcher = APIFetcher(coalesce_window=0)
+    threading.Timer(0.1, cancel.set).start()
+    started = time.monotonic()
+    with patch.object(APIFetcher, "get", side_effect=requests.exceptions.ConnectionError("down")):
+        with pytest.raises(Cancelled):
+            fetcher.fetch("https://example.com/a", max_retries=5, delay=30, cancel=cancel)
+    assert time.monotonic() - started < 5
+
+def test_duplicate_start_returns_the_running_monitor(manager):
+    with patch.object(APIFetcher, "fetch", return_value=FetchResult(None)):
+        first = manager.start(WeatherConfig, "5", "w.log", ["Oslo"])
+        again = manager.start(WeatherConfig, "30", "other.log", ["Oslo"])
+        other = manager.start(StockConfig, "5", "s.log", ["IBM"])
+    assert again is first and other.id != first.id
+    assert [m.id for m in manager.monitors()] == [first.id, other.id]
+    # The rejected start's logger is released at once
+    assert not logging.getLogger(log_name("other.log")).handlers
+
+def test_stop_cancels_the_fetch_and_releases_resources(manager):
+    entered = threading.Event()
+    def hang(url, projection=None, cancel=None):
+        entered.set()
+        cancel.wait(5)
+        raise Cancelled(url)
+    with patch.object(APIFetcher, "fetch", side_effect=hang):
+        monitor = manager.start(WeatherConfig, "5", "w.log", ["Oslo"])
+        assert entered.wait(2)
+        manager.fetcher.session_for(monitor.api_url)
+        assert logging.getLogger(monitor.log_names[0]).handlers
+
+        assert manager.stop(monitor.id) and not manager.stop(monitor.id)
+        assert monitor.cancel.is_set() and monitor.id not in manager
+        # The worker may still be writing until its fetch is back
+        assert logging.getLogger(monitor.log_names[0]).handlers
+
+        # The cancelled fetch comes back without scheduling another tick,
+        # and only then are the log files and connections released
+        deadline = time.monotonic() + 2
+        while manager.pool.completed < 1 and time.monotonic() < deadline:
+            manager.pool.drain()
+            time.sleep(0.005)
+    assert manager.pool.completed == 1
+    assert all(callback.__name__ != "tick" for callback in manager.root.pending.values())
+    assert not logging.getLogger(monitor.log_names[0]).handlers
+    assert monitor.host not in manager.fetcher._sessions
+
+def test_idle_monitor_is_released_at_once(manager):
+    with patch.object(APIFetcher, "fetch", return_value=FetchResult(None)):
+        monitor = manager.start(WeatherConfig, "5", "w.log", ["Oslo"])
+        deadline = time.monotonic() + 2
+        while monitor.fetching and time.monotonic() < deadline:
+            manager.pool.drain()
+            time.sleep(0.005)
+    manager.stop(monitor.id)
+    assert not logging.getLogger(monitor.log_names[0]).handlers
+
+def test_observations_feed_the_chart(manager):
+    data = {"name": "Oslo", "main": {"temp": 280.15, "pressure": 1012}}
+    with patch.object(APIFetcher, "fetch", return_value=FetchResult(data, status=200)):
+        monitor = manager.start(WeatherConfig, "5", "w.log", ["Oslo"])
+        monitor.chart = Mock()
+        deadline = time.monotonic() + 2
+        while manager.pool.completed < 1 and time.monotonic() < deadline:
+            manager.pool.drain()
+            time.sleep(0.005)
+    (ts, values), _ = monitor.chart.add.call_args
+    assert values == {"temp": 7.0, "pressure": 1012.0} and ts > 0
+
+def test_interval_is_parsed_and_must_be_positive(manager):
+    for interval in ("0", "-5", -5, "abc"):
+        with pytest.raises(ValueError):
+            manager.start(WeatherConfig, interval, "w.log", ["Oslo"])
+    assert len(manager) == 0
+    with patch.object(APIFetcher, "fetch", return_value=FetchResult(None)):
+        monitor = manager.start(WeatherConfig, 30, "w.log", ["Oslo"])
+    assert monitor.cadence.interval == 30
@@ -0,0 +1,49 @@
+
+import pytest
+from unittest.mock import Mock
+from api_watchdog.utils.api_configuration import MultiStockConfig
+from api_watchdog.utils.targets import build_targets
+
+def quote(symbol, close):
+    return {"symbol": symbol, "timestamp": "2024-01-02 16:00:00", "open": "1", "high": "2",
+            "low": "0.5", "close": close, "volume": "100"}
+
+def test_symbols_are_batched_into_one_url():
+    config = MultiStockConfig(argument="ibm, aapl,IBM,msft", logger=Mock(), interval=60, log_file="s.log")
+    assert config.symbols == ["IBM", "AAPL", "MSFT"]
+    assert "function=REALTIME_BULK_QUOTES" in config.api_url
+    assert "symbol=IBM,AAPL,MSFT" in config.api_url
+
+def test_long_lists_are_split_into_batches(tmp_path):
+    symbols = ",".join(f"S{i}" for i in range(250))
+    targets = build_targets(MultiStockConfig, symbols, 60, str(tmp_path / "s.log"), name="all")
+    assert [len(t.api.symbols) for t in targets] == [100, 100, 50]
+    assert [t.name for t in targets] == ["all[1]", "all[2]", "all[3]"]
+    with pytest.raises(ValueError):
+        MultiStockConfig(argument=symbols, logger=Mock(), interval=60, log_file="s.log")
+
+def test_response_fans_out_per_symbol_and_reports_savings():
+    log = Mock()
+    config = MultiStockConfig(argument="IBM,AAPL,MSFT", logger=log, interval=60, log_file="s.log")
+    config.configuration({"data": [quote("IBM", "10"), quote("AAPL", "20")]})
+    messages = [c.args[0] % c.args[1:] for c in log.info.call_args_list]
+    assert "Stock: IBM" in messages and "Close: 20" in messages
+    assert messages[-1].startswith("Requests per symbol: 0.500")
+    log.error.assert_called_once_with("No quote returned for: MSFT")
+
+def test_changes_mode_skips_unchanged_symbols():
+    log = Mock()
+    config = MultiStockConfig(argument="IBM,AAPL", logger=log, interval=60, log_file="s.log", log_mode="changes")
+    config.configuration({"data": [quote("IBM", "10"), quote("AAPL", "20")]})
+    log.reset_mock()
+    config.configuration({"data": [quote("IBM", "11"), quote("AAPL", "20")]})
+    messages = [c.args[0] % c.args[1:] for c in log.info.call_args_list]
+    assert "Stock: IBM" in messages and "Stock: AAPL" not in messages
+
+def test_savings_are_counted_when_records_go_to_a_sink(tmp_path):
+    (target,) = build_targets(MultiStockConfig, "IBM,AAPL", 60, str(tmp_path / "s.log"), sink="jsonl")
+    result = Mock(version=None, data={"data": [quote("IBM", "10"), quote("AAPL", "20")]}, latency=0.1, status=200, from_cache=False)
+    target.handle(result, 0)
+    target.handle(Mock(version=None, data={"Note": "limit"}), 60)
+    assert (target.api.requests, target.api.quotes) == (2, 2)
+    assert len((tmp_path / "s.jsonl").read_text().splitlines()) == 2
@@ -0,0 +1,72 @@
+
+import pytest
+from unittest.mock import patch
+import requests
+from api_watchdog.utils.api_fetcher import APIFetcher
+from api_watchdog.utils.rate_limit import RateLimiter, RateLimited, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_bucket_spreads_calls_across_window():
+    clock = FakeClock()
+    bucket = TokenBucket(5, 60, clock=clock)
+    assert bucket.wait_time() == 0
+    bucket.take()
+    assert bucket.wait_time() == pytest.approx(12.0)
+    clock.now = 12
+    assert bucket.wait_time() == 0
+
+def test_limiter_uses_provider_and_key_budgets():
+    clock = FakeClock()
+    limiter = RateLimiter({"api.example.com": (60, 2)}, burst=10, clock=clock)
+    assert limiter.reserve("https://api.example.com/q?apikey=AAAA") == 0
+    assert limiter.reserve("https://api.example.com/q?apikey=BBBB") == 0
+    # The provider-wide day budget is shared by both keys
+    assert limiter.reserve("https://api.example.com/q?apikey=AAAA") > 0
+    assert limiter.reserve("https://unlimited.example.com/") == 0
+
+def test_status_reports_remaining_and_exhaustion():
+    clock = FakeClock()
+    limiter = RateLimiter({"api.example.com": (None, 100)}, burst=100, clock=clock)
+    for _ in range(10):
+        clock.now += 6
+        limiter.reserve("https://api.example.com/q")
+    status = limiter.status()["api.example.com day"]
+    assert status["remaining"] == 90
+    # 10 calls in 54s: 90 more calls take roughly 486s at that rate
+    assert status["exhausts_in"] == pytest.approx(486.0)
+
+def test_fetcher_raises_before_sending_when_quota_is_spent():
+    clock = FakeClock()
+    fetcher = APIFetcher(
+        limiter=RateLimiter({"api.example.com": (1, None)}, clock=clock), coalesce_window=0
+    )
+    with patch.object(APIFetcher, "get") as mget:
+        mget.return_value.content = b"{}"
+        fetcher.fetch("https://api.example.com/q", delay=0)
+        with pytest.raises(RateLimited) as err:
+            fetcher.fetch("https://api.example.com/q", delay=0)
+    assert mget.call_count == 1
+    assert err.value.retry_after == pytest.approx(60.0)
+
+def test_quota_refusal_gives_back_the_breaker_probe():
+    clock = FakeClock()
+    fetcher = APIFetcher(
+        limiter=RateLimiter({"api.example.com": (1, None)}, clock=clock),
+        failure_threshold=1, reset_timeout=0, coalesce_window=0,
+    )
+    with patch.object(APIFetcher, "get", side_effect=requests.exceptions.ConnectionError("down")):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            fetcher.fetch("https://api.example.com/q", max_retries=1, delay=0)
+    # The breaker lets a probe through, but the quota is spent
+    with pytest.raises(RateLimited):
+        fetcher.fetch("https://api.example.com/q", delay=0)
+    clock.now += 60
+    with patch.object(APIFetcher, "get") as mget:
+        mget.return_value.content = b"{}"
+        assert fetcher.fetch("https://api.example.com/q", delay=0).data == {}
+    assert fetcher.breaker_for("https://api.example.com/").state == "closed"
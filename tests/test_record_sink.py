@@ -0,0 +1,54 @@
+from unittest.mock import Mock
+from api_watchdog.utils.api_fetcher import FetchResult
+from api_watchdog.utils.api_configuration import WeatherConfig, StockConfig
+from api_watchdog.utils.record_sink import JSONLSink, dumps, read_records
+from api_watchdog.utils.targets import Target, build_target
+
+def weather(temp=290.0):
+    return {
+        "name": "Chennai", "dt": 1700000000, "sys": {"country": "IN", "sunrise": 1, "sunset": 2},
+        "weather": [{"description": "clear"}], "wind": {"speed": 1.0, "deg": 90},
+        "main": {"temp": temp, "humidity": 50, "pressure": 1000},
+        "visibility": 10000, "clouds": {"all": 0},
+    }
+
+def test_dumps_writes_one_compact_line():
+    line = dumps({"a": 1, "b": "é"})
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert b" " not in line
+
+def test_sink_round_trips_records(tmp_path):
+    path = tmp_path / "out.jsonl"
+    sink = JSONLSink(str(path))
+    sink.write({"n": 1})
+    sink.write({"n": 2})
+    sink.close()
+    with open(path, "ab") as f:
+        f.write(b'{"n": 3')  # a line cut off mid-write
+    assert [r["n"] for r in read_records(str(path))] == [1, 2]
+
+def test_target_writes_one_record_per_observation(tmp_path):
+    path = tmp_path / "w.jsonl"
+    api = WeatherConfig(argument="Chennai", logger=Mock(), interval=5, log_file="w.log")
+    target = Target("chennai", api, JSONLSink(str(path)))
+    target.handle(FetchResult(weather(), status=200, latency=0.25, version="v1"), 1700000000.5)
+    target.handle(FetchResult(weather(), status=200, latency=0.1, version="v1"), 1700000005.5)
+    api.log.info.assert_not_called()
+
+    (record,) = read_records(str(path))
+    assert record["target"] == "chennai"
+    assert record["ts"] == 1700000000.5
+    assert record["latency_ms"] == 250.0
+    assert record["status"] == 200
+    assert record["temp_c"] == 16.85
+    assert record["location"] == "Chennai"
+
+def test_errors_are_still_logged_as_text(tmp_path):
+    target = build_target(
+        StockConfig, "IBM", 5, str(tmp_path / "s.log"), sink="jsonl"
+    )
+    target.api.log = Mock()
+    target.handle(FetchResult({"Error Message": "bad key"}, status=200), 0.0)
+    target.api.log.error.assert_called_once()
+    assert target.sink.path == tmp_path / "s.jsonl"
+    assert target.sink.records == 0
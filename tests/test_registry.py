@@ -0,0 +1,81 @@
+import sys
+import pytest
+from api_watchdog.core_gui_and_cli.cli import parse_args
+from api_watchdog.utils import registry
+from api_watchdog.utils.registry import APIPlugin, get_plugin, plugins, register
+from api_watchdog.utils.targets import load_targets
+
+PLUGIN_MODULE = '''
+class EchoConfig:
+    var = "word"
+
+    def __init__(self, argument, logger, interval, log_file, log_mode="all"):
+        self.api_url = f"https://echo.example.com/{argument}"
+        self.interval = interval
+        self.log_file = log_file
+
+    def get_config(self):
+        return self.api_url, self.interval, self.log_file
+'''
+
+@pytest.fixture
+def echo_plugin(tmp_path, monkeypatch):
+    (tmp_path / "echo_plugin_mod.py").write_text(PLUGIN_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(registry, "_plugins", dict(registry._plugins))
+    plugin = APIPlugin("echo", "echo_plugin_mod:EchoConfig", "word", log_file=str(tmp_path / "echo.log"))
+    yield plugin
+    sys.modules.pop("echo_plugin_mod", None)
+
+def test_builtins_are_registered_without_importing_them():
+    assert [p.name for p in plugins(installed=False)][:3] == ["weather", "stock", "stocks"]
+    plugin = get_plugin("weather")
+    assert plugin.var == "location" and plugin.label == "Weather"
+    assert plugin.load().__name__ == "WeatherConfig"
+
+def test_plugin_is_imported_only_when_loaded(echo_plugin):
+    register(echo_plugin)
+    assert get_plugin("echo") is echo_plugin
+    assert "echo_plugin_mod" not in sys.modules
+    assert echo_plugin.load().__name__ == "EchoConfig"
+    assert "echo_plugin_mod" in sys.modules
+
+def test_entry_points_are_discovered_once(echo_plugin, monkeypatch, caplog):
+    class EntryPoint:
+        name = "echo"
+        loads = 0
+
+        def load(self):
+            EntryPoint.loads += 1
+            return echo_plugin
+
+    class Broken:
+        name = "broken"
+
+        def load(self):
+            raise ImportError("missing dependency")
+
+    monkeypatch.setattr(registry, "_discovered", False)
+    monkeypatch.setattr(registry, "_entry_points", lambda: [EntryPoint(), Broken()])
+    # Built-in names never trigger a search of installed packages
+    get_plugin("stock")
+    assert EntryPoint.loads == 0
+    assert get_plugin("echo") is echo_plugin
+    plugins()
+    assert EntryPoint.loads == 1
+    with pytest.raises(KeyError):
+        get_plugin("broken")
+    assert "Skipping plugin 'broken': missing dependency" in caplog.text
+
+def test_plugins_get_a_cli_subcommand_and_targets_entries(echo_plugin, tmp_path):
+    register(echo_plugin)
+    args = parse_args(["echo", "--word", "hi", "-i", "9"])
+    assert args.api.__name__ == "EchoConfig"
+    assert args.word == "hi" and args.interval == 9
+    assert args.log_file == echo_plugin.log_file
+
+    path = tmp_path / "targets.toml"
+    path.write_text('[[targets]]\napi = "echo"\nword = "hello"\n')
+    (target,) = load_targets(str(path))
+    assert target.api_url == "https://echo.example.com/hello"
+    assert target.log_file == echo_plugin.log_file
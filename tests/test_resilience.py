@@ -0,0 +1,43 @@
+
+import random
+import requests
+from api_watchdog.utils.resilience import CircuitBreaker, RetryPolicy
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_decorrelated_jitter_stays_within_bounds():
+    policy = RetryPolicy(base=1, cap=20, rng=random.Random(7))
+    wait = 0.0
+    for _ in range(20):
+        previous, wait = wait, policy.next_wait(wait)
+        assert 1 <= wait <= min(20, max(previous * 3, 1))
+    assert policy.next_wait(0, retry_after="30") == 20
+    assert policy.next_wait(0, retry_after="Wed, 21 Oct 2015 07:28:00 GMT") == 1
+
+def test_retry_policy_classifies_errors():
+    policy = RetryPolicy()
+    assert policy.is_retryable(requests.exceptions.HTTPError("x"), 503)
+    assert policy.is_retryable(requests.exceptions.HTTPError("x"), 429)
+    assert not policy.is_retryable(requests.exceptions.HTTPError("x"), 401)
+    assert policy.is_retryable(requests.exceptions.Timeout("t"))
+    assert not policy.is_retryable(requests.exceptions.InvalidURL("u"))
+
+def test_breaker_half_opens_with_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.retry_after() == 10
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
@@ -0,0 +1,101 @@
+
+import pytest
+from api_watchdog.utils.scheduler import Cadence, Scheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+def make_scheduler():
+    clock = FakeClock()
+    return Scheduler(clock=clock, sleep=clock.sleep), clock
+
+def test_runs_jobs_in_due_order():
+    sched, clock = make_scheduler()
+    calls = []
+    sched.add("slow", lambda: calls.append(("slow", clock.now)), interval=10)
+    sched.add("fast", lambda: calls.append(("fast", clock.now)), interval=3, delay=1)
+    for _ in range(5):
+        clock.sleep(sched.run_pending())
+    assert calls[:4] == [("slow", 0.0), ("fast", 1.0), ("fast", 4.0), ("fast", 7.0)]
+
+def test_run_pending_returns_wait_until_next_job():
+    sched, clock = make_scheduler()
+    sched.add("a", lambda: None, interval=5, delay=2)
+    assert sched.run_pending() == 2
+    clock.now = 2
+    assert sched.run_pending() == 5
+
+def test_cancelled_job_is_dropped():
+    sched, clock = make_scheduler()
+    calls = []
+    job = sched.add("a", lambda: calls.append(1), interval=1)
+    sched.add("b", lambda: None, interval=1)
+    sched.cancel(job)
+    sched.run_pending()
+    assert calls == []
+    assert len(sched) == 1
+
+def test_many_jobs_share_one_heap_and_report_stats():
+    sched, clock = make_scheduler()
+    for i in range(500):
+        sched.add(f"t{i}", lambda: None, interval=60, delay=i % 60)
+    clock.now = 59
+    sched.run_pending()
+    stats = sched.stats()
+    assert stats["jobs"] == 500
+    assert stats["runs"] == 500
+
+def test_schedule_does_not_drift_with_run_time():
+    sched, clock = make_scheduler()
+    fired = []
+    def slow_job():
+        fired.append(clock.now)
+        clock.now += 0.4  # fetch and processing time
+    sched.add("a", slow_job, interval=2)
+    for _ in range(4):
+        clock.sleep(sched.run_pending())
+    assert fired == [0.0, 2.0, 4.0, 6.0]
+
+def test_overrun_skips_missed_ticks_instead_of_queueing():
+    sched, clock = make_scheduler()
+    fired = []
+    def job():
+        fired.append(clock.now)
+        if len(fired) == 1:
+            clock.now += 7  # overruns three ticks
+    job_ref = sched.add("a", job, interval=2)
+    clock.sleep(sched.run_pending())
+    clock.sleep(sched.run_pending())
+    assert fired == [0.0, 8.0]
+    assert job_ref.cadence.skipped == 3
+
+def test_jitter_offsets_first_run_and_lag_is_reported():
+    sched, clock = make_scheduler()
+    job = sched.add("a", lambda: None, interval=10, jitter=5)
+    assert 0 <= job.cadence.offset <= 5
+    clock.now = job.cadence.next_due + 0.25
+    sched.run_pending()
+    stats = sched.stats()
+    assert abs(stats["lag_ms_max"] - 250.0) < 1e-6
+    assert stats["skipped_ticks"] == 0
+
+def test_job_can_defer_its_next_run():
+    sched, clock = make_scheduler()
+    fired = []
+    def job():
+        fired.append(clock.now)
+        return 9 if len(fired) == 1 else None
+    job_ref = sched.add("a", job, interval=2)
+    clock.sleep(sched.run_pending())
+    clock.sleep(sched.run_pending())
+    assert fired == [0.0, 10.0]
+    assert job_ref.cadence.deferred == 4
+
+def test_cadence_rejects_non_positive_interval():
+    with pytest.raises(ValueError):
+        Cadence(0, 0.0)
@@ -0,0 +1,151 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from api_watchdog.utils.api_fetcher import APIFetcher
+from api_watchdog.utils.resilience import Cancelled
+from api_watchdog.utils.singleflight import SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow(cancel):
+        calls.append(1)
+        release.wait(5)
+        return {"ok": True}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("k", slow)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while flights.leaders + flights.shared < 5:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"ok": True}] * 5
+    assert flights.stats() == {"leaders": 1, "shared": 4}
+
+
+def test_result_lingers_then_expires():
+    clock = FakeClock()
+    flights = SingleFlight(linger=0.5, clock=clock)
+    assert flights.do("k", lambda cancel: 1) == 1
+    clock.now = 0.4
+    assert flights.do("k", lambda cancel: 2) == 1
+    clock.now = 1.0
+    assert flights.do("k", lambda cancel: 3) == 3
+
+
+def test_failures_are_not_reused():
+    flights = SingleFlight(linger=10)
+
+    def fail(cancel):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flights.do("k", fail)
+    assert flights.do("k", lambda cancel: "ok") == "ok"
+
+
+def test_callers_cancel_only_their_own_wait():
+    flights = SingleFlight()
+    release = threading.Event()
+    aborted = []
+
+    def slow(cancel):
+        release.wait(5)
+        aborted.append(cancel.is_set())
+        return "data"
+
+    leader_cancel, follower_cancel, other_cancel = (threading.Event() for _ in range(3))
+    outcomes = {}
+
+    def call(name, cancel):
+        try:
+            outcomes[name] = flights.do("k", slow, cancel=cancel)
+        except Cancelled as e:
+            outcomes[name] = e
+
+    threads = [threading.Thread(target=call, args=("leader", leader_cancel))]
+    threads[0].start()
+    while not flights.leaders:
+        time.sleep(0.001)
+    for name, cancel in (("follower", follower_cancel), ("other", other_cancel)):
+        threads.append(threading.Thread(target=call, args=(name, cancel)))
+        threads[-1].start()
+    while flights.shared < 2:
+        time.sleep(0.001)
+
+    # A stopped follower returns at once, while the call goes on
+    started = time.monotonic()
+    follower_cancel.set()
+    threads[1].join(2)
+    assert isinstance(outcomes["follower"], Cancelled)
+    assert time.monotonic() - started < 1 and "leader" not in outcomes
+
+    # Stopping the leader does not fail the caller still waiting
+    leader_cancel.set()
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    assert outcomes["other"] == "data" and isinstance(outcomes["leader"], Cancelled)
+    assert aborted == [False]
+
+
+def test_call_is_cancelled_once_every_caller_cancelled():
+    flights = SingleFlight()
+    cancels = [threading.Event(), threading.Event()]
+    aborted = []
+    errors = []
+
+    def wait_for_abort(cancel):
+        aborted.append(cancel.wait(5))
+
+    def call(cancel):
+        try:
+            flights.do("k", wait_for_abort, cancel=cancel)
+        except Cancelled as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=(cancel,)) for cancel in cancels]
+    threads[0].start()
+    while not flights.leaders:
+        time.sleep(0.001)
+    threads[1].start()
+    while not flights.shared:
+        time.sleep(0.001)
+
+    cancels[1].set()
+    threads[1].join(2)
+    assert len(errors) == 1 and not aborted  # the leader still wants it
+    cancels[0].set()
+    threads[0].join(2)
+    assert aborted == [True] and len(errors) == 2
+
+
+def test_fetcher_coalesces_identical_urls():
+    fetcher = APIFetcher()
+    with patch.object(APIFetcher, "get") as mget:
+        mget.return_value.content = b'{"temp": 1}'
+        first = fetcher.fetch("https://api.example.com/w?q=Paris", delay=0)
+        second = fetcher.fetch("https://api.example.com/w?q=Paris", delay=0)
+        fetcher.fetch("https://api.example.com/w?q=Rome", delay=0)
+    assert mget.call_count == 2
+    assert second is first
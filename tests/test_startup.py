@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative import time allowed for the CLI entry point, in milliseconds.
+# It is about 100 ms under -X importtime on a laptop; the budget leaves room
+# for slow CI machines but fails if requests or numpy creep back in
+BUDGET_MS = float(os.environ.get("API_WATCHDOG_STARTUP_BUDGET_MS", 400))
+
+# Modules that one-shot commands must not import
+HEAVY = ("requests", "urllib3", "tkinter", "numpy", "asyncio", "dotenv")
+
+def import_times(code: str, *argv) -> tuple:
+    """
+    Run code under -X importtime.
+
+    Returns:
+        tuple: ({module: cumulative us}, the modules loaded at exit).
+        importlib.import_module bypasses -X importtime, so the second is
+        what tells which modules were imported.
+    """
+    dump = "import atexit, sys; atexit.register(lambda: print('modules:', *sys.modules, file=sys.stderr)); "
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", dump + code, *argv],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    times, modules = {}, set()
+    for line in result.stderr.splitlines():
+        if line.startswith("modules:"):
+            modules.update(line.split()[1:])
+        elif line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times, modules
+
+RUN_CLI = "import sys; sys.argv[0] = 'api-watchdog'; from api_watchdog.cli_api import run_cli; run_cli()"
+
+def check_startup(times, modules):
+    assert "api_watchdog.cli_api" in modules
+    heavy = [name for name in modules if name.split(".")[0] in HEAVY]
+    assert not heavy, f"imported on startup: {heavy}"
+    assert times["api_watchdog.cli_api"] / 1000 < BUDGET_MS
+
+def test_help_imports_no_heavy_modules():
+    check_startup(*import_times(RUN_CLI, "--help"))
+
+def test_one_shot_query_imports_no_heavy_modules(tmp_path):
+    check_startup(*import_times(RUN_CLI, "query", "--store", str(tmp_path)))
+
+def test_selecting_an_api_imports_only_its_config():
+    _, modules = import_times(
+        "import sys; from api_watchdog.core_gui_and_cli.cli import parse_args; "
+        "parse_args(sys.argv[1:])",
+        "weather", "--location", "Chennai",
+    )
+    assert "api_watchdog.utils.api_configuration.weather_api" in modules
+    assert "api_watchdog.utils.api_configuration.stock_api" not in modules
+    assert "api_watchdog.utils.api_configuration.multi_stock_api" not in modules
+    assert "tkinter" not in modules and "requests" not in modules
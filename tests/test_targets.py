@@ -0,0 +1,72 @@
+
+import pytest
+from api_watchdog.utils.targets import load_targets
+from api_watchdog.utils.api_configuration import WeatherConfig, StockConfig
+
+def write(tmp_path, text):
+    path = tmp_path / "targets.toml"
+    path.write_text(text)
+    return str(path)
+
+def test_load_targets_builds_each_entry(tmp_path):
+    path = write(tmp_path, f"""
+[defaults]
+interval = 30
+
+[[targets]]
+api = "weather"
+location = "Chennai"
+log_file = "{(tmp_path / 'w.log').as_posix()}"
+
+[[targets]]
+api = "stock"
+stock = "IBM"
+interval = 5
+name = "ibm"
+log_file = "{(tmp_path / 's.log').as_posix()}"
+""")
+    weather, stock = load_targets(path)
+    assert isinstance(weather.api, WeatherConfig)
+    assert weather.name == "Chennai"
+    assert weather.interval == 30
+    assert isinstance(stock.api, StockConfig)
+    assert stock.name == "ibm"
+    assert stock.interval == 5
+    assert "symbol=IBM" in stock.api_url
+
+def test_load_targets_rejects_unknown_api(tmp_path):
+    path = write(tmp_path, '[[targets]]\napi = "nope"\n')
+    with pytest.raises(ValueError):
+        load_targets(path)
+
+def test_load_targets_requires_argument(tmp_path):
+    path = write(tmp_path, '[[targets]]\napi = "stock"\n')
+    with pytest.raises(ValueError):
+        load_targets(path)
+
+def test_load_targets_rejects_non_positive_interval(tmp_path):
+    path = write(tmp_path, '[[targets]]\napi = "stock"\nstock = "IBM"\ninterval = 0\n')
+    with pytest.raises(ValueError, match="interval must be positive"):
+        load_targets(path)
+
+def test_load_targets_rejects_unknown_log_mode(tmp_path):
+    path = write(tmp_path, '[[targets]]\napi = "stock"\nstock = "IBM"\nlog_mode = "diff"\n')
+    with pytest.raises(ValueError, match="Unknown log mode 'diff'"):
+        load_targets(path)
+
+def test_load_targets_uses_the_default_sink_file(tmp_path):
+    path = write(tmp_path, f"""
+[[targets]]
+api = "stock"
+stock = "IBM"
+log_file = "{(tmp_path / 's.log').as_posix()}"
+
+[[targets]]
+api = "weather"
+location = "Chennai"
+log_file = "{(tmp_path / 'w.log').as_posix()}"
+sink_file = "{(tmp_path / 'w.jsonl').as_posix()}"
+""")
+    stock, weather = load_targets(path, default_sink="jsonl", default_sink_file=str(tmp_path / "all.jsonl"))
+    assert stock.sink.path == tmp_path / "all.jsonl"
+    assert weather.sink.path == tmp_path / "w.jsonl"
@@ -0,0 +1,53 @@
+import math
+from argparse import Namespace
+from unittest.mock import Mock
+from api_watchdog.cli_api import run_query
+from api_watchdog.utils.api_fetcher import FetchResult
+from api_watchdog.utils.api_configuration import StockConfig
+from api_watchdog.utils.timeseries import Series, TimeSeriesStore
+from api_watchdog.utils.targets import Target
+
+def test_range_query_spans_segments(tmp_path):
+    series = Series(tmp_path / "s", columns=("close",), segment_rows=4)
+    for i in range(10):
+        series.append(1000 + i * 10, {"close": float(i)})
+    assert len(series) == 10
+    assert len(list((tmp_path / "s").glob("0*"))) == 3
+
+    rows = series.query(1025, 1071)
+    assert list(rows["ts"]) == [1030, 1040, 1050, 1060, 1070]
+    assert list(rows["close"]) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert list(series.query(end=1005)["ts"]) == [1000]
+    assert len(series.query(2000)["ts"]) == 0
+
+def test_reopen_drops_half_written_row_and_keeps_order(tmp_path):
+    series = Series(tmp_path / "s", columns=("close",))
+    series.append(1000, {"close": 1.0})
+    series.append(2000, {"close": 2.0})
+    series.close()
+    with open(tmp_path / "s" / "000000" / "ts", "ab") as f:
+        f.write(b"\x00" * 8)  # a timestamp whose value never got written
+
+    series = Series(tmp_path / "s", columns=("close",))
+    assert len(series) == 2
+    series.append(1500, {})  # clock stepped back
+    rows = series.query()
+    assert list(rows["ts"]) == [1000, 2000, 2000]
+    assert math.isnan(rows["close"][2])
+
+def test_target_feeds_store_and_query_prints_csv(tmp_path, capsys):
+    store = TimeSeriesStore(tmp_path / "store")
+    api = StockConfig(argument="IBM", logger=Mock(), interval=5, log_file="s.log")
+    target = Target("ibm", api, store=store)
+    data = {
+        "Meta Data": {"2. Symbol": "IBM", "3. Last Refreshed": "2024-01-02 16:00:00"},
+        "Time Series (5min)": {"2024-01-02 16:00:00": {
+            "1. open": "1", "2. high": "2", "3. low": "0.5", "4. close": "1.5", "5. volume": "10"}},
+    }
+    target.handle(FetchResult(data, status=200), 1700000000.0)
+    store.close()
+
+    run_query(Namespace(store=str(tmp_path / "store"), target="ibm", start=None,
+                        end=None, columns=["close", "temp"], resolution=None, rolling=None,
+                        format="csv"))
+    assert capsys.readouterr().out.splitlines() == ["ts,close,temp", "1700000000000,1.5,"]